@@ -1,17 +1,29 @@
+from __future__ import annotations
+
 import json
 import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
+from typing import NamedTuple
 
 from PyQt6 import QtWidgets
 from PyQt6.QtCore import QByteArray
 from PyQt6.QtCore import QEventLoop
 from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QTimer
 from PyQt6.QtCore import QUrl
 from PyQt6.QtCore import QUrlQuery
+from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtNetwork import QNetworkAccessManager
 from PyQt6.QtNetwork import QNetworkReply
 from PyQt6.QtNetwork import QNetworkRequest
 
+from src import util
+from src.api.response_cache import ApiResponseCache
+from src.api.response_cache import CachedResponse
 from src.config import Settings
 from src.oauth.oauth_flow import OAuth2Flow
 from src.oauth.oauth_flow import OAuth2FlowInstance
@@ -22,8 +34,106 @@ DO_NOT_ENCODE = QByteArray()
 DO_NOT_ENCODE.append(b":/?&=.,")
 
 
+# Network access managers can only be used from the thread they were created
+# in, so requests are shared per thread
+_local = threading.local()
+
+
+def _network_manager() -> QNetworkAccessManager:
+    manager = getattr(_local, "manager", None)
+    if manager is None:
+        manager = _local.manager = QNetworkAccessManager()
+        _local.in_flight = {}
+    return manager
+
+
+def _in_flight() -> dict[str, SharedReply]:
+    _network_manager()
+    return _local.in_flight
+
+
+_parse_executor: ThreadPoolExecutor | None = None
+
+
+def _parse_pool() -> ThreadPoolExecutor:
+    global _parse_executor
+    if _parse_executor is None:
+        _parse_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="api-parse")
+    return _parse_executor
+
+
+def _header(reply: QNetworkReply, name: bytes) -> str:
+    return reply.rawHeader(QByteArray(name)).data().decode(errors="replace")
+
+
+class Waiter(NamedTuple):
+    shared: SharedReply | None
+    response_handler: Callable
+    error_handler: Callable
+
+
+class SharedReply:
+    """
+    A GET request in flight, shared by everyone who asked for the same url
+    until it finishes.
+    """
+
+    def __init__(
+            self,
+            key: str,
+            reply: QNetworkReply,
+            ttl: int,
+            stale: CachedResponse | None,
+    ) -> None:
+        self.key = key
+        self.reply = reply
+        self.ttl = ttl
+        self.stale = stale
+        self.waiters: list[tuple[ApiBase, Waiter]] = []
+        reply.finished.connect(self.on_finished)
+
+    def on_finished(self) -> None:
+        _in_flight().pop(self.key, None)
+        reply = self.reply
+        body = None
+        if reply.error() == QNetworkReply.NetworkError.NoError:
+            body = self._body()
+        else:
+            logger.error(f"API request error: {reply.error()}")
+
+        for api, waiter in self.waiters:
+            api.finish_waiting(waiter, reply if body is None else body)
+        reply.deleteLater()
+
+    def _body(self) -> bytes:
+        status = self.reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
+        if status == 304 and self.stale is not None:
+            logger.debug(f"Cached response for {self.key} is still valid")
+            response = self.stale._replace(expires=time.time() + self.ttl)
+        else:
+            response = CachedResponse(
+                self.reply.readAll().data(),
+                _header(self.reply, b"ETag"),
+                _header(self.reply, b"Last-Modified"),
+                time.time() + self.ttl,
+            )
+        if self.ttl > 0:
+            ApiBase.cache.put(self.key, response)
+        return response.body
+
+
 class ApiBase(QObject):
     oauth: OAuth2Flow = OAuth2FlowInstance
+    cache = ApiResponseCache(os.path.join(util.CACHE_DIR, "api"))
+    # Seconds for which responses of the route are served from the cache
+    # without asking the server. Expired responses are revalidated when the
+    # server sent an ETag or Last-Modified header. 0 disables caching
+    cache_ttl = 0
+    # Parses responses on a worker thread, for routes with big responses.
+    # parse_message mustn't touch Qt objects then
+    parse_in_thread = False
+
+    _parsed = pyqtSignal(object, object)
 
     def __do_nothing(*args, **kwargs) -> None:
         pass
@@ -32,11 +142,13 @@ class ApiBase(QObject):
         QObject.__init__(self)
         self.route = route
         self.host_config_key = ""
-        self.manager = QNetworkAccessManager()
-        self.manager.finished.connect(self.onRequestFinished)
-        self._running = False
-        self.handlers: dict[QNetworkReply | None, Callable] = {}
-        self.error_handlers: dict[QNetworkReply | None, Callable] = {}
+        self.manager = _network_manager()
+        self._waiting: list[Waiter] = []
+        self._parsed.connect(self._at_parsed)
+
+    @property
+    def _running(self) -> bool:
+        return bool(self._waiting)
 
     @classmethod
     def set_oauth(cls, oauth: OAuth2Flow) -> None:
@@ -93,28 +205,75 @@ class ApiBase(QObject):
             response_handler: Callable,
             error_handler: Callable = __do_nothing,
     ) -> None:
-        self._running = True
-        logger.debug("Sending API request with URL: {}".format(url.toString()))
-        reply = self.manager.get(self.prepare_request(url))
-        self.handlers[reply] = response_handler
-        self.error_handlers[reply] = error_handler
+        key = url.toString()
+        cached = self.cache.get(key) if self.cache_ttl > 0 else None
+        if cached is not None and cached.fresh():
+            logger.debug("Serving API request from cache: {}".format(key))
+            waiter = Waiter(None, response_handler, error_handler)
+            self._waiting.append(waiter)
+            QTimer.singleShot(0, lambda: self.finish_waiting(waiter, cached.body))
+            return
+
+        shared = _in_flight().get(key)
+        if shared is None:
+            logger.debug("Sending API request with URL: {}".format(key))
+            request = self.prepare_request(url)
+            if cached is not None and cached.revalidatable():
+                if cached.etag:
+                    request.setRawHeader(b"If-None-Match", cached.etag.encode())
+                if cached.last_modified:
+                    request.setRawHeader(b"If-Modified-Since", cached.last_modified.encode())
+            else:
+                cached = None
+            reply = self.manager.get(request)
+            shared = _in_flight()[key] = SharedReply(key, reply, self.cache_ttl, cached)
+        else:
+            logger.debug("Waiting for API request in flight: {}".format(key))
+        waiter = Waiter(shared, response_handler, error_handler)
+        shared.waiters.append((self, waiter))
+        self._waiting.append(waiter)
 
     def parse_message(self, message: dict) -> dict:
         return message
 
-    def onRequestFinished(self, reply: QNetworkReply) -> None:
-        self._running = False
-        if reply.error() != QNetworkReply.NetworkError.NoError:
-            logger.error(f"API request error: {reply.error()}")
-            self.error_handlers[reply](reply)
+    def finish_waiting(self, waiter: Waiter, result: bytes | QNetworkReply) -> None:
+        """
+        Passes the response body or the failed reply to the waiter's handlers
+        """
+        if waiter not in self._waiting:
+            # aborted
+            return
+        if isinstance(result, QNetworkReply):
+            self._waiting.remove(waiter)
+            waiter.error_handler(result)
+        elif self.parse_in_thread:
+            _parse_pool().submit(self._parse_in_thread, waiter, result)
         else:
-            message_bytes = reply.readAll().data()
-            message = json.loads(message_bytes.decode('utf-8'))
-            result = self.parse_message(message)
-            self.handlers[reply](result)
-        self.handlers.pop(reply)
-        self.error_handlers.pop(reply)
-        reply.deleteLater()
+            self._waiting.remove(waiter)
+            waiter.response_handler(self._parse(result))
+
+    def _parse(self, body: bytes) -> dict:
+        message = json.loads(body.decode('utf-8'))
+        return self.parse_message(message)
+
+    def _parse_in_thread(self, waiter: Waiter, body: bytes) -> None:
+        try:
+            result = self._parse(body)
+        except Exception as e:
+            result = e
+        try:
+            self._parsed.emit(waiter, result)
+        except RuntimeError:
+            # deleted meanwhile
+            pass
+
+    def _at_parsed(self, waiter: Waiter, result: dict | Exception) -> None:
+        if waiter not in self._waiting:
+            return
+        self._waiting.remove(waiter)
+        if isinstance(result, Exception):
+            raise result
+        waiter.response_handler(result)
 
     def waitForCompletion(self):
         waitFlag = QEventLoop.ProcessEventsFlag.WaitForMoreEvents
@@ -122,6 +281,12 @@ class ApiBase(QObject):
             QtWidgets.QApplication.processEvents(waitFlag)
 
     def abort(self) -> None:
-        for reply in self.handlers.copy():
-            if reply is not None:
-                reply.abort()
+        waiting, self._waiting = self._waiting, []
+        for waiter in waiting:
+            shared = waiter.shared
+            if shared is None:
+                continue
+            shared.waiters = [(api, w) for api, w in shared.waiters if w is not waiter]
+            # Replies other callers still wait for keep running
+            if not shared.waiters:
+                shared.reply.abort()
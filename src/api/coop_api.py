@@ -6,6 +6,8 @@ from src.api.parsers.CoopScenarioParser import CoopScenarioParser
 
 
 class CoopApiAccessor(DataApiAccessor):
+    cache_ttl = 3600
+
     def __init__(self) -> None:
         super().__init__("/data/coopScenario")
 
@@ -10,6 +10,8 @@ logger = logging.getLogger(__name__)
 
 
 class FeaturedModApiConnector(DataApiAccessor):
+    cache_ttl = 300
+
     def __init__(self) -> None:
         super().__init__("/data/featuredMod")
 
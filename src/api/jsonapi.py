@@ -0,0 +1,133 @@
+"""
+Resolution of JSON:API documents, which list related resources once in
+``included`` and refer to them by type and id.
+
+Included resources are indexed once, and relationships are only resolved
+when they're accessed, so big documents like replay vault pages don't have
+to be turned into nested dicts up front. Resources are read-only mappings
+that look like the dicts the api used to be parsed into: attributes and
+relationships are keys next to ``id`` and ``type``.
+
+Nothing here depends on Qt, so documents can be resolved on any thread.
+"""
+from __future__ import annotations
+
+from collections.abc import Mapping
+from typing import Any
+from typing import Iterator
+
+
+class ApiResource(Mapping):
+    """
+    A resource as a read-only mapping. Attributes are used in place, and
+    relationships are resolved on first access.
+    """
+    __slots__ = ("_id", "_type", "_attributes", "_relationships", "_index")
+
+    def __init__(self, obj: dict, index: ResourceIndex, included: dict | None = None) -> None:
+        attributes = obj.get("attributes", {})
+        relationships = obj.get("relationships", {})
+        if included is not None:
+            # Primary data that is also included
+            attributes, relationships = {}, {}
+            for other in (included, obj):
+                for key, value in other.get("attributes", {}).items():
+                    attributes[key] = value
+                    relationships.pop(key, None)
+                relationships.update(other.get("relationships", ()))
+        self._id = obj["id"]
+        self._type = attributes.get("type", obj["type"])
+        self._attributes = attributes
+        self._relationships = relationships
+        self._index = index
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._relationships:
+            return self._index.resolve(self._relationships[key])
+        if key in self._attributes:
+            return self._attributes[key]
+        if key == "id":
+            return self._id
+        if key == "type":
+            return self._type
+        raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        return (
+            key in self._relationships
+            or key in self._attributes
+            or key == "id"
+            or key == "type"
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        yield "id"
+        if "type" not in self._attributes:
+            yield "type"
+        yield from self._attributes
+        for key in self._relationships:
+            if key not in self._attributes:
+                yield key
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"ApiResource({self._type!r}, {self._id!r})"
+
+
+class ResourceIndex:
+    def __init__(self, included: list[dict]) -> None:
+        self._included = {(obj["type"], obj["id"]): obj for obj in included}
+        self._resources: dict[tuple[str, str], ApiResource] = {}
+        # Resolved relationships by id of the relationship object, which all
+        # stay alive as part of the document
+        self._resolved: dict[int, ApiResource | list[ApiResource] | dict] = {}
+
+    def resource(self, data: dict) -> ApiResource:
+        """
+        Returns the resource for primary data, merged with its included
+        counterpart, if any.
+        """
+        return ApiResource(data, self, self._included.get((data["type"], data["id"])))
+
+    def reference(self, identifier: dict) -> ApiResource:
+        """
+        Returns the resource a relationship refers to. Every resource is
+        created once, so references to it share the same object.
+        """
+        key = (identifier["type"], identifier["id"])
+        resource = self._resources.get(key)
+        if resource is None:
+            obj = self._included.get(key, identifier)
+            resource = self._resources[key] = ApiResource(obj, self)
+        return resource
+
+    def resolve(self, relationship: dict) -> ApiResource | list[ApiResource] | dict:
+        resolved = self._resolved.get(id(relationship))
+        if resolved is None:
+            data = relationship.get("data")
+            if isinstance(data, list):
+                resolved = [self.reference(identifier) for identifier in data]
+            elif isinstance(data, dict):
+                resolved = self.reference(data)
+            else:
+                resolved = {}
+            self._resolved[id(relationship)] = resolved
+        return resolved
+
+
+def resolve_document(message: dict) -> dict:
+    """
+    Returns the primary data of the document as resources, together with
+    its meta.
+    """
+    index = ResourceIndex(message.get("included", []))
+    data = message.get("data")
+    if isinstance(data, list):
+        data = [index.resource(item) for item in data]
+    elif isinstance(data, dict):
+        data = index.resource(data)
+    else:
+        data = {}
+    return {"data": data, "meta": message.get("meta", {})}
@@ -6,6 +6,8 @@ logger = logging.getLogger(__name__)
 
 
 class MatchmakerQueueApiConnector(DataApiAccessor):
+    cache_ttl = 600
+
     def __init__(self) -> None:
         super().__init__('/data/matchmakerQueue')
 
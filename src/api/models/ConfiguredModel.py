@@ -1,3 +1,4 @@
+from collections.abc import Mapping
 from typing import Any
 
 from pydantic import BaseModel
@@ -5,7 +6,7 @@ from pydantic import ConfigDict
 from pydantic import field_validator
 
 
-def api_response_empty(resp: dict) -> bool:
+def api_response_empty(resp: Mapping) -> bool:
     wasnt_included = ("id" in resp and "type" in resp and len(resp) == 2)
     return not resp or wasnt_included
 
@@ -16,7 +17,7 @@ class ConfiguredModel(BaseModel):
     @field_validator("*", mode="before")
     @classmethod
     def ensure_included_and_not_empty_or_none(cls, v: Any) -> Any:
-        if isinstance(v, dict):
+        if isinstance(v, Mapping):
             if api_response_empty(v):
                 return None
         elif isinstance(v, list):
@@ -11,6 +11,7 @@ logger = logging.getLogger(__name__)
 class PlayerApiConnector(DataApiAccessor):
     alias_info = pyqtSignal(dict)
     player_ready = pyqtSignal(Player)
+    cache_ttl = 300
 
     def __init__(self) -> None:
         super().__init__('/data/player')
@@ -6,5 +6,7 @@ logger = logging.getLogger(__name__)
 
 
 class ReplaysApiConnector(DataApiAccessor):
+    parse_in_thread = True
+
     def __init__(self) -> None:
         super().__init__('/data/game')
@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+
+class CachedResponse(NamedTuple):
+    body: bytes
+    etag: str
+    last_modified: str
+    # Unix time until which the response can be used without revalidation
+    expires: float
+
+    def fresh(self) -> bool:
+        return time.time() < self.expires
+
+    def revalidatable(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+
+class ApiResponseCache:
+    """
+    Cache of API response bodies keyed by request url. Recently used
+    responses are kept in memory, all of them in files in ``folder``. Both
+    are bounded by size, dropping the least recently used responses first.
+    Can be used from several threads.
+    """
+    MAX_MEMORY_SIZE = 16 * 1024 * 1024
+    MAX_DISK_SIZE = 64 * 1024 * 1024
+
+    def __init__(self, folder: str) -> None:
+        self.folder = folder
+        self._lock = threading.Lock()
+        self._memory: OrderedDict[str, CachedResponse] = OrderedDict()
+        self._memory_size = 0
+        # Sizes of the files in the folder, oldest first
+        self._files: OrderedDict[str, int] | None = None
+
+    @staticmethod
+    def _filename(key: str) -> str:
+        return hashlib.sha1(key.encode()).hexdigest()
+
+    def get(self, key: str) -> CachedResponse | None:
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+                filename = self._filename(key)
+                if self._files is not None and filename in self._files:
+                    self._files.move_to_end(filename)
+                return response
+            response = self._read(key)
+            if response is not None:
+                self._remember(key, response)
+            return response
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        with self._lock:
+            self._forget(key)
+            self._remember(key, response)
+            self._write(key, response)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._memory.clear()
+            self._memory_size = 0
+            for filename in self._index():
+                self._remove_file(filename)
+            self._files.clear()
+
+    def _remember(self, key: str, response: CachedResponse) -> None:
+        if len(response.body) > self.MAX_MEMORY_SIZE:
+            return
+        self._memory[key] = response
+        self._memory_size += len(response.body)
+        while self._memory_size > self.MAX_MEMORY_SIZE:
+            _, dropped = self._memory.popitem(last=False)
+            self._memory_size -= len(dropped.body)
+
+    def _forget(self, key: str) -> None:
+        response = self._memory.pop(key, None)
+        if response is not None:
+            self._memory_size -= len(response.body)
+
+    def _index(self) -> OrderedDict[str, int]:
+        if self._files is None:
+            files = []
+            try:
+                with os.scandir(self.folder) as it:
+                    for entry in it:
+                        try:
+                            st = entry.stat()
+                        except OSError:
+                            continue
+                        files.append((st.st_mtime_ns, entry.name, st.st_size))
+            except OSError:
+                pass
+            files.sort()
+            self._files = OrderedDict((name, size) for _, name, size in files)
+        return self._files
+
+    def _remove_file(self, filename: str) -> None:
+        try:
+            os.remove(os.path.join(self.folder, filename))
+        except OSError:
+            pass
+
+    def _read(self, key: str) -> CachedResponse | None:
+        filename = self._filename(key)
+        if filename not in self._index():
+            return None
+        path = os.path.join(self.folder, filename)
+        try:
+            with open(path, "rb") as fh:
+                header = json.loads(fh.readline())
+                body = fh.read()
+            if header["url"] != key:
+                return None
+            os.utime(path)
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.debug(f"Could not read cached response for {key}")
+            self._files.pop(filename, None)
+            self._remove_file(filename)
+            return None
+        self._files.move_to_end(filename)
+        return CachedResponse(body, header["etag"], header["last_modified"], header["expires"])
+
+    def _write(self, key: str, response: CachedResponse) -> None:
+        files = self._index()
+        filename = self._filename(key)
+        header = {
+            "url": key,
+            "etag": response.etag,
+            "last_modified": response.last_modified,
+            "expires": response.expires,
+        }
+        data = json.dumps(header).encode() + b"\n" + response.body
+        path = os.path.join(self.folder, filename)
+        tmp_path = f"{path}.tmp"
+        try:
+            os.makedirs(self.folder, exist_ok=True)
+            with open(tmp_path, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            logger.warning(f"Could not write cached response for {key}")
+            return
+        files.pop(filename, None)
+        files[filename] = len(data)
+
+        total = sum(files.values())
+        while total > self.MAX_DISK_SIZE and len(files) > 1:
+            oldest, size = files.popitem(last=False)
+            self._remove_file(oldest)
+            total -= size
@@ -20,6 +20,7 @@ logger = logging.getLogger(__name__)
 
 class LeaderboardRatingApiConnector(DataApiAccessor):
     player_ratings_ready = pyqtSignal(dict)
+    cache_ttl = 60
 
     def __init__(self) -> None:
         super().__init__('/data/leaderboardRating')
@@ -37,6 +38,8 @@ class LeaderboardRatingApiConnector(DataApiAccessor):
 
 
 class LeaderboardApiConnector(DataApiAccessor):
+    cache_ttl = 3600
+
     def __init__(self) -> None:
         super().__init__("/data/leaderboard")
 
@@ -45,26 +48,63 @@ class LeaderboardApiConnector(DataApiAccessor):
 
 
 class LeaderboardRatingJournalApiConnector(ApiAccessor):
+    """
+    Fetches the whole rating history of a player. The first page tells how
+    many there are, the others are then fetched in parallel. Pages are
+    emitted as they arrive, so not necessarily in order. A page that fails
+    is requested again, if it keeps failing the rest is dropped and
+    history_failed is emitted.
+    """
     ratings_ready = pyqtSignal(dict)
+    history_failed = pyqtSignal()
+    cache_ttl = 300
+    PAGE_SIZE = 10000
+    MAX_PARALLEL_PAGES = 4
+    MAX_RETRIES = 2
 
     def __init__(self) -> None:
         super().__init__("/data/leaderboardRatingJournal")
         self.query = {}
+        self._next_page = 1
+        self._total_pages = 1
 
     def handle_page(self, message: dict) -> None:
-        total_pages = message["meta"]["page"]["totalPages"]
         current_page = message["meta"]["page"]["number"]
+        if current_page == 1:
+            self._total_pages = message["meta"]["page"]["totalPages"]
+            for _ in range(self.MAX_PARALLEL_PAGES):
+                self._request_next_page()
+        else:
+            self._request_next_page()
         self.ratings_ready.emit(message)
-        if current_page < total_pages:
-            self.get_history_page(current_page + 1)
 
-    def get_history_page(self, page: int) -> None:
-        self.query.update({
-            "page[size]": 10000,
+    def _request_next_page(self) -> None:
+        if self._next_page > self._total_pages:
+            return
+        self.get_history_page(self._next_page)
+        self._next_page += 1
+
+    def get_history_page(self, page: int, retries: int = 0) -> None:
+        query = self.query.copy()
+        query.update({
+            "page[size]": self.PAGE_SIZE,
             "page[number]": page,
             "page[totals]": "",
         })
-        self.get_by_query(self.query, self.handle_page)
+        self.get_by_query(
+            query,
+            self.handle_page,
+            lambda reply: self.handle_page_error(page, retries),
+        )
+
+    def handle_page_error(self, page: int, retries: int) -> None:
+        if retries < self.MAX_RETRIES:
+            logger.warning(f"Rating history page {page} failed, requesting it again")
+            self.get_history_page(page, retries + 1)
+            return
+        logger.error(f"Rating history page {page} failed {retries + 1} times, giving up")
+        self.abort()
+        self.history_failed.emit()
 
     def get_full_history(self, pid: str, leaderboard: str) -> None:
         self.query.update({
@@ -76,11 +116,14 @@ class LeaderboardRatingJournalApiConnector(ApiAccessor):
             ),
             "sort": "gamePlayerStats.scoreTime",
         })
+        self._next_page = 2
+        self._total_pages = 1
         self.get_history_page(1)
 
 
 class LeagueSeasonScoreApiConnector(DataApiAccessor):
     score_ready = pyqtSignal(LeagueSeasonScore)
+    cache_ttl = 300
 
     def __init__(self) -> None:
         super().__init__("/data/leagueSeasonScore")
@@ -112,6 +155,7 @@ class LeagueSeasonScoreApiConnector(DataApiAccessor):
 
 class PlayerEventApiAccessor(DataApiAccessor):
     events_ready = pyqtSignal(list)
+    cache_ttl = 300
 
     def __init__(self) -> None:
         super().__init__("/data/playerEvent")
@@ -129,6 +173,7 @@ class PlayerEventApiAccessor(DataApiAccessor):
 
 class PlayerAchievementApiAccessor(DataApiAccessor):
     achievments_ready = pyqtSignal(object)
+    cache_ttl = 300
 
     def __init__(self) -> None:
         super().__init__("/data/playerAchievement")
@@ -146,6 +191,8 @@ class PlayerAchievementApiAccessor(DataApiAccessor):
 
 
 class AchievementsApiAccessor(DataApiAccessor):
+    cache_ttl = 3600
+
     def __init__(self) -> None:
         super().__init__("/data/achievement")
 
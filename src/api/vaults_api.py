@@ -76,6 +76,8 @@ class MapApiConnector(VaultsApiConnector):
 
 
 class MapPoolApiConnector(VaultsApiConnector):
+    cache_ttl = 600
+
     def __init__(self) -> None:
         super().__init__("/data/mapPoolAssignment")
         self._includes = (
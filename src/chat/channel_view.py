@@ -1,8 +1,11 @@
 import html
+import string
 import time
+from collections import deque
 
 import jinja2
 from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QTimer
 from PyQt6.QtCore import pyqtSignal
 from PyQt6.QtGui import QDesktopServices
 
@@ -18,9 +21,11 @@ from src.chat.chatter_model import ChatterModel
 from src.chat.chatter_model import ChatterSortFilterModel
 from src.downloadManager import DownloadRequest
 from src.model.chat.channel import ChannelType
+from src.model.chat.chatline import ChatLineMetadata
 from src.model.chat.chatline import ChatLineType
 from src.util import irc_escape
 from src.util.gameurl import GameUrl
+from src.util.magic_dict import MagicDict
 
 
 class ChannelView:
@@ -40,6 +45,7 @@ class ChannelView:
             self.widget.show_chatter_list(False)
 
         self._channel.added_chatter.connect(self._update_chatter_count)
+        self._channel.added_chatters.connect(self._update_chatter_count)
         self._channel.removed_chatter.connect(self._update_chatter_count)
         self._update_chatter_count()
 
@@ -71,9 +77,13 @@ class ChannelView:
 
     def on_shown(self):
         self._channel_tab.info = TabInfo.IDLE
+        self._lines_view.on_shown()
 
 
 class ChatAreaView:
+    # Lines read back from the log at a time
+    SCROLLBACK_LINES = 100
+
     def __init__(
         self, channel, widget, widget_tab, game_runner, avatar_adder,
         formatter,
@@ -87,9 +97,26 @@ class ChatAreaView:
         self._channel.updated.connect(self._at_channel_updated)
         self._widget.url_clicked.connect(self._at_url_clicked)
         self._widget.css_reloaded.connect(self._at_css_reloaded)
+        self._widget.scrolled_to_top.connect(self._load_scrollback)
         self._avatar_adder = avatar_adder
         self._formatter = formatter
 
+        # Formatted lines that are in the chat area, oldest first, and lines
+        # that aren't formatted yet. Lines are formatted and added to the
+        # chat area together once per event loop iteration, and only while
+        # the channel is shown.
+        self._blocks = deque()
+        self._pending = deque()
+        # Log positions of the lines read back from the channel's log when
+        # scrolled to the top. They're the first of the blocks, and dropped
+        # first when the channel is trimmed, so the lines shown stay in one
+        # piece and reading back goes on before the first one
+        self._scrollback = deque()
+        self._flush_timer = QTimer()
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(0)
+        self._flush_timer.timeout.connect(self._flush)
+
         self._set_topic(self._channel.topic)
 
     @classmethod
@@ -102,14 +129,53 @@ class ChatAreaView:
 
     def _add_line(self):
         data = self._channel.lines[-1]
+        self._pending.append(data)
+        self._set_tab_info(data)
+        if not self._widget.hidden and not self._flush_timer.isActive():
+            self._flush_timer.start()
+
+    def _format_line(self, data):
         if data.meta.player.avatar.url:
             self._avatar_adder.add_avatar(data.meta.player.avatar.url())
-        text = self._formatter.format(data)
-        self._widget.append_line(text)
-        self._set_tab_info(data)
+        return self._formatter.format(data)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        texts = [self._format_line(data) for data in self._pending]
+        self._pending.clear()
+        self._blocks.extend(texts)
+        self._widget.append_lines(texts)
+
+    def on_shown(self):
+        self._flush_timer.stop()
+        self._flush()
+
+    def _load_scrollback(self):
+        log = self._channel.lines.log
+        if log is None:
+            return
+        position = self._scrollback[0] if self._scrollback else None
+        lines = log.read_back(position, self.SCROLLBACK_LINES)
+        if not lines:
+            return
+        texts = self._formatter.format_older(
+            ChatLineMetadata(line, MagicDict()) for _, line in lines
+        )
+        self._scrollback.extendleft(position for position, _ in reversed(lines))
+        self._blocks.extendleft(reversed(texts))
+        self._widget.prepend_lines(texts)
 
     def _remove_lines(self, number):
-        self._widget.remove_lines(number)
+        # Oldest lines are removed first, and those are formatted already
+        formatted = min(number, len(self._blocks))
+        for _ in range(formatted):
+            self._blocks.popleft()
+        for _ in range(min(formatted, len(self._scrollback))):
+            self._scrollback.popleft()
+        self._widget.remove_lines(formatted)
+        for _ in range(min(number - formatted, len(self._pending))):
+            self._pending.popleft()
 
     def _at_channel_updated(self, new, old):
         if new.topic != old.topic:
@@ -158,10 +224,9 @@ class ChatAreaView:
         return False
 
     def _at_css_reloaded(self):
+        # Formatting doesn't depend on the css, only the document does
         self._widget.clear_chat()
-        for line in self._channel.lines:
-            text = self._formatter.format(line)
-            self._widget.append_line(text)
+        self._widget.append_lines(self._blocks)
 
 
 class ChatAvatarPixAdder:
@@ -224,19 +289,79 @@ class ChatLineCssTemplate(QObject):
         self.changed.emit()
 
 
+class ChatLineTemplate:
+    """
+    A template with {field}s, split once into literal text and fields, so
+    filling it in is a join. Fields can be filled in ahead of time with
+    partial().
+    """
+    def __init__(self, pieces):
+        # Literal text, and fields as (name,) tuples
+        self._pieces = []
+        for piece in pieces:
+            if (
+                isinstance(piece, str)
+                and self._pieces
+                and isinstance(self._pieces[-1], str)
+            ):
+                self._pieces[-1] += piece
+            elif piece:
+                self._pieces.append(piece)
+        self._parts = [
+            piece if isinstance(piece, str) else "" for piece in self._pieces
+        ]
+        self._fields = [
+            (index, piece[0])
+            for index, piece in enumerate(self._pieces)
+            if not isinstance(piece, str)
+        ]
+
+    @classmethod
+    def parse(cls, template):
+        pieces = []
+        for literal, field, _, _ in string.Formatter().parse(template):
+            pieces.append(literal)
+            if field is not None:
+                pieces.append((field,))
+        return cls(pieces)
+
+    def partial(self, **values):
+        return ChatLineTemplate([
+            str(values[piece[0]])
+            if not isinstance(piece, str) and piece[0] in values
+            else piece
+            for piece in self._pieces
+        ])
+
+    def format(self, **values):
+        parts = self._parts.copy()
+        for index, field in self._fields:
+            parts[index] = str(values[field])
+        return "".join(parts)
+
+
 class ChatLineFormatter:
+    # Lines from the same sender share everything but the text and time, so
+    # the rest of the line is filled in once per sender and kept
+    MAX_CACHED_SENDERS = 1000
+
     def __init__(self, theme, player_colors):
         self._set_theme(theme)
         self._player_colors = player_colors
         self._last_timestamp = None
+        self._sender_templates = {}
 
     @classmethod
     def build(cls, theme, player_colors, **kwargs):
         return cls(theme, player_colors)
 
     def _set_theme(self, theme):
-        self._chatline_template = theme.readfile("chat/chatline.qhtml")
-        self._avatar_template = theme.readfile("chat/chatline_avatar.qhtml")
+        self._chatline_template = ChatLineTemplate.parse(
+            theme.readfile("chat/chatline.qhtml"),
+        )
+        self._avatar_template = ChatLineTemplate.parse(
+            theme.readfile("chat/chatline_avatar.qhtml"),
+        )
 
     def _line_tags(self, data):
         line = data.line
@@ -280,9 +405,6 @@ class ChatLineFormatter:
             yield "avatar"
 
     def format(self, data):
-        tags = " ".join(self._line_tags(data))
-        avatar = self._avatar(data)
-
         if self._check_timestamp(data.line.time):
             stamp = time.strftime('%H:%M', time.localtime(data.line.time))
         else:
@@ -294,14 +416,59 @@ class ChatLineFormatter:
         if data.line.type == ChatLineType.RAW:
             return text
 
-        return self._chatline_template.format(
-            time=stamp,
-            sender=self._sender_name(data),
-            text=text,
-            avatar=avatar,
-            tags=tags,
+        return self._sender_template(data).format(time=stamp, text=text)
+
+    def format_older(self, lines):
+        """
+        Formats lines older than the ones formatted so far, without changing
+        whether the next line gets a timestamp.
+        """
+        last_timestamp = self._last_timestamp
+        self._last_timestamp = None
+        try:
+            return [self.format(data) for data in lines]
+        finally:
+            self._last_timestamp = last_timestamp
+
+    def _sender_key(self, data):
+        # Everything about the line that the tags, avatar and sender name
+        # depend on. Relations, elevation and clan are part of the key, so
+        # lines sent after they change don't use the old template.
+        line = data.line
+        meta = data.meta
+        chatter = meta.chatter
+        player = meta.player
+        avatar = player.avatar
+        return (
+            line.type,
+            line.sender,
+            chatter.name(),
+            chatter.is_mod(),
+            player.id(),
+            player.clan(),
+            avatar.url(),
+            avatar.tip(),
+            meta.is_friend(),
+            meta.is_foe(),
+            meta.is_me(),
+            meta.is_clannie(),
+            meta.mentions_me(),
         )
 
+    def _sender_template(self, data):
+        key = self._sender_key(data)
+        template = self._sender_templates.get(key)
+        if template is None:
+            if len(self._sender_templates) >= self.MAX_CACHED_SENDERS:
+                self._sender_templates.clear()
+            template = self._chatline_template.partial(
+                sender=self._sender_name(data),
+                avatar=self._avatar(data),
+                tags=" ".join(self._line_tags(data)),
+            )
+            self._sender_templates[key] = template
+        return template
+
     def _avatar(self, data):
         if data.line.type in [
             ChatLineType.INFO, ChatLineType.ANNOUNCEMENT, ChatLineType.RAW,
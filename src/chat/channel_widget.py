@@ -1,5 +1,6 @@
 import logging
 import re
+from collections import deque
 
 from PyQt6.QtCore import QObject
 from PyQt6.QtCore import Qt
@@ -18,6 +19,7 @@ class ChannelWidget(QObject):
     chatter_list_resized = pyqtSignal(object)
     url_clicked = pyqtSignal(QUrl)
     css_reloaded = pyqtSignal()
+    scrolled_to_top = pyqtSignal()
 
     def __init__(self, channel, chat_area_css, theme, chat_config):
         QObject.__init__(self)
@@ -25,6 +27,10 @@ class ChannelWidget(QObject):
         self._chat_area_css = chat_area_css
         self._chat_area_css.changed.connect(self._reload_css)
         self._chat_config = chat_config
+        # Where each line in the chat area ends, counting characters that
+        # were trimmed from the front since
+        self._line_ends = deque()
+        self._trimmed = 0
         self.set_theme(theme)
 
     @classmethod
@@ -73,6 +79,7 @@ class ChannelWidget(QObject):
         self._sticky_scroll = ChatAreaStickyScroll(
             self.chat_area.verticalScrollBar(),
         )
+        self.chat_area.verticalScrollBar().valueChanged.connect(self._at_scrolled)
 
     def _override_widget_methods(self):
 
@@ -86,6 +93,11 @@ class ChannelWidget(QObject):
     def _chatter_list_resized(self, size):
         self.chatter_list_resized.emit(size)
 
+    def _at_scrolled(self, value):
+        scrollbar = self.chat_area.verticalScrollBar()
+        if value == scrollbar.minimum() < scrollbar.maximum():
+            self.scrolled_to_top.emit()
+
     def _url_clicked(self, url):
         self.url_clicked.emit(url)
 
@@ -101,6 +113,8 @@ class ChannelWidget(QObject):
 
     def clear_chat(self):
         self.chat_area.document().setHtml("")
+        self._line_ends.clear()
+        self._trimmed = 0
 
     def add_avatar_resource(self, url, pix):
         doc = self.chat_area.document()
@@ -125,23 +139,56 @@ class ChannelWidget(QObject):
     def show_chatter_list(self, should_show):
         self.nick_frame.setVisible(should_show)
 
-    def append_line(self, text):
+    def append_lines(self, texts):
         # QTextEdit has its own ideas about scrolling and does not stay
         # in place when adding content
         self._sticky_scroll.save_scroll()
 
-        cursor = self.chat_area.textCursor()
+        # One edit block, so the document is laid out once for all lines
+        cursor = QTextCursor(self.chat_area.document())
         cursor.movePosition(QTextCursor.MoveOperation.End)
-        self.chat_area.setTextCursor(cursor)
-        self.chat_area.insertHtml(text)
+        cursor.beginEditBlock()
+        for text in texts:
+            cursor.insertHtml(text)
+            self._line_ends.append(cursor.position() + self._trimmed)
+        cursor.endEditBlock()
 
         self._sticky_scroll.restore_scroll()
 
+    def prepend_lines(self, texts):
+        """
+        Adds lines before the others, keeping the view where it was.
+        """
+        scrollbar = self.chat_area.verticalScrollBar()
+        from_bottom = scrollbar.maximum() - scrollbar.value()
+
+        doc = self.chat_area.document()
+        size = doc.characterCount()
+        cursor = QTextCursor(doc)
+        cursor.beginEditBlock()
+        ends = []
+        for text in texts:
+            cursor.insertHtml(text)
+            ends.append(cursor.position())
+        cursor.endEditBlock()
+        # Everything after moved by as much as was inserted
+        self._trimmed -= doc.characterCount() - size
+        self._line_ends.extendleft(end + self._trimmed for end in reversed(ends))
+
+        scrollbar.setValue(scrollbar.maximum() - from_bottom)
+
     def remove_lines(self, number):
-        cursor = self.chat_area.textCursor()
-        cursor.movePosition(QTextCursor.MoveOperation.Start)
-        cursor.movePosition(QTextCursor.MoveOperation.Down, QTextCursor.MoveMode.KeepAnchor, number)
+        number = min(number, len(self._line_ends))
+        if number == 0:
+            return
+        for _ in range(number - 1):
+            self._line_ends.popleft()
+        end = self._line_ends.popleft() - self._trimmed
+
+        cursor = QTextCursor(self.chat_area.document())
+        cursor.setPosition(end, QTextCursor.MoveMode.KeepAnchor)
         cursor.removeSelectedText()
+        self._trimmed += end
 
     def set_chatter_delegate(self, delegate):
         self.nick_list.setItemDelegate(delegate)
@@ -1,8 +1,10 @@
+import os
 from enum import Enum
 
 from PyQt6.QtCore import QObject
 from PyQt6.QtCore import pyqtSignal
 
+from src import util
 from src.model.chat.channel import Channel
 from src.model.chat.channel import ChannelID
 from src.model.chat.channel import ChannelType
@@ -10,6 +12,7 @@ from src.model.chat.channel import Lines
 from src.model.chat.channelchatter import ChannelChatter
 from src.model.chat.chatline import ChatLine
 from src.model.chat.chatline import ChatLineType
+from src.model.chat.chatlog import ChatLog
 from src.model.chat.chatter import Chatter
 
 
@@ -66,13 +69,20 @@ class ChatController(QObject):
 
     def _check_add_new_channel(self, cid):
         if cid not in self._channels:
-            channel = Channel(cid, Lines(), "")
+            channel = Channel(cid, self._new_lines(cid), "")
             self._channels[cid] = channel
             if cid.type == ChannelType.PRIVATE:
                 self._add_me_to_channel(channel)
                 self._join_chatter_to_his_privchannel(cid.name)
         return self._channels[cid]
 
+    def _new_lines(self, cid):
+        log = None
+        if self._chat_config.log_scrollback:
+            folder = os.path.join(util.LOG_DIR, "chat")
+            log = ChatLog.for_channel(folder, cid)
+        return Lines(log)
+
     def _add_me_to_channel(self, channel):
         my_name = self._connection.nickname
         me = None if my_name is None else self._chatters.get(my_name, None)
@@ -136,8 +146,20 @@ class ChatController(QObject):
         self._add_line(self._channels[cid], line)
 
     def _at_new_channel_chatters(self, cid, chatters):
-        for c in chatters:
-            self._add_or_update_cc(cid, c)
+        # Chatters new to the channel are added at once, so a big channel
+        # doesn't insert them into the chatter list one by one
+        channel = self._check_add_new_channel(cid)
+        new_ccs = {}
+        for cinfo in chatters:
+            chatter = self._check_add_new_chatter(cinfo)
+            key = (channel.id_key, chatter.id_key)
+            if key in self._ccs:
+                self._ccs[key].update(elevation=cinfo.elevation)
+            elif key in new_ccs:
+                new_ccs[key].elevation = cinfo.elevation
+            else:
+                new_ccs[key] = ChannelChatter(channel, chatter, cinfo.elevation)
+        self._ccs.set_items(list(new_ccs.values()))
 
     def _at_channel_chatter_joined(self, cid, chatter):
         self._at_new_channel_chatters(cid, [chatter])
@@ -31,10 +31,10 @@ class ChatterModel(QtListModel):
 
         if self._channel is not None:
             self._channel.added_chatter.connect(self.add_chatter)
+            self._channel.added_chatters.connect(self.add_chatters)
             self._channel.removed_chatter.connect(self.remove_chatter)
 
-        for chatter in self._channel.chatters:
-            self.add_chatter(chatter)
+            self.add_chatters(list(self._channel.chatters.values()))
 
     @classmethod
     def build(cls, channel, **kwargs):
@@ -44,6 +44,9 @@ class ChatterModel(QtListModel):
     def add_chatter(self, chatter):
         self._add_item(chatter, chatter.id_key)
 
+    def add_chatters(self, chatters):
+        self._add_items([(chatter, chatter.id_key) for chatter in chatters])
+
     def remove_chatter(self, chatter):
         self._remove_item(chatter.id_key)
 
@@ -74,6 +77,9 @@ class ChatterSortFilterModel(QSortFilterProxyModel):
         self._user_relations = user_relations
         self._chat_config = chat_config
         self._chat_config.updated.connect(self._check_sort_changed)
+        self._me.playerChanged.connect(self._invalidate_sort_keys)
+        self._me.clan_changed.connect(self._invalidate_sort_keys)
+        self._sort_key_generation = 0
         self.setSourceModel(model)
         self.sort(0)
 
@@ -85,30 +91,24 @@ class ChatterSortFilterModel(QSortFilterProxyModel):
         source = self.sourceModel()
         left = source.data(leftIndex, Qt.ItemDataRole.DisplayRole)
         right = source.data(rightIndex, Qt.ItemDataRole.DisplayRole)
+        return self._sort_key(left) < self._sort_key(right)
 
-        comp_list = [self._lt_me, self._lt_rank, self._lt_alphabetical]
-        for lt in comp_list:
-            if lt(left, right):
-                return True
-            elif lt(right, left):
-                return False
-        return False
+    def _sort_key(self, item):
+        # Keys are cached on items, and the generation lets us drop all of
+        # them at once when our user or chat config changes
+        cached = item.sort_key
+        if cached is not None and cached[0] == self._sort_key_generation:
+            return cached[1]
 
-    def _lt_me(self, left, right):
-        if self._me.login is None:
-            return False
-        return (
-            left.chatter.name == self._me.login
-            and right.chatter.name != self._me.login
-        )
-
-    def _lt_rank(self, left, right):
-        left_rank = self._get_user_rank(left)
-        right_rank = self._get_user_rank(right)
-        return left_rank < right_rank
+        name = item.chatter.name
+        is_me = self._me.login is not None and name == self._me.login
+        key = (not is_me, self._get_user_rank(item), name.casefold())
+        item.sort_key = (self._sort_key_generation, key)
+        return key
 
-    def _lt_alphabetical(self, left, right):
-        return left.chatter.name.lower() < right.chatter.name.lower()
+    def _invalidate_sort_keys(self, *args):
+        self._sort_key_generation += 1
+        self.invalidate()
 
     def _get_user_rank(self, item):
         pid = item.player.id if item.player is not None else None
@@ -141,7 +141,7 @@ class ChatterSortFilterModel(QSortFilterProxyModel):
 
     def _check_sort_changed(self, option):
         if option == "friendsontop":
-            self.invalidate()
+            self._invalidate_sort_keys()
 
     def invalidate_items(self):
         self.sourceModel().invalidate_items()
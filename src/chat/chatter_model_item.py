@@ -25,11 +25,15 @@ class ChatterModelItem(QObject):
         self._game = None
         self.cc = cc
 
-        self.cc.updated.connect(self._updated)
-        self.chatter.updated.connect(self._updated)
+        # Cached by ChatterSortFilterModel, reset when elevation, player or
+        # relationship changes
+        self.sort_key = None
+
+        self.cc.updated.connect(self._at_sort_data_updated)
+        self.chatter.updated.connect(self._at_sort_data_updated)
         self.chatter.newPlayer.connect(self._set_player)
         self._chatter_rel = self._relation.chatters[self.chatter.id_key]
-        self._chatter_rel.updated.connect(self._updated)
+        self._chatter_rel.updated.connect(self._at_sort_data_updated)
 
         self._map_request = DownloadRequest()
         self._map_request.done.connect(self._updated)
@@ -49,13 +53,17 @@ class ChatterModelItem(QObject):
     def _updated(self):
         self.updated.emit(self)
 
+    def _at_sort_data_updated(self):
+        self.sort_key = None
+        self._updated()
+
     @property
     def chatter(self):
         return self.cc.chatter
 
     def _set_player(self, chatter, new_player, old_player):
         self.player = new_player
-        self._updated()
+        self._at_sort_data_updated()
 
     @property
     def player(self):
@@ -67,7 +75,7 @@ class ChatterModelItem(QObject):
             self.game = None
             self._player.updated.disconnect(self._at_player_updated)
             self._player.newCurrentGame.disconnect(self._set_game)
-            self._player_rel.updated.disconnect(self._updated)
+            self._player_rel.updated.disconnect(self._at_sort_data_updated)
             self._player_rel = None
 
         self._player = value
@@ -76,13 +84,13 @@ class ChatterModelItem(QObject):
             self._player.updated.connect(self._at_player_updated)
             self._player.newCurrentGame.connect(self._set_game)
             self._player_rel = self._relation.players[self._player.id_key]
-            self._player_rel.updated.connect(self._updated)
+            self._player_rel.updated.connect(self._at_sort_data_updated)
             self.game = self._player.currentGame
             self._download_avatar_if_needed()
 
     def _at_player_updated(self):
         self._download_avatar_if_needed()
-        self._updated()
+        self._at_sort_data_updated()
 
     def _set_game(self, player, game):
         self.game = game
@@ -131,6 +131,8 @@ class IrcConnection(SimpleIRCClient, IrcSignals):
 
         self._nickserv_registered = False
         self._connected = False
+        # NAMES replies are collected until the end of the list
+        self._names = {}
 
         self.reconnector = Reconnector(self)
         self.reactor.socket_error.connect(self.reconnector.reconnect)
@@ -296,8 +298,14 @@ class IrcConnection(SimpleIRCClient, IrcSignals):
             hostname = ''
             return ChatterInfo(name, hostname, elevation)
 
-        chatters = [userdata(user) for user in listing]
-        self.new_channel_chatters.emit(channel, chatters)
+        chatters = self._names.setdefault(channel, [])
+        chatters.extend(userdata(user) for user in listing)
+
+    def on_endofnames(self, c, e):
+        channel = ChannelID(ChannelType.PUBLIC, e.arguments[0])
+        chatters = self._names.pop(channel, None)
+        if chatters:
+            self.new_channel_chatters.emit(channel, chatters)
 
     def on_whoisuser(self, c: ServerConnection, e: Event) -> None:
         self._log_event(e)
@@ -455,6 +463,7 @@ class IrcConnection(SimpleIRCClient, IrcSignals):
 
     def on_disconnect(self, c: ServerConnection, e: Event) -> None:
         self._connected = False
+        self._names.clear()
         self.disconnected.emit()
         message = e.arguments[0]
         logger.info(f"Disconnected from chat: {message}")
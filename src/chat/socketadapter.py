@@ -2,8 +2,10 @@ from __future__ import annotations
 
 import logging
 import time
+from functools import partial
 
 from irc.client import Reactor
+from irc.client import ServerConnection
 from irc.client import ServerConnectionError
 from PyQt6.QtCore import QEventLoop
 from PyQt6.QtCore import QObject
@@ -20,15 +22,21 @@ class WebSocketToSocket(QObject):
     """ Allows to use QWebSocket as a 'socket' """
 
     message_received = pyqtSignal()
+    line_received = pyqtSignal(bytes)
     error_occurred = pyqtSignal()
 
+    # Data that was read is dropped from the buffer once there's this much of it
+    COMPACT_SIZE = 64 * 1024
+
     def __init__(self) -> None:
         super().__init__()
         self.socket = QWebSocket()
         self.socket.binaryMessageReceived.connect(self.on_bin_message_received)
         self.socket.errorOccurred.connect(self.on_socket_error)
         self.socket.stateChanged.connect(self.on_socket_state_changed)
-        self.buffer = b""
+        self._buffer = bytearray()
+        self._read_pos = 0
+        self._deliver_lines = False
 
         self._connect_loop = QEventLoop()
         self.socket.connected.connect(self._connect_loop.exit)
@@ -46,17 +54,45 @@ class WebSocketToSocket(QObject):
         if state == QAbstractSocket.SocketState.UnconnectedState and not self._close_intended:
             self.error_occurred.emit()
 
+    def deliver_lines(self) -> None:
+        """
+        From now on, emit every message with `line_received` instead of
+        buffering it to be read. Anything still buffered is emitted first.
+        """
+        self._deliver_lines = True
+        if self._read_pos < len(self._buffer):
+            data = bytes(self._buffer[self._read_pos:])
+            self._buffer.clear()
+            self._read_pos = 0
+            self.line_received.emit(data)
+
     def on_bin_message_received(self, message: bytes) -> None:
         # according to https://ircv3.net/specs/extensions/websocket
+        # each message is exactly one line
+        if self._deliver_lines:
+            self.line_received.emit(message)
+            return
         # messages MUST NOT include trailing \r\n, but our non-websocket
         # library (irc) requires them
-        self.buffer += message + b"\r\n"
+        self._buffer += message
+        self._buffer += b"\r\n"
         self.message_received.emit()
 
     def read(self, size: int) -> bytes:
         if self.socket.state() != QAbstractSocket.SocketState.ConnectedState:
             raise OSError
-        ans, self.buffer = self.buffer[:size], self.buffer[size:]
+        end = min(self._read_pos + size, len(self._buffer))
+        with memoryview(self._buffer) as view:
+            ans = bytes(view[self._read_pos:end])
+
+        if end == len(self._buffer):
+            self._buffer.clear()
+            self._read_pos = 0
+        elif end >= self.COMPACT_SIZE:
+            del self._buffer[:end]
+            self._read_pos = 0
+        else:
+            self._read_pos = end
         return ans
 
     def recv(self, size: int) -> bytes:
@@ -97,7 +133,20 @@ class WebSocketToSocket(QObject):
         self.socket.close()
 
 
+class SocketAdapterConnection(ServerConnection):
+    def process_line(self, data: bytes) -> None:
+        """
+        Process lines the socket adapter delivered, without reading them
+        from the socket first.
+        """
+        self.buffer.feed(data + b"\r\n")
+        for line in self.buffer:
+            if line:
+                self._process_line(line)
+
+
 class ReactorForSocketAdapter(Reactor, QObject):
+    connection_class = SocketAdapterConnection
     socket_error = pyqtSignal()
 
     def __init__(self) -> None:
@@ -112,9 +161,19 @@ class ReactorForSocketAdapter(Reactor, QObject):
             time.sleep(timeout)
         self.process_timeout()
 
+    def process_line(self, connection: SocketAdapterConnection, data: bytes) -> None:
+        with self.mutex:
+            connection.process_line(data)
+        self.process_timeout()
+
     def on_connect(self, socket: WebSocketToSocket) -> None:
-        socket.message_received.connect(self.process_once)
         socket.error_occurred.connect(self.on_socket_error)
+        for connection in self.connections:
+            if connection.socket is socket:
+                socket.line_received.connect(partial(self.process_line, connection))
+                socket.deliver_lines()
+                return
+        socket.message_received.connect(self.process_once)
 
     def on_socket_error(self) -> None:
         self.socket_error.emit()
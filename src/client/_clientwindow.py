@@ -191,6 +191,7 @@ class ClientWindow(FormClass, BaseClass):
             config.Settings.get('lobby/host'),
             config.Settings.get('lobby/port', type=int),
             self.lobby_dispatch.dispatch,
+            config.Settings.get('lobby/threaded_decoding', type=bool),
         )
         self.lobby_connection.state_changed.connect(
             self.on_connection_state_changed,
@@ -238,6 +239,7 @@ class ClientWindow(FormClass, BaseClass):
         )
 
         self.map_preview_downloader = MapSmallPreviewDownloader(util.MAP_PREVIEW_SMALL_DIR)
+        self.map_preview_downloader.preview_downloaded.connect(fa.maps.previews.forget)
         self.avatar_downloader = ImageDownloader()
 
         # Map generator
@@ -250,6 +252,7 @@ class ClientWindow(FormClass, BaseClass):
         )
 
         self.gameset.added.connect(self.fill_in_session_info)
+        self.gameset.added_batch.connect(self.fill_in_session_info_batch)
 
         self.lobby_info.serverSession.connect(self.handle_session)
         self.lobby_dispatch["registration_response"] = (
@@ -281,6 +284,7 @@ class ClientWindow(FormClass, BaseClass):
         fa.instance.finished.connect(self.finished_fa)
         fa.instance.errorOccurred.connect(self.error_fa)
         self.gameset.added.connect(fa.instance.newServerGame)
+        self.gameset.added_batch.connect(fa.instance.newServerGames)
 
         # Local Replay Server
         self.replayServer = fa.replayserver.ReplayServer(self)
@@ -944,6 +948,7 @@ class ClientWindow(FormClass, BaseClass):
         if self.lobby_connection.socket_connected():
             progress.setLabelText("Closing main connection.")
             self.lobby_connection.disconnect_()
+        self.lobby_connection.stop_decoder_thread()
 
         # Close connectivity dialog
         if self.connectivity_dialog is not None:
@@ -1111,6 +1116,7 @@ class ClientWindow(FormClass, BaseClass):
         self.actionSetJoinsParts.triggered.connect(self.update_options)
         self.actionSetNewbiesChannel.triggered.connect(self.update_options)
         self.actionIgnoreFoes.triggered.connect(self.update_options)
+        self.actionLogChatScrollback.triggered.connect(self.update_options)
         self.actionSetLiveReplays.triggered.connect(self.update_options)
         self.actionSaveGamelogs.setChecked(self.game_logs)
         self.actionColoredNicknames.triggered.connect(self.update_options)
@@ -1203,6 +1209,7 @@ class ClientWindow(FormClass, BaseClass):
         chat_config.joinsparts = self.actionSetJoinsParts.isChecked()
         chat_config.newbies_channel = self.actionSetNewbiesChannel.isChecked()
         chat_config.ignore_foes = self.actionIgnoreFoes.isChecked()
+        chat_config.log_scrollback = self.actionLogChatScrollback.isChecked()
         chat_config.friendsontop = self.actionFriendsOnTop.isChecked()
 
         invisible_items = [
@@ -1499,6 +1506,7 @@ class ClientWindow(FormClass, BaseClass):
             self.actionSetJoinsParts.setChecked(cc.joinsparts)
             self.actionSetNewbiesChannel.setChecked(cc.newbies_channel)
             self.actionIgnoreFoes.setChecked(cc.ignore_foes)
+            self.actionLogChatScrollback.setChecked(cc.log_scrollback)
         except BaseException:
             pass
 
@@ -1907,6 +1915,10 @@ class ClientWindow(FormClass, BaseClass):
             self.game_session.game_name = game.title
             self.game_session.game_visibility = game.visibility.value
 
+    def fill_in_session_info_batch(self, games):
+        for game in games:
+            self.fill_in_session_info(game)
+
     def handle_matchmaker_info(self, message):
         logger.debug(
             "Handling matchmaker info with message {}".format(message),
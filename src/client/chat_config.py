@@ -30,6 +30,7 @@ class ChatConfig(QtCore.QObject):
     channel_ping_timeout = signal_property("channel_ping_timeout")
     max_chat_lines = signal_property("max_chat_lines")
     ignore_foes = signal_property("ignore_foes")
+    log_scrollback = signal_property("log_scrollback")
 
     def __init__(self, settings):
         QtCore.QObject.__init__(self)
@@ -42,6 +43,7 @@ class ChatConfig(QtCore.QObject):
         self._channel_ping_timeout = None
         self._max_chat_lines = None
         self._ignore_foes = None
+        self._log_scrollback = None
 
         self.hide_chatter_items = SignallingSet()
         self.hide_chatter_items.added.connect(self._emit_hidden_items)
@@ -66,6 +68,9 @@ class ChatConfig(QtCore.QObject):
             s.value("chat/newbiesChannel", "true") == "true"
         )
         self.ignore_foes = (s.value("chat/ignoreFoes", "true") == "true")
+        self.log_scrollback = (
+            s.value("chat/logScrollback", "false") == "true"
+        )
 
         items = s.value("chat/hide_chatter_items", "")
         items = items.split()
@@ -83,6 +88,7 @@ class ChatConfig(QtCore.QObject):
         s.setValue("chat/newbiesChannel", self.newbies_channel)
         s.setValue("chat/friendsontop", self.friendsontop)
         s.setValue("chat/ignoreFoes", self.ignore_foes)
+        s.setValue("chat/logScrollback", self.log_scrollback)
 
         items = " ".join(item.value for item in self.hide_chatter_items)
         s.setValue("chat/hide_chatter_items", items)
@@ -3,7 +3,9 @@ from __future__ import annotations
 import json
 import logging
 import sys
+from collections import deque
 from enum import IntEnum
+from typing import Any
 
 from PyQt6 import QtCore
 from PyQt6 import QtNetwork
@@ -152,6 +154,81 @@ class ServerReconnecter(QtCore.QObject):
             self._keepalive_timer.start()  # restart
 
 
+class MessageDecoder:
+    """
+    Incremental decoder for the newline-delimited JSON stream sent by the
+    lobby server. Frames may end in the middle of a message, so the
+    unterminated tail is kept in a byte buffer until the rest arrives.
+    """
+
+    def __init__(self) -> None:
+        self._buffer = bytearray()
+
+    def reset(self) -> None:
+        self._buffer.clear()
+
+    @property
+    def pending(self) -> int:
+        return len(self._buffer)
+
+    def feed(self, data: bytes) -> list[dict[str, Any]]:
+        end = data.rfind(b"\n")
+        if end == -1:
+            self._buffer += data
+            return []
+
+        if self._buffer:
+            self._buffer += data[:end]
+            chunk = bytes(self._buffer)
+            self._buffer.clear()
+        else:
+            chunk = data[:end]
+        self._buffer += data[end + 1:]
+
+        messages = []
+        for line in chunk.split(b"\n"):
+            if not line.strip():
+                continue
+            try:
+                messages.append(json.loads(line))
+            except ValueError:
+                logger.error(
+                    "Error decoding JSON: {!r}".format(line),
+                    exc_info=sys.exc_info(),
+                )
+        return messages
+
+
+class MessageDecoderWorker(QtCore.QObject):
+    """
+    Runs a MessageDecoder on a separate thread, so that large bursts
+    (e.g. game_info on login) are parsed without blocking the GUI. Decoded
+    messages are tagged with the session their data was received in.
+    """
+
+    decoded = QtCore.pyqtSignal(int, list)
+
+    def __init__(self) -> None:
+        QtCore.QObject.__init__(self)
+        self._decoder = MessageDecoder()
+
+    @QtCore.pyqtSlot(int, bytes)
+    def feed(self, session: int, data: bytes) -> None:
+        messages = self._decoder.feed(data)
+        if messages:
+            self.decoded.emit(session, messages)
+
+    @QtCore.pyqtSlot()
+    def reset(self) -> None:
+        self._decoder.reset()
+
+    @QtCore.pyqtSlot()
+    def sync(self) -> None:
+        # Called blocking, so the caller knows everything fed before is
+        # decoded and emitted
+        pass
+
+
 class ServerConnection(QtCore.QObject):
 
     # These signals are emitted when the client is connected or disconnected
@@ -161,7 +238,15 @@ class ServerConnection(QtCore.QObject):
     disconnected = QtCore.pyqtSignal()
     message_received = QtCore.pyqtSignal()
 
-    def __init__(self, host, port, dispatch):
+    # Used to talk to the decoder worker when parsing off the GUI thread
+    _decode_requested = QtCore.pyqtSignal(int, bytes)
+    _decoder_reset_requested = QtCore.pyqtSignal()
+    _decoder_sync_requested = QtCore.pyqtSignal()
+
+    # Maximum number of messages dispatched per event loop iteration
+    DISPATCH_BATCH_SIZE = 100
+
+    def __init__(self, host, port, dispatch, threaded_decoding=False):
         QtCore.QObject.__init__(self)
         self.socket = QWebSocket()
         self.socket.binaryMessageReceived.connect(self.on_binary_message_received)
@@ -172,13 +257,45 @@ class ServerConnection(QtCore.QObject):
         self._host = host
         self._port = port
         self._state = ConnectionState.INITIAL
-        self._data = ""
         self._disconnect_requested = False
 
         self._dispatch = dispatch
+        # Bumped on every connect, so messages of an old session that are
+        # still being decoded then are dropped
+        self._session = 0
+        self._pending_messages = deque()
+        self._dispatch_timer = QtCore.QTimer(self)
+        self._dispatch_timer.setSingleShot(True)
+        self._dispatch_timer.setInterval(0)
+        self._dispatch_timer.timeout.connect(self._dispatch_pending)
+
+        self._decoder = MessageDecoder()
+        self._decoder_thread = None
+        if threaded_decoding:
+            self._start_decoder_thread()
 
         self.api_accessor = UserApiAccessor()
 
+    def _start_decoder_thread(self) -> None:
+        self._decoder_thread = QtCore.QThread()
+        self._decoder_worker = MessageDecoderWorker()
+        self._decoder_worker.moveToThread(self._decoder_thread)
+        self._decode_requested.connect(self._decoder_worker.feed)
+        self._decoder_reset_requested.connect(self._decoder_worker.reset)
+        self._decoder_sync_requested.connect(
+            self._decoder_worker.sync,
+            QtCore.Qt.ConnectionType.BlockingQueuedConnection,
+        )
+        self._decoder_worker.decoded.connect(self.enqueue_messages)
+        self._decoder_thread.start()
+
+    def stop_decoder_thread(self) -> None:
+        if self._decoder_thread is None:
+            return
+        self._decoder_thread.quit()
+        self._decoder_thread.wait(1000)
+        self._decoder_thread = None
+
     def on_socket_state_change(self, state):
         states = QtNetwork.QAbstractSocket.SocketState
         my_state = None
@@ -260,6 +377,7 @@ class ServerConnection(QtCore.QObject):
         self.state = ConnectionState.CONNECTING
 
     def on_connected(self):
+        self._session += 1
         self.state = ConnectionState.CONNECTED
         self.connected.emit()
 
@@ -274,32 +392,62 @@ class ServerConnection(QtCore.QObject):
             self.socket.localAddress().toString(), port, "UDP",
         )
 
-    def processDataFromServer(self, data: str) -> None:
-        self._data = ""
-        for line in data.splitlines():
-            action = json.loads(line)
-            command = action.get("command", "").lower()
-            if command == "ping":
-                logger.debug("Server: PING")
-                self.send(dict(command="pong"))
-            elif command == "pong":
-                logger.debug("Server: PONG")
-            else:
-                try:
-                    self._dispatch(action)
-                except BaseException:
-                    logger.error(
-                        "Error dispatching JSON: " + line,
-                        exc_info=sys.exc_info(),
-                    )
+    def processDataFromServer(self, data: bytes) -> None:
+        self.enqueue_messages(self._session, self._decoder.feed(data))
+
+    @QtCore.pyqtSlot(int, list)
+    def enqueue_messages(self, session: int, messages: list[dict]) -> None:
+        if session != self._session:
+            return
+        self._pending_messages.extend(messages)
+        if self._pending_messages and not self._dispatch_timer.isActive():
+            self._dispatch_timer.start()
+
+    def _dispatch_received(self) -> None:
+        """
+        Dispatches everything received so far at once, including data the
+        decoder thread hasn't got to yet.
+        """
+        if self._decoder_thread is not None:
+            # Returns when the worker is done with the data fed before, its
+            # messages are then waiting in our event queue
+            self._decoder_sync_requested.emit()
+            QtCore.QCoreApplication.sendPostedEvents(self, QtCore.QEvent.Type.MetaCall)
+        self._dispatch_timer.stop()
+        while self._pending_messages:
+            self.handle_message(self._pending_messages.popleft())
+
+    def _dispatch_pending(self) -> None:
+        for _ in range(min(self.DISPATCH_BATCH_SIZE, len(self._pending_messages))):
+            self.handle_message(self._pending_messages.popleft())
+        if self._pending_messages:
+            self._dispatch_timer.start()
+
+    def handle_message(self, action: dict) -> None:
+        command = action.get("command", "").lower()
+        if command == "ping":
+            logger.debug("Server: PING")
+            self.send(dict(command="pong"))
+        elif command == "pong":
+            logger.debug("Server: PONG")
+        else:
+            try:
+                self._dispatch(action)
+            except BaseException:
+                logger.error(
+                    "Error dispatching JSON: {}".format(action),
+                    exc_info=sys.exc_info(),
+                )
 
     @QtCore.pyqtSlot(QByteArray)
     def on_binary_message_received(self, message: QByteArray) -> None:
-        data = message.data().decode()
-        logger.debug("Server: '{}'".format(data))
-        self._data += data
-        if self._data.endswith("\n"):
-            self.processDataFromServer(self._data)
+        data = message.data()
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Server: '{}'".format(data.decode(errors="replace")))
+        if self._decoder_thread is not None:
+            self._decode_requested.emit(self._session, data)
+        else:
+            self.processDataFromServer(data)
 
     def writeToServer(self, action, *args, **kw):
         message = (action + "\n").encode()
@@ -326,8 +474,11 @@ class ServerConnection(QtCore.QObject):
 
     def on_disconnect(self):
         logger.warning("Disconnected from lobby server.")
+        # The server tells why it closed the connection right before
+        self._dispatch_received()
         self.state = ConnectionState.DISCONNECTED
-        self._data = ""
+        self._decoder.reset()
+        self._decoder_reset_requested.emit()
         self.disconnected.emit()
         if self._disconnect_requested:
             return
@@ -432,8 +583,8 @@ class LobbyInfo(QtCore.QObject):
 
     def handle_game_info(self, message):
         if 'games' in message:  # initial games from server after client start
-            for game in message['games']:
-                self._update_game(game)
+            logger.debug('Received info about {} games'.format(len(message['games'])))
+            self._gameset.apply_batch(message['games'])
         else:
             self._update_game(message)
 
@@ -35,6 +35,7 @@ default_values = {
     'proxy/port': 9124,
     'lobby/host': 'lobby.{host}',
     'lobby/port': 8002,
+    'lobby/threaded_decoding': True,
     'updater/host': 'lobby.{host}',
     'mordor/host': 'http://mordor.{host}',
     'news/host': 'https://direct.{host}',
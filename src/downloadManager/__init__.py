@@ -3,6 +3,7 @@ from __future__ import annotations
 import logging
 import os
 import zipfile
+from collections import deque
 from io import BytesIO
 
 from PyQt6.QtCore import QByteArray
@@ -177,9 +178,13 @@ class FileDownload(BaseDownload):
         self._cache_path = f"{target_path}.part"
 
         self._output = QFile(self._cache_path)
-        self._output.open(QIODevice.OpenModeFlag.WriteOnly)
         super().__init__(nam, addr, self._output, request_params=request_params)
 
+    def run(self) -> None:
+        # Opened only now, so that queued downloads don't hold files open
+        self._output.open(QIODevice.OpenModeFlag.WriteOnly)
+        super().run()
+
     def _about_to_finish(self) -> None:
         super()._about_to_finish()
         self.cleanup()
@@ -196,6 +201,99 @@ class FileDownload(BaseDownload):
             self._output.rename(self._target_path)
 
 
+class DownloadQueue(QObject):
+    """
+    Runs downloads in order, at most ``max_running`` of them at a time.
+    Progress is summed over all downloads that have started so far. If a
+    download fails, the rest of the queue is canceled.
+    """
+    progress = pyqtSignal(object)
+    download_finished = pyqtSignal(object)
+    finished = pyqtSignal(object)
+
+    def __init__(self, max_running: int = 4) -> None:
+        QObject.__init__(self)
+        self.max_running = max_running
+        self.canceled = False
+        self.failed_download: BaseDownload | None = None
+
+        self._downloads: list[BaseDownload] = []
+        self._pending: deque[BaseDownload] = deque()
+        self._running: set[BaseDownload] = set()
+        self._started = False
+        self._done = False
+
+    @property
+    def bytes_total(self) -> int:
+        return sum(dl.bytes_total for dl in self._downloads)
+
+    @property
+    def bytes_progress(self) -> int:
+        return sum(dl.bytes_progress for dl in self._downloads)
+
+    def add(self, dl: BaseDownload) -> None:
+        dl.progress.connect(self._at_progress)
+        dl.finished.connect(self._at_download_finished)
+        self._downloads.append(dl)
+        self._pending.append(dl)
+        if self._started:
+            self._start_next()
+
+    def run(self) -> None:
+        self._started = True
+        self._start_next()
+        self._check_done()
+
+    def cancel(self) -> None:
+        if self.canceled:
+            return
+        self.canceled = True
+        self._pending.clear()
+        for dl in list(self._running):
+            dl.cancel()
+        self._check_done()
+
+    def succeeded(self) -> bool:
+        return not self.canceled and self.failed_download is None
+
+    def failed(self) -> bool:
+        return not self.succeeded()
+
+    def _start_next(self) -> None:
+        while self._pending and len(self._running) < self.max_running:
+            dl = self._pending.popleft()
+            self._running.add(dl)
+            dl.run()
+
+    def _at_progress(self, dl: BaseDownload) -> None:
+        self.progress.emit(self)
+
+    def _at_download_finished(self, dl: BaseDownload) -> None:
+        self._running.discard(dl)
+        self.download_finished.emit(dl)
+        if dl.failed() and not self.canceled:
+            self.failed_download = dl
+            self.cancel()
+        else:
+            self._start_next()
+        self._check_done()
+
+    def _check_done(self) -> None:
+        if self._done or not self._started or self._pending or self._running:
+            return
+        self._done = True
+        self.finished.emit(self)
+
+    def waitForCompletion(self) -> None:
+        if self._done:
+            return
+
+        wait_flag = QEventLoop.ProcessEventsFlag.WaitForMoreEvents
+        loop = QEventLoop()
+        self.finished.connect(loop.quit)
+        loop.exec(wait_flag)
+
+
 class ZipDownloadExtract(BaseDownload):
     """
     Download a zip archive in-memory and extract it into target_dir
@@ -366,10 +464,18 @@ class Downloader(QObject):
 
 
 class MapPreviewDownloader(Downloader):
+    # Emitted with the map name before requesters are notified
+    preview_downloaded = pyqtSignal(str)
+
     def __init__(self, target_dir: str, size: str) -> None:
         super().__init__(target_dir)
         self.size = size
 
+    def _finished_download(self, download: DownloadWrapper, download_path: str) -> None:
+        if not download.failed():
+            self.preview_downloaded.emit(download.name.removesuffix(".png"))
+        super()._finished_download(download, download_path)
+
     def download_preview(self, name: str, req: DownloadRequest) -> None:
         self._add_request(f"{name}.png", req, self._target_url(name))
 
@@ -49,6 +49,10 @@ class GameProcess(QtCore.QProcess):
             return
         self.game = game
 
+    def newServerGames(self, games):
+        for game in games:
+            self.newServerGame(game)
+
     def _clearGame(self, _=None):
         self.game = None
 
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# hashlib releases the GIL while hashing large buffers, so files can be
+# hashed in parallel from threads
+HASH_WORKERS = 4
+READ_SIZE = 8 * 1024 * 1024
+
+
+def md5(path: str) -> str | None:
+    if not os.path.isfile(path):
+        return None
+
+    m = hashlib.md5()
+    buffer = bytearray(READ_SIZE)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as fd:
+        while size := fd.readinto(buffer):
+            m.update(view[:size])
+    return m.hexdigest()
+
+
+class FileHashCache:
+    """
+    Persistent cache of file md5s keyed by path. An entry is only valid as
+    long as size and modification time of the file stay the same.
+    """
+
+    def __init__(self, cache_file: str) -> None:
+        self._cache_file = cache_file
+        self._hashes: dict[str, tuple[int, int, str]] | None = None
+        self._dirty = False
+
+    @property
+    def hashes(self) -> dict[str, tuple[int, int, str]]:
+        if self._hashes is None:
+            self._hashes = self._load()
+        return self._hashes
+
+    def _load(self) -> dict[str, tuple[int, int, str]]:
+        try:
+            with open(self._cache_file) as fh:
+                return {path: tuple(entry) for path, entry in json.load(fh).items()}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError, TypeError, AttributeError):
+            logger.warning(f"Could not read file hash cache {self._cache_file}")
+            return {}
+
+    def save(self) -> None:
+        if not self._dirty:
+            return
+        os.makedirs(os.path.dirname(self._cache_file), exist_ok=True)
+        tmp_file = f"{self._cache_file}.tmp"
+        try:
+            with open(tmp_file, "w") as fh:
+                json.dump(self.hashes, fh)
+            os.replace(tmp_file, self._cache_file)
+        except OSError:
+            logger.warning(f"Could not write file hash cache {self._cache_file}")
+        else:
+            self._dirty = False
+
+    @staticmethod
+    def _stat(path: str) -> tuple[int, int] | None:
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns
+
+    def get(self, path: str) -> str | None:
+        """
+        Returns the md5 of the file, hashing it if the cached one is stale.
+        """
+        return self.get_many([path])[path]
+
+    def get_many(
+            self,
+            paths: list[str],
+            progress: Callable[[str], None] | None = None,
+    ) -> dict[str, str | None]:
+        """
+        Returns md5s of given files, hashing the ones not in the cache in
+        parallel. Missing files have no md5. ``progress`` is called with
+        every path once its md5 is known.
+        """
+        result = {}
+        stale = {}
+        for path in paths:
+            stat = self._stat(path)
+            entry = self.hashes.get(path)
+            if stat is None:
+                result[path] = None
+                if self.hashes.pop(path, None) is not None:
+                    self._dirty = True
+            elif entry is not None and entry[:2] == stat:
+                result[path] = entry[2]
+            else:
+                stale[path] = stat
+                continue
+            if progress is not None:
+                progress(path)
+
+        if stale:
+            with ThreadPoolExecutor(max_workers=HASH_WORKERS) as pool:
+                futures = {pool.submit(md5, path): path for path in stale}
+                for future in as_completed(futures):
+                    path = futures[future]
+                    digest = future.result()
+                    result[path] = digest
+                    # Don't remember files that changed while being hashed
+                    if digest is not None and self._stat(path) == stale[path]:
+                        self.hashes[path] = (*stale[path], digest)
+                        self._dirty = True
+                    if progress is not None:
+                        progress(path)
+        return result
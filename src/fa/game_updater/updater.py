@@ -21,6 +21,7 @@ from PyQt6.QtGui import QTextCursor
 from PyQt6.QtWidgets import QDialog
 
 from src import util
+from src.downloadManager import DownloadQueue
 from src.downloadManager import FileDownload
 from src.fa.game_updater.misc import ProgressInfo
 from src.fa.game_updater.misc import UpdaterResult
@@ -124,12 +125,12 @@ class UpdaterProgressDialog(FormClass, BaseClass):
             self.modProgress.setMaximum(info.total)
             self.modProgress.setValue(info.progress)
 
-    def on_download_progress(self, dler: FileDownload) -> None:
-        if dler.bytes_total == 0:
+    def on_download_progress(self, queue: DownloadQueue) -> None:
+        if queue.bytes_total == 0:
             return
 
-        total = dler.bytes_total
-        ready = dler.bytes_progress
+        total = queue.bytes_total
+        ready = queue.bytes_progress
 
         total_mb = round(total / (1024 ** 2), 2)
         ready_mb = round(ready / (1024 ** 2), 2)
@@ -145,7 +146,8 @@ class UpdaterProgressDialog(FormClass, BaseClass):
         self.replace_last_log_line(text)
 
     def on_download_finished(self, dler: FileDownload) -> None:
-        self.append_log("Finished downloading.")
+        # Keep an empty last line for the progress bar of other downloads
+        self.append_log(f"Finished downloading {dler.addr}\n")
 
     def on_download_started(self, dler: FileDownload) -> None:
         self.append_log(f"Downloading file from {dler.addr}\n")
@@ -5,6 +5,7 @@ import os
 import shutil
 import stat
 from functools import wraps
+from typing import Callable
 
 from PyQt6.QtCore import QObject
 from PyQt6.QtCore import pyqtSignal
@@ -16,7 +17,9 @@ from src.api.featured_mod_api import FeaturedModFilesApiConnector
 from src.api.models.FeaturedMod import FeaturedMod
 from src.api.models.FeaturedModFile import FeaturedModFile
 from src.config import Settings
+from src.downloadManager import DownloadQueue
 from src.downloadManager import FileDownload
+from src.fa.game_updater.hashcache import FileHashCache
 from src.fa.game_updater.misc import ProgressInfo
 from src.fa.game_updater.misc import UpdaterCancellation
 from src.fa.game_updater.misc import UpdaterFailure
@@ -29,6 +32,8 @@ logger = logging.getLogger(__name__)
 
 
 class UpdaterWorker(QObject):
+    MAX_PARALLEL_DOWNLOADS = 4
+
     done = pyqtSignal(UpdaterResult)
 
     current_mod = pyqtSignal(ProgressInfo)
@@ -38,7 +43,7 @@ class UpdaterWorker(QObject):
     mod_progress = pyqtSignal(ProgressInfo)
 
     download_started = pyqtSignal(FileDownload)
-    download_progress = pyqtSignal(FileDownload)
+    download_progress = pyqtSignal(DownloadQueue)
     download_finished = pyqtSignal(FileDownload)
 
     def __init__(
@@ -62,8 +67,12 @@ class UpdaterWorker(QObject):
         self.cache_enabled = keep_cache or in_session_cache
 
         self.dlers: list[FileDownload] = []
+        self.download_queue: DownloadQueue | None = None
         self._interruption_requested = False
         self.fa_patcher = FAPatcher()
+        self.hash_cache = FileHashCache(
+            os.path.join(util.CACHE_DIR, "featured_mod_hashes.json"),
+        )
 
     def _check_interruption(fn):
         @wraps(fn)
@@ -89,17 +98,37 @@ class UpdaterWorker(QObject):
     @_check_interruption
     def _calculate_md5s(self, files: list[FeaturedModFile]) -> dict[str, str]:
         total = len(files)
-        result = {}
-        for index, file in enumerate(files, start=1):
-            filepath = os.path.join(util.APPDATA_DIR, file.group, file.name)
-            result[file.md5] = util.md5(filepath)
-            self.hash_progress.emit(ProgressInfo(index, total, file.name))
-        return result
+        paths = {
+            os.path.join(util.APPDATA_DIR, file.group, file.name): file
+            for file in files
+        }
+        done = 0
+
+        def report(path):
+            nonlocal done
+            done += 1
+            self.hash_progress.emit(ProgressInfo(done, total, paths[path].name))
+
+        md5s = self.hash_cache.get_many(list(paths), report)
+        self.hash_cache.save()
+        return {file.md5: md5s[path] for path, file in paths.items()}
+
+    def fetch_fmod_files(
+            self,
+            files: list[FeaturedModFile],
+            on_fetched: Callable[[FeaturedModFile], None] | None = None,
+    ) -> None:
+        downloads = {}
+        for file in files:
+            target_path = os.path.join(util.APPDATA_DIR, file.group, file.name)
+            params = {file.hmac_parameter: file.hmac_token}
+            downloads[self._create_download(target_path, file.cacheable_url, params)] = file
+
+        def at_download_finished(dler):
+            if dler.succeeded() and on_fetched is not None:
+                on_fetched(downloads[dler])
 
-    def fetch_fmod_file(self, file: FeaturedModFile) -> None:
-        target_path = os.path.join(util.APPDATA_DIR, file.group, file.name)
-        url = file.cacheable_url
-        self._download(target_path, url, {file.hmac_parameter: file.hmac_token})
+        self._download_all(list(downloads), at_download_finished)
 
     def move_from_cache(self, file: FeaturedModFile) -> None:
         src_dir = os.path.join(util.APPDATA_DIR, file.group)
@@ -119,7 +148,9 @@ class UpdaterWorker(QObject):
         src_dir = os.path.join(util.APPDATA_DIR, file.group)
         cache_dir = os.path.join(util.GAME_CACHE_DIR, file.group)
         if os.path.exists(os.path.join(src_dir, file.name)):
-            md5 = precalculated_md5s.get(file.md5, util.md5(os.path.join(src_dir, file.name)))
+            md5 = precalculated_md5s.get(file.md5)
+            if md5 is None:
+                md5 = self.hash_cache.get(os.path.join(src_dir, file.name))
             shutil.move(
                 os.path.join(src_dir, file.name),
                 os.path.join(cache_dir, md5),
@@ -142,12 +173,16 @@ class UpdaterWorker(QObject):
             self,
             file: FeaturedModFile,
             precalculated_md5s: dict[str, str] | None = None,
-    ) -> None:
+    ) -> bool:
+        """
+        Puts the current version of the file aside and restores the wanted
+        one from cache. Returns False if it has to be downloaded instead.
+        """
         self.move_to_cache(file, precalculated_md5s)
-        if self._is_cached(file):
-            self.move_from_cache(file)
-        else:
-            self.fetch_fmod_file(file)
+        if not self._is_cached(file):
+            return False
+        self.move_from_cache(file)
+        return True
 
     @_check_interruption
     def update_files(self, files: list[FeaturedModFile]) -> None:
@@ -160,13 +195,23 @@ class UpdaterWorker(QObject):
 
         to_update = self._filter_files_to_update(files, md5s)
         total = len(to_update)
+        updated = 0
+
+        def report(file):
+            nonlocal updated
+            updated += 1
+            self.mod_progress.emit(ProgressInfo(updated, total, file.name))
 
         if total == 0:
             self.mod_progress.emit(ProgressInfo(0, 0, ""))
 
-        for index, file in enumerate(to_update, start=1):
-            self.update_file(file, md5s)
-            self.mod_progress.emit(ProgressInfo(index, total, file.name))
+        to_fetch = []
+        for file in to_update:
+            if self.update_file(file, md5s):
+                report(file)
+            else:
+                to_fetch.append(file)
+        self.fetch_fmod_files(to_fetch, report)
 
         self.unpack_movies_and_sounds(files)
         self.patch_fa_exe_if_needed(files)
@@ -210,20 +255,45 @@ class UpdaterWorker(QObject):
                 os.chmod(dst_file, st.st_mode | stat.S_IWRITE)
                 self.game_progress.emit(ProgressInfo(index, total_files, file))
 
-    def _download(self, target_path: str, url: str, params: dict) -> None:
-        logger.info(f"Updater: Downloading {url}")
+    def _create_download(self, target_path: str, url: str, params: dict) -> FileDownload:
         dler = FileDownload(target_path, self.nam, url, params)
         dler.blocksize = None
-        dler.progress.connect(self.download_progress.emit)
-        dler.start.connect(self.download_started.emit)
+        dler.start.connect(self._at_download_started)
         dler.finished.connect(self.download_finished.emit)
+        return dler
+
+    def _at_download_started(self, dler: FileDownload) -> None:
+        logger.info(f"Updater: Downloading {dler.addr}")
         self.dlers.append(dler)
-        dler.run()
-        dler.waitForCompletion()
-        if dler.canceled:
-            raise UpdaterCancellation(dler.error_string())
-        elif dler.failed():
-            raise UpdaterFailure(f"Update failed: {dler.error_sring()}")
+        self.download_started.emit(dler)
+
+    @_check_interruption
+    def _download_all(
+            self,
+            dlers: list[FileDownload],
+            on_finished: Callable[[FileDownload], None],
+    ) -> None:
+        """
+        Downloads files over the shared network manager, a few at a time.
+        """
+        if not dlers:
+            return
+
+        queue = DownloadQueue(self.MAX_PARALLEL_DOWNLOADS)
+        queue.progress.connect(self.download_progress.emit)
+        queue.download_finished.connect(on_finished)
+        for dler in dlers:
+            queue.add(dler)
+        self.download_queue = queue
+        queue.run()
+        queue.waitForCompletion()
+        self.download_queue = None
+
+        if queue.failed_download is not None:
+            dler = queue.failed_download
+            raise UpdaterFailure(f"Update failed: {dler.error_string()}")
+        elif queue.canceled:
+            raise UpdaterCancellation("User aborted the update")
 
     def patch_fa_executable(self, exe_info: FeaturedModFile) -> None:
         exe_path = os.path.join(util.BIN_DIR, exe_info.name)
@@ -293,6 +363,9 @@ class UpdaterWorker(QObject):
         self.done.emit(self.result)
 
     def abort(self) -> None:
-        for dler in self.dlers:
-            dler.cancel()
         self._interruption_requested = True
+        if self.download_queue is not None:
+            self.download_queue.cancel()
+        for dler in self.dlers:
+            if not dler.canceled:
+                dler.cancel()
@@ -7,7 +7,9 @@ import string
 import struct
 import sys
 import tempfile
+import time
 import zipfile
+from collections import OrderedDict
 from typing import Callable
 
 from PyQt6 import QtCore
@@ -17,13 +19,18 @@ from src import util
 from src.config import Settings
 from src.mapGenerator.mapgenUtils import isGeneratedMap
 from src.model.game import OFFICIAL_MAPS as maps
+from src.util.dds import DDSError
+from src.util.dds import load_dds
+from src.vaults import luaparser
 from src.vaults.dialogs import downloadVaultAssetNoMsg
+from src.vaults.localcontent import LocalContentIndex
 
 logger = logging.getLogger(__name__)
 
 route = Settings.get('content/host')
 
-__exist_maps = None
+__base_maps = None
+__user_maps = None
 
 
 def isBase(mapname):
@@ -34,11 +41,49 @@ def isBase(mapname):
 
 
 def getUserMaps():
-    maps = []
-    if os.path.isdir(getUserMapsFolder()):
-        for _dir in os.listdir(getUserMapsFolder()):
-            maps.append(_dir.lower())
-    return maps
+    return [entry.name.lower() for entry in user_maps()]
+
+
+def user_maps() -> LocalContentIndex:
+    """
+    Index of the user's maps folder, with scenario info of every map.
+    """
+    global __user_maps
+    folder = getUserMapsFolder()
+    if __user_maps is None or __user_maps.folder != folder:
+        __user_maps = LocalContentIndex(
+            folder,
+            os.path.join(util.CACHE_DIR, "local_maps.json"),
+            readMapInfo,
+        )
+    return __user_maps
+
+
+def readMapInfo(name: str) -> dict | None:
+    """
+    Reads scenario info of a map in the user's maps folder
+    """
+    folder = os.path.join(getUserMapsFolder(), name)
+    if not os.path.isdir(folder):
+        return None
+    scenario = getScenarioFile(folder)
+    if scenario is None:
+        return None
+    scenariolua = luaparser.luaParser(os.path.join(folder, scenario))
+    info = scenariolua.parse(
+        {
+            'scenarioinfo>name': 'name',
+            'size': 'map_size',
+            'description': 'description',
+            'count:armies': 'max_players',
+            'map_version': 'version',
+            'type': 'map_type',
+        },
+        {'version': '1', 'description': '', 'map_type': 'skirmish'},
+    )
+    if scenariolua.error:
+        logger.debug(f"Errors in scenario of {name}: {scenariolua.errorMsg}")
+    return info
 
 
 def getDisplayName(filename):
@@ -110,32 +155,20 @@ def isMapFolderValid(folder):
 
 
 def existMaps(force=False):
-    global __exist_maps
-    if force or __exist_maps is None:
-
-        __exist_maps = getUserMaps()
-
+    global __base_maps
+    if force or __base_maps is None:
         if os.path.isdir(getBaseMapsFolder()):
-            if __exist_maps is None:
-                __exist_maps = os.listdir(getBaseMapsFolder())
-            else:
-                __exist_maps.extend(os.listdir(getBaseMapsFolder()))
-    return __exist_maps
+            __base_maps = os.listdir(getBaseMapsFolder())
+        else:
+            __base_maps = []
+    return getUserMaps() + __base_maps
 
 
 def isMapAvailable(mapname):
     """
     Returns true if the map with the given name is available on the client
     """
-    if isBase(mapname):
-        return True
-
-    if os.path.isdir(getUserMapsFolder()):
-        for infile in os.listdir(getUserMapsFolder()):
-            if infile.lower() == mapname.lower():
-                return True
-
-    return False
+    return isBase(mapname) or mapname in user_maps()
 
 
 def folderForMap(mapname):
@@ -144,13 +177,7 @@ def folderForMap(mapname):
     """
     if isBase(mapname):
         return os.path.join(getBaseMapsFolder(), mapname)
-
-    if os.path.isdir(getUserMapsFolder()):
-        for infile in os.listdir(getUserMapsFolder()):
-            if infile.lower() == mapname.lower():
-                return os.path.join(getUserMapsFolder(), mapname)
-
-    return None
+    return user_maps().path(mapname)
 
 
 def getBaseMapsFolder():
@@ -180,40 +207,24 @@ def getUserMapsFolder():
 
 def genPrevFromDDS(sourcename: str, destname: str, small: bool = False) -> None:
     """
-    this opens supcom's dds file (format: bgra8888) and saves to png
+    this opens supcom's dds file and saves it as png
     """
     try:
-        img = bytearray()
-        buf = bytearray(16)
-        file = open(sourcename, "rb")
-        file.seek(128)  # skip header
-        while file.readinto(buf):
-            img += buf[:3] + buf[4:7] + buf[8:11] + buf[12:15]
-        file.close()
-
-        size = int((len(img) / 3) ** (1.0 / 2))
-        if small:
-            imageFile = QtGui.QImage(
-                img,
-                size,
-                size,
-                QtGui.QImage.Format.Format_RGB888,
-            ).rgbSwapped().scaled(
-                100,
-                100,
-                transformMode=QtCore.Qt.TransformationMode.SmoothTransformation,
-            )
-        else:
-            imageFile = QtGui.QImage(
-                img,
-                size,
-                size,
-                QtGui.QImage.Format.Format_RGB888,
-            ).rgbSwapped()
-        imageFile.save(destname)
+        image = load_dds(sourcename)
+    except DDSError as e:
+        logger.debug('DDSError exception in genPrevFromDDS', exc_info=True)
+        raise IOError(f"Can't read {sourcename}: {e}") from e
     except IOError:
         logger.debug('IOError exception in genPrevFromDDS', exc_info=True)
         raise
+    if small:
+        image = image.scaled(
+            100,
+            100,
+            transformMode=QtCore.Qt.TransformationMode.SmoothTransformation,
+        )
+    if not image.save(destname):
+        raise IOError(f"Can't save preview to {destname}")
 
 
 def export_preview_from_map(
@@ -419,20 +430,25 @@ def export_preview_from_map(
 iconExtensions = ["png"]
 
 
-def get_preview_for_generated_map(mapname: str) -> QtGui.QIcon:
+def get_preview_for_generated_map(
+        mapname: str,
+        pixmap: bool = False,
+) -> QtGui.QIcon | QtGui.QPixmap:
     mapdir = os.path.join(getUserMapsFolder(), mapname)
     preview_name = f"{mapname}_preview.png"
     preview_path = os.path.join(mapdir, preview_name)
 
     if os.path.isfile(preview_path):
-        return util.THEME.icon(preview_path)
+        return util.THEME.icon(preview_path, pix=pixmap)
 
-    return util.THEME.icon("games/generated_map.png")
+    return util.THEME.icon("games/generated_map.png", pix=pixmap)
 
 
-def preview(mapname: str, *, pixmap: bool = False) -> QtGui.QIcon | QtGui.QPixmap | None:
-    if isGeneratedMap(mapname):
-        return get_preview_for_generated_map(mapname)
+def _load_preview_image(mapname: str) -> QtGui.QImage | None:
+    """
+    Loads the small preview from cache, generating it from the local map
+    folder if needed. Only uses QImage, so it can run outside the GUI thread.
+    """
     try:
         # Try to load directly from cache
         for extension in iconExtensions:
@@ -442,7 +458,7 @@ def preview(mapname: str, *, pixmap: bool = False) -> QtGui.QIcon | QtGui.QPixma
             )
             if os.path.isfile(img):
                 logger.log(5, "Using cached preview image for: " + mapname)
-                return util.THEME.icon(img, False, pixmap)
+                return QtGui.QImage(img)
 
         # Try to find in local map folder
         img = export_preview_from_map(mapname)
@@ -454,12 +470,143 @@ def preview(mapname: str, *, pixmap: bool = False) -> QtGui.QIcon | QtGui.QPixma
             and os.path.isfile(img['cache'])
         ):
             logger.debug("Using fresh preview image for: " + mapname)
-            return util.THEME.icon(img['cache'], False, pixmap)
+            return QtGui.QImage(img['cache'])
     except Exception:
         logger.debug(f"Map Preview Exception ({mapname!r})", exc_info=sys.exc_info())
     return None
 
 
+class MapPreviewLoader(QtCore.QObject):
+    loaded = QtCore.pyqtSignal(str, object)
+
+    @QtCore.pyqtSlot(str)
+    def load(self, mapname: str) -> None:
+        self.loaded.emit(mapname, _load_preview_image(mapname))
+
+
+class MapPreviews(QtCore.QObject):
+    """
+    Keeps recently used small map previews in memory, and remembers for a
+    while which maps have no preview, so that repeated lookups don't touch
+    the disk. Previews can be loaded on a worker thread with request(), which
+    emits loaded(mapname, found) when done.
+    """
+    MAX_PREVIEWS = 500
+    MISS_TTL = 60
+
+    loaded = QtCore.pyqtSignal(str, bool)
+    _load_requested = QtCore.pyqtSignal(str)
+
+    def __init__(self) -> None:
+        QtCore.QObject.__init__(self)
+        self._previews: OrderedDict[str, tuple[QtGui.QPixmap, QtGui.QIcon]] = OrderedDict()
+        self._misses: dict[str, float] = {}
+        self._pending: set[str] = set()
+
+        self._thread: QtCore.QThread | None = None
+        self._loader = MapPreviewLoader()
+        self._loader.loaded.connect(self._at_loaded)
+        self._load_requested.connect(self._loader.load)
+
+    def cached(
+            self,
+            mapname: str,
+            pixmap: bool = False,
+    ) -> QtGui.QIcon | QtGui.QPixmap | None:
+        """
+        Returns the preview if it's in memory, without touching the disk.
+        """
+        if isGeneratedMap(mapname):
+            return get_preview_for_generated_map(mapname, pixmap)
+        entry = self._previews.get(mapname)
+        if entry is None:
+            return None
+        self._previews.move_to_end(mapname)
+        return entry[0] if pixmap else entry[1]
+
+    def missing(self, mapname: str) -> bool:
+        expiry = self._misses.get(mapname)
+        if expiry is None:
+            return False
+        if expiry < time.monotonic():
+            del self._misses[mapname]
+            return False
+        return True
+
+    def get(
+            self,
+            mapname: str,
+            pixmap: bool = False,
+    ) -> QtGui.QIcon | QtGui.QPixmap | None:
+        """
+        Returns the preview, loading it right away if needed.
+        """
+        preview = self.cached(mapname, pixmap)
+        if preview is not None or self.missing(mapname):
+            return preview
+        self._store(mapname, _load_preview_image(mapname))
+        return self.cached(mapname, pixmap)
+
+    def request(self, mapname: str) -> None:
+        """
+        Loads the preview in the background unless it's known already.
+        """
+        if (
+            isGeneratedMap(mapname)
+            or mapname in self._previews
+            or mapname in self._pending
+            or self.missing(mapname)
+        ):
+            return
+        self._pending.add(mapname)
+        self._start_thread()
+        self._load_requested.emit(mapname)
+
+    def forget(self, mapname: str) -> None:
+        self._previews.pop(mapname, None)
+        self._misses.pop(mapname, None)
+
+    def _start_thread(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = QtCore.QThread()
+        self._loader.moveToThread(self._thread)
+        app = QtCore.QCoreApplication.instance()
+        if app is not None:
+            app.aboutToQuit.connect(self.stop)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._thread.quit()
+        self._thread.wait()
+
+    def _at_loaded(self, mapname: str, image: QtGui.QImage | None) -> None:
+        self._pending.discard(mapname)
+        # Could have been loaded or downloaded in the meantime
+        if mapname not in self._previews:
+            self._store(mapname, image)
+        self.loaded.emit(mapname, mapname in self._previews)
+
+    def _store(self, mapname: str, image: QtGui.QImage | None) -> None:
+        if image is None or image.isNull():
+            self._misses[mapname] = time.monotonic() + self.MISS_TTL
+            return
+        pix = QtGui.QPixmap.fromImage(image)
+        self._previews[mapname] = (pix, QtGui.QIcon(pix))
+        self._previews.move_to_end(mapname)
+        while len(self._previews) > self.MAX_PREVIEWS:
+            self._previews.popitem(last=False)
+
+
+previews = MapPreviews()
+
+
+def preview(mapname: str, *, pixmap: bool = False) -> QtGui.QIcon | QtGui.QPixmap | None:
+    return previews.get(mapname, pixmap)
+
+
 def downloadMap(name: str, silent: bool = False) -> bool:
     """
     Download a map from the vault with the given name
@@ -472,6 +619,8 @@ def downloadMap(name: str, silent: bool = False) -> bool:
         ret, msg = _doDownloadMap(name, link, silent)
     if not ret and msg is not None:
         msg()
+    if ret:
+        user_maps().refresh()
     return ret
 
 
@@ -1,7 +1,32 @@
+from __future__ import annotations
+
+import base64
+import json
+import mmap
 import struct
+import zlib
+from collections import Counter
+from collections import deque
 from enum import Enum
-from io import BufferedReader
+from enum import IntEnum
 from typing import Any
+from typing import BinaryIO
+from typing import Iterator
+from typing import NamedTuple
+
+import zstandard
+
+INT = struct.Struct("<i")
+UINT = struct.Struct("<I")
+FLOAT = struct.Struct("<f")
+UNSIGNED_CHAR = struct.Struct("B")
+OPERATION_HEADER = struct.Struct("<BH")
+CHECKSUM = struct.Struct("<16sI")
+
+TICKS_PER_SECOND = 10
+
+# memoryview has no find(), so strings are searched for in chunks
+STRING_SEARCH_CHUNK = 256
 
 
 class LuaDataType(Enum):
@@ -17,57 +42,76 @@ class ReplayParser:
     def __init__(self, file: str) -> None:
         self.file = file
 
-    def parse_header(self) -> dict[str, Any]:
+    def parse_header(self, full: bool = False) -> dict[str, Any]:
         with open(self.file, "rb") as stream:
-            data_parser = ReplayDataParser(stream)
-            return data_parser.parse_header()
+            try:
+                data = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:  # empty file
+                data = b""
+            try:
+                return ReplayDataParser(data).parse_header(full)
+            finally:
+                if isinstance(data, mmap.mmap):
+                    data.close()
 
 
 class ReplayDataParser:
-    def __init__(self, stream: BufferedReader) -> None:
-        self.stream = stream
-        self.buffer = b""
+    """
+    Reads replay data from a bytes-like object (bytes, mmap, memoryview)
+    by moving an offset over it, without copying the underlying buffer.
+    """
 
-    def unpack(self, fmt: str, packed: bytes) -> Any:
-        value, *_ = struct.unpack(fmt, packed)
-        return value
+    def __init__(self, data: bytes | bytearray | memoryview | mmap.mmap) -> None:
+        self.data = data
+        self.offset = 0
+        self.body_offset: int | None = None
 
-    def advance(self, fmt: str) -> None:
-        size = struct.calcsize(fmt)
-        self.buffer = self.buffer[size:]
-
-    def peek(self, fmt: str) -> Any:
-        size = struct.calcsize(fmt)
-        incoming = self.stream.read(size)
-        self.buffer += incoming
-        return self.unpack(fmt, incoming)
-
-    def read(self, fmt: str) -> Any:
-        if self.buffer:
-            value = self.unpack(fmt, self.buffer)
-        else:
-            value = self.peek(fmt)
-        self.advance(fmt)
+    def _unpack(self, fmt: struct.Struct) -> Any:
+        value, = fmt.unpack_from(self.data, self.offset)
+        self.offset += fmt.size
         return value
 
+    def skip(self, size: int) -> None:
+        self.offset += size
+
+    def _find_null(self, start: int) -> int:
+        if not isinstance(self.data, memoryview):
+            return self.data.find(b"\x00", start)
+
+        while start < len(self.data):
+            chunk = self.data[start:start + STRING_SEARCH_CHUNK].tobytes()
+            index = chunk.find(b"\x00")
+            if index != -1:
+                return start + index
+            start += len(chunk)
+        return -1
+
     def read_string(self) -> str:
-        line = b""
-        while self.peek("c") != b"\x00":
-            line += self.read("s")
-        self.advance("c")
+        end = self._find_null(self.offset)
+        if end == -1:
+            raise struct.error("unterminated string")
+        line = self.data[self.offset:end]
+        self.offset = end + 1
         try:
-            return line.decode()
+            return bytes(line).decode()
         except UnicodeDecodeError:
             return ""
 
     def read_int(self) -> int:
-        return self.read("<i")
+        return self._unpack(INT)
+
+    def read_unsigned_int(self) -> int:
+        return self._unpack(UINT)
 
     def read_float(self) -> float:
-        return self.read("<f")
+        return self._unpack(FLOAT)
 
     def read_unsigned_char(self) -> int:
-        return self.read("B")
+        return self._unpack(UNSIGNED_CHAR)
+
+    def peek_unsigned_char(self) -> int:
+        value, = UNSIGNED_CHAR.unpack_from(self.data, self.offset)
+        return value
 
     def parse_lua(self) -> Any:
         data_type = LuaDataType(self.read_unsigned_char())
@@ -75,7 +119,7 @@ class ReplayDataParser:
             case LuaDataType.NUMBER:
                 return self.read_float()
             case LuaDataType.NIL:
-                self.advance("B")
+                self.skip(UNSIGNED_CHAR.size)
                 return None
             case LuaDataType.BOOL:
                 return bool(self.read_unsigned_char())
@@ -83,11 +127,11 @@ class ReplayDataParser:
                 return self.read_string()
             case LuaDataType.TABLE_START:
                 lua_table = {}
-                while LuaDataType(self.peek("B")) != LuaDataType.TABLE_END:
+                while LuaDataType(self.peek_unsigned_char()) != LuaDataType.TABLE_END:
                     key = self.parse_lua()
                     value = self.parse_lua()
                     lua_table[key] = value
-                self.advance("B")
+                self.skip(UNSIGNED_CHAR.size)
                 return lua_table
             case _:
                 raise ValueError(f"Unknown data type: {data_type=}")
@@ -100,7 +144,12 @@ class ReplayDataParser:
     def _mapname(self, map_path: str) -> str | None:
         return map_path.split("/")[2] if map_path.startswith("/maps/") else None
 
-    def parse_header(self) -> dict[str, Any]:
+    def parse_header(self, full: bool = False) -> dict[str, Any]:
+        """
+        Parses the replay header up to the sim mods table. With 'full', also
+        parses scenario, players and armies, and leaves the offset (also saved
+        in 'body_offset') at the start of the command stream.
+        """
         header = {}
         header["game_version"] = self._game_version(self.read_string())
 
@@ -114,4 +163,265 @@ class ReplayDataParser:
         self.read_int()  # length of sim_mods table in bytes
 
         header["sim_mods"] = self.parse_lua()
+        if full:
+            self._parse_rest_of_header(header)
         return header
+
+    def _parse_rest_of_header(self, header: dict[str, Any]) -> None:
+        self.read_int()  # length of scenario table in bytes
+        header["scenario"] = self.parse_lua()
+
+        players = {}
+        for _ in range(self.read_unsigned_char()):
+            name = self.read_string()
+            players[name] = self.read_int()
+        header["players"] = players
+
+        header["cheats_enabled"] = bool(self.read_unsigned_char())
+
+        armies = {}
+        for _ in range(self.read_unsigned_char()):
+            self.read_int()  # length of army table in bytes
+            army = self.parse_lua()
+            source = self.read_unsigned_char()
+            armies[source] = army
+            if source != 255:
+                self.skip(UNSIGNED_CHAR.size)
+        header["armies"] = armies
+
+        header["random_seed"] = self.read_unsigned_int()
+        self.body_offset = self.offset
+
+
+class ReplayCommandType(IntEnum):
+    ADVANCE = 0
+    SET_COMMAND_SOURCE = 1
+    COMMAND_SOURCE_TERMINATED = 2
+    VERIFY_CHECKSUM = 3
+    REQUEST_PAUSE = 4
+    RESUME = 5
+    SINGLE_STEP = 6
+    CREATE_UNIT = 7
+    CREATE_PROP = 8
+    DESTROY_ENTITY = 9
+    WARP_ENTITY = 10
+    PROCESS_INFO_PAIR = 11
+    ISSUE_COMMAND = 12
+    ISSUE_FACTORY_COMMAND = 13
+    INCREASE_COMMAND_COUNT = 14
+    DECREASE_COMMAND_COUNT = 15
+    SET_COMMAND_TARGET = 16
+    SET_COMMAND_TYPE = 17
+    SET_COMMAND_CELLS = 18
+    REMOVE_COMMAND_FROM_QUEUE = 19
+    DEBUG_COMMAND = 20
+    EXECUTE_LUA_IN_SIM = 21
+    LUA_SIM_CALLBACK = 22
+    END_GAME = 23
+
+
+_COMMAND_TYPES = tuple(ReplayCommandType)
+
+# Commands given by players themselves, as opposed to engine bookkeeping
+APM_COMMANDS = frozenset((
+    ReplayCommandType.ISSUE_COMMAND,
+    ReplayCommandType.ISSUE_FACTORY_COMMAND,
+    ReplayCommandType.INCREASE_COMMAND_COUNT,
+    ReplayCommandType.DECREASE_COMMAND_COUNT,
+    ReplayCommandType.SET_COMMAND_TARGET,
+    ReplayCommandType.SET_COMMAND_TYPE,
+    ReplayCommandType.SET_COMMAND_CELLS,
+    ReplayCommandType.REMOVE_COMMAND_FROM_QUEUE,
+    ReplayCommandType.LUA_SIM_CALLBACK,
+))
+
+
+class ReplayCommand(NamedTuple):
+    source: int | None
+    type: ReplayCommandType | int
+    data: bytes
+
+
+class ReplayTick(NamedTuple):
+    tick: int
+    commands: list[ReplayCommand]
+
+
+class ReplayStreamParser:
+    """
+    Parses a replay from a binary stream in fixed-size chunks, so that only
+    the current chunk and tick are kept in memory however big the replay is.
+    """
+    READ_CHUNK = 64 * 1024
+
+    def __init__(self, stream: BinaryIO) -> None:
+        self.stream = stream
+        self.header: dict[str, Any] | None = None
+        self.tick = 0
+        self._buffer = b""
+        self._offset = 0
+        self._eof = False
+
+    def _fill(self, size: int) -> bool:
+        """
+        Makes sure at least 'size' unread bytes are buffered, returns False
+        if the stream ends before that.
+        """
+        if len(self._buffer) - self._offset >= size:
+            return True
+        chunks = [self._buffer[self._offset:]]
+        available = len(chunks[0])
+        while available < size and not self._eof:
+            chunk = self.stream.read(max(self.READ_CHUNK, size - available))
+            if not chunk:
+                self._eof = True
+            chunks.append(chunk)
+            available += len(chunk)
+        self._buffer = b"".join(chunks)
+        self._offset = 0
+        return available >= size
+
+    def parse_header(self) -> dict[str, Any]:
+        size = self.READ_CHUNK
+        while True:
+            self._fill(size)
+            parser = ReplayDataParser(memoryview(self._buffer)[self._offset:])
+            try:
+                self.header = parser.parse_header(full=True)
+            except struct.error:
+                if self._eof:
+                    raise
+                size *= 2
+                continue
+            self._offset += parser.body_offset
+            return self.header
+
+    def _operations(self) -> Iterator[tuple[int, bytes]]:
+        header_size = OPERATION_HEADER.size
+        while self._fill(header_size):
+            op, size = OPERATION_HEADER.unpack_from(self._buffer, self._offset)
+            if size < header_size:
+                raise ValueError(f"Invalid operation size: {size}")
+            if not self._fill(size):
+                return  # replay was cut off mid-operation
+            start = self._offset
+            self._offset += size
+            yield op, self._buffer[start + header_size:start + size]
+
+    def iter_ticks(self) -> Iterator[ReplayTick]:
+        """
+        Yields commands of every tick which has any. Ticks are counted in
+        'tick', which holds the length of the replay once we're done.
+        """
+        if self.header is None:
+            self.parse_header()
+
+        source = None
+        commands = []
+        for op, data in self._operations():
+            if op == ReplayCommandType.ADVANCE:
+                if commands:
+                    yield ReplayTick(self.tick, commands)
+                    commands = []
+                self.tick += UINT.unpack_from(data)[0]
+            elif op == ReplayCommandType.SET_COMMAND_SOURCE:
+                source = data[0]
+            else:
+                op = _COMMAND_TYPES[op] if op < len(_COMMAND_TYPES) else op
+                commands.append(ReplayCommand(source, op, data))
+        if commands:
+            yield ReplayTick(self.tick, commands)
+
+
+class ReplaySummary:
+    """
+    Per-player statistics of a replay, collected from its command stream.
+    """
+    # How many ticks back to keep checksums around for comparison
+    CHECKSUM_WINDOW = 100
+
+    def __init__(self, header: dict[str, Any]) -> None:
+        self.header = header
+        self.players = list(header.get("players", {}))
+        self.ticks = 0
+        self.command_counts: dict[int | None, Counter] = {}
+        self.desyncs: list[int] = []
+        self._checksums: dict[int, bytes] = {}
+        # Ticks of the held checksums in order of arrival, oldest first
+        self._checksum_ticks: deque[int] = deque()
+
+    @classmethod
+    def from_stream(cls, stream: BinaryIO) -> ReplaySummary:
+        parser = ReplayStreamParser(stream)
+        summary = cls(parser.parse_header())
+        for tick in parser.iter_ticks():
+            summary.add_tick(tick)
+        summary.ticks = parser.tick
+        return summary
+
+    @classmethod
+    def from_file(cls, path: str) -> ReplaySummary:
+        with open(path, "rb") as stream:
+            if not path.endswith(".fafreplay"):
+                return cls.from_stream(stream)
+
+            info = json.loads(stream.readline())
+            if info.get("compression") == "zstd":
+                decompressor = zstandard.ZstdDecompressor()
+                with decompressor.stream_reader(stream) as reader:
+                    return cls.from_stream(reader)
+
+            # Legacy replays are base64-encoded qCompress output, which
+            # is a big-endian length followed by zlib data
+            data = base64.b64decode(stream.read())
+            decompressor = zlib.decompressobj()
+            return cls.from_stream(_ZlibReader(decompressor, data[4:]))
+
+    def add_tick(self, tick: ReplayTick) -> None:
+        for command in tick.commands:
+            counts = self.command_counts.get(command.source)
+            if counts is None:
+                counts = self.command_counts[command.source] = Counter()
+            counts[command.type] += 1
+
+            if command.type == ReplayCommandType.VERIFY_CHECKSUM:
+                self._check_sync(*CHECKSUM.unpack_from(command.data))
+
+    def _check_sync(self, checksum: bytes, tick: int) -> None:
+        known = self._checksums.get(tick)
+        if known is None:
+            self._checksums[tick] = checksum
+            self._checksum_ticks.append(tick)
+        elif known != checksum and (not self.desyncs or self.desyncs[-1] != tick):
+            self.desyncs.append(tick)
+
+        oldest = tick - self.CHECKSUM_WINDOW
+        while self._checksum_ticks and self._checksum_ticks[0] < oldest:
+            del self._checksums[self._checksum_ticks.popleft()]
+
+    @property
+    def duration(self) -> float:
+        return self.ticks / TICKS_PER_SECOND
+
+    def player_name(self, source: int | None) -> str:
+        if source is not None and source < len(self.players):
+            return self.players[source]
+        return f"Source {source}"
+
+    def apm(self, source: int | None) -> float:
+        if self.ticks == 0:
+            return 0.0
+        counts = self.command_counts.get(source, {})
+        actions = sum(counts.get(command, 0) for command in APM_COMMANDS)
+        return actions * 60 / self.duration
+
+
+class _ZlibReader:
+    def __init__(self, decompressor: Any, data: bytes) -> None:
+        self._decompressor = decompressor
+        self._data = data
+
+    def read(self, size: int) -> bytes:
+        chunk = self._decompressor.decompress(self._data, size)
+        self._data = self._decompressor.unconsumed_tail
+        return chunk
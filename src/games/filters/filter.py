@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import operator
+from typing import Callable
 from typing import NamedTuple
 
 from src.model.game import Game
@@ -13,6 +14,15 @@ FILTER_OPTIONS = {
     "Featured mod": str,
 }
 
+# Game attribute each filter option is checked against
+FILTER_FIELDS = {
+    "Map name": "mapdisplayname",
+    "Host name": "host",
+    "Game title": "title",
+    "Average rating": "average_rating",
+    "Featured mod": "featured_mod",
+}
+
 FILTER_OPERATIONS = {
     "contains": operator.contains,
     "starts with": str.startswith,
@@ -35,22 +45,41 @@ class GameFilter(NamedTuple):
     def serialize(self) -> str:
         return f"{self.name},{self.constraint},{self.value}"
 
-    def rejects(self, game: Game) -> bool:
+    def compile(self) -> Callable[[Game], bool]:
+        """
+        Returns a predicate that tells whether the filter rejects a game,
+        with the filter value converted once up front.
+        """
         op = FILTER_OPERATIONS[self.constraint]
-        if self.name == "Map name":
-            return op(game.mapdisplayname.casefold(), self.value.casefold())
-        elif self.name == "Host name":
-            return op(game.host.casefold(), self.value.casefold())
-        elif self.name == "Game title":
-            return op(game.title.casefold(), self.value.casefold())
-        elif self.name == "Featured mod":
-            return op(game.featured_mod.casefold(), self.value.casefold())
-        elif self.name == "Average rating":
+        field = FILTER_FIELDS.get(self.name)
+        if field is None:
+            return _never
+
+        if FILTER_OPTIONS[self.name] is str:
+            value = self.value.casefold()
+
+            def rejects(game: Game) -> bool:
+                return op(game.casefolded(field), value)
+            return rejects
+
+        try:
+            value = int(self.value)
+        except ValueError:
+            return _never
+
+        def rejects_number(game: Game) -> bool:
             try:
-                return op(game.average_rating, int(self.value))
-            except (TypeError, ValueError):
-                pass
-        return False
+                return op(getattr(game, field), value)
+            except TypeError:
+                return False
+        return rejects_number
+
+    def rejects(self, game: Game) -> bool:
+        return self.compile()(game)
 
     def accepts(self, game: Game) -> bool:
         return not self.rejects(game)
+
+
+def _never(game: Game) -> bool:
+    return False
@@ -100,6 +100,13 @@ class CustomGameFilterModel(GameSortModel):
         self._hide_private_games = False
         self._hide_modded_games = False
         self.filter_manager = GameFilterManager()
+        self._compile_filters()
+
+    def _compile_filters(self) -> None:
+        self._filters = tuple(self.filter_manager.filters)
+        self._filter_predicates = [
+            game_filter.compile() for game_filter in self._filters
+        ]
 
     def filter_accepts_game(self, game: Game) -> bool:
         if game.state != GameState.OPEN:
@@ -110,8 +117,8 @@ class CustomGameFilterModel(GameSortModel):
             return False
         if self.hide_modded_games and game.sim_mods:
             return False
-        for game_filter in self.filter_manager.filters:
-            if game_filter.rejects(game):
+        for rejects in self._filter_predicates:
+            if rejects(game):
                 return False
 
         return True
@@ -136,4 +143,7 @@ class CustomGameFilterModel(GameSortModel):
 
     def manage_filters(self) -> None:
         self.filter_manager.exec()
+        if tuple(self.filter_manager.filters) == self._filters:
+            return
+        self._compile_filters()
         self.invalidateFilter()
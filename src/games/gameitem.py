@@ -195,7 +195,8 @@ class GameItemFormatter:
         if game.password_protected:
             return util.THEME.icon("games/private_game.png")
 
-        icon = maps.preview(name)
+        # Model items take care of loading the preview
+        icon = maps.previews.cached(name)
         if icon is not None:
             return icon
 
@@ -204,7 +205,7 @@ class GameItemFormatter:
     def needed_map_preview(self, data):
         game = data.game
         name = game.mapname.lower()
-        if game.password_protected or maps.preview(name) is not None:
+        if game.password_protected or maps.previews.cached(name) is not None:
             return None
         return name
 
@@ -24,6 +24,7 @@ class GameModel(QtListModel):
         self._gameset = gameset
         if self._gameset is not None:
             self._gameset.added.connect(self.add_game)
+            self._gameset.added_batch.connect(self.add_games)
             self._gameset.newClosedGame.connect(self.remove_game)
             for game in self._gameset.values():
                 self.add_game(game)
@@ -31,6 +32,9 @@ class GameModel(QtListModel):
     def add_game(self, game):
         self._add_item(game, game.uid)
 
+    def add_games(self, games):
+        self._add_items([(game, game.uid) for game in games])
+
     def remove_game(self, game):
         self._remove_item(game.uid)
 
@@ -38,6 +38,8 @@ class GameModelItem(QObject):
         self._preview_dler = preview_dler
         self._preview_dl_request = DownloadRequest()
         self._preview_dl_request.done.connect(self._at_preview_downloaded)
+        self._downloaded_preview = None
+        maps.previews.loaded.connect(self._at_preview_loaded)
 
     @classmethod
     def builder(
@@ -64,10 +66,25 @@ class GameModelItem(QObject):
         if self.game.mapname is None:
             return
         name = self.game.mapname.lower()
-        if self.game.password_protected or maps.preview(name) is not None:
+        if self.game.password_protected or maps.previews.cached(name) is not None:
             return
-        self._preview_dler.download_preview(name, self._preview_dl_request)
+        # Look on disk first, download only if there's nothing there
+        if not maps.previews.missing(name):
+            maps.previews.request(name)
+        elif self._downloaded_preview != name:
+            self._preview_dler.download_preview(name, self._preview_dl_request)
 
-    def _at_preview_downloaded(self, mapname):
-        if mapname == self.game.mapname:
+    def _at_preview_loaded(self, mapname, found):
+        if self.game.mapname is None or mapname != self.game.mapname.lower():
+            return
+        if found:
             self.updated.emit(self)
+        else:
+            self._download_preview_if_needed()
+
+    def _at_preview_downloaded(self, filename, result):
+        _, failed = result
+        if not failed:
+            # Don't download again if the preview turns out to be unusable
+            self._downloaded_preview = filename.removesuffix(".png")
+            self._download_preview_if_needed()
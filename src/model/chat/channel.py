@@ -1,3 +1,4 @@
+from collections import deque
 from enum import Enum
 
 from PyQt6.QtCore import QObject
@@ -31,12 +32,23 @@ class ChannelID:
 
 
 class Lines(QObject):
+    """
+    Lines of a channel, oldest first. Lines are removed from the front, and
+    can be written to a log as they are, so they don't have to be kept in
+    memory for scrollback.
+    """
     added = pyqtSignal()
     removed = pyqtSignal(int)
 
-    def __init__(self):
+    def __init__(self, log=None):
         QObject.__init__(self)
-        self._lines = []
+        # Appending and removing from the front don't move the other lines
+        self._lines = deque()
+        self._log = log
+
+    @property
+    def log(self):
+        return self._log
 
     def add_line(self, line):
         self._lines.append(line)
@@ -48,7 +60,9 @@ class Lines(QObject):
             raise ValueError
         if number == 0:
             return
-        del self._lines[0:number]
+        removed = [self._lines.popleft() for _ in range(number)]
+        if self._log is not None:
+            self._log.write(removed)
         self.removed.emit(number)
 
     def __getitem__(self, n):
@@ -63,6 +77,8 @@ class Lines(QObject):
 
 class Channel(ModelItem):
     added_chatter = pyqtSignal(object)
+    # Chatters added with add_chatters are reported once, as a list
+    added_chatters = pyqtSignal(list)
     removed_chatter = pyqtSignal(object)
 
     def __init__(self, id_, lines, topic, is_base=False):
@@ -97,6 +113,12 @@ class Channel(ModelItem):
         self.chatters[cc.id_key] = cc
         _transaction.emit(self.added_chatter, cc)
 
+    @transactional
+    def add_chatters(self, ccs, _transaction=None):
+        for cc in ccs:
+            self.chatters[cc.id_key] = cc
+        _transaction.emit(self.added_chatters, ccs)
+
     @transactional
     def remove_chatter(self, cc, _transaction=None):
         del self.chatters[cc.id_key]
@@ -1,8 +1,12 @@
+from PyQt6.QtCore import pyqtSignal
+
 from src.model.modelitemset import ModelItemSet
 from src.model.transaction import transactional
 
 
 class ChannelChatterset(ModelItemSet):
+    before_added_batch = pyqtSignal(list, object)
+
     def __init__(self):
         ModelItemSet.__init__(self)
 
@@ -11,6 +15,14 @@ class ChannelChatterset(ModelItemSet):
         ModelItemSet.set_item(self, key, cc, _transaction)
         self.emit_added(cc, _transaction)
 
+    @transactional
+    def set_items(self, ccs, _transaction=None):
+        if not ccs:
+            return
+        ModelItemSet.set_items(self, ccs, _transaction)
+        _transaction.emit(self.added_batch, ccs)
+        self.before_added_batch.emit(ccs, _transaction)
+
     @transactional
     def del_item(self, key, _transaction=None):
         chatter = ModelItemSet.del_item(self, key, _transaction)
@@ -54,6 +66,7 @@ class ChannelChatterRelation:
         self._index = ChatterChannelIndex()
 
         self._channelchatters.before_added.connect(self._new_cc)
+        self._channelchatters.before_added_batch.connect(self._new_ccs)
         self._channelchatters.before_removed.connect(self._removed_cc)
         self._chatters.before_removed.connect(self._removed_chatter)
         self._channels.before_removed.connect(self._removed_channel)
@@ -63,6 +76,15 @@ class ChannelChatterRelation:
         cc.channel.add_chatter(cc, _transaction)
         cc.chatter.add_channel(cc, _transaction)
 
+    def _new_ccs(self, ccs, _transaction=None):
+        by_channel = {}
+        for cc in ccs:
+            self._index.add_cc(cc)
+            cc.chatter.add_channel(cc, _transaction)
+            by_channel.setdefault(cc.channel, []).append(cc)
+        for channel, channel_ccs in by_channel.items():
+            channel.add_chatters(channel_ccs, _transaction)
+
     def _removed_cc(self, cc, _transaction=None):
         self._index.remove_cc(cc)
         cc.channel.remove_chatter(cc, _transaction)
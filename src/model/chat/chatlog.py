@@ -0,0 +1,116 @@
+import json
+import logging
+import os
+import re
+
+from src.model.chat.chatline import ChatLine
+from src.model.chat.chatline import ChatLineType
+
+logger = logging.getLogger(__name__)
+
+
+class ChatLog:
+    """
+    Lines trimmed from a channel, appended to a file with one json array of
+    time, type, sender and text per line, and read back from the end for
+    scrollback. Once the file grows past MAX_SIZE it's moved aside to
+    <name>.log.1, replacing the previous one, and a new file is started.
+    """
+    MAX_SIZE = 1024 * 1024
+    READ_BLOCK = 64 * 1024
+
+    def __init__(self, path):
+        self.path = path
+        # Bumped when the file is moved aside, so positions of lines read
+        # before tell which file the lines are in now
+        self.generation = 0
+
+    @classmethod
+    def for_channel(cls, folder, cid):
+        name = re.sub(r"[^\w#.-]", "_", cid.name)
+        return cls(os.path.join(folder, "{}.log".format(name)))
+
+    def write(self, lines):
+        """
+        Appends lines as kept in channel lines, with the chat line and its
+        metadata.
+        """
+        entries = "".join(
+            json.dumps(
+                [data.line.time, data.line.type.value, data.line.sender, data.line.text],
+                ensure_ascii=False,
+            ) + "\n"
+            for data in lines
+        )
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._rotate()
+            with open(self.path, "a", encoding="utf-8") as log:
+                log.write(entries)
+        except OSError:
+            logger.exception("Could not write chat log {}".format(self.path))
+
+    def _rotate(self):
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if size >= self.MAX_SIZE:
+            os.replace(self.path, "{}.1".format(self.path))
+            self.generation += 1
+
+    def read_back(self, position, count):
+        """
+        Reads up to count lines logged before position, or before the end
+        of the log if it's None. Returns (position, chat line) pairs, oldest
+        first, that positions for further reading can be taken from. Once the
+        file is read, reading goes on in the one moved aside.
+        """
+        generation, end = (self.generation, None) if position is None else position
+        lines = []
+        while len(lines) < count and generation >= self.generation - 1:
+            path = self.path if generation == self.generation else "{}.1".format(self.path)
+            read = self._read_file_back(path, end, count - len(lines))
+            lines[:0] = [((generation, offset), line) for offset, line in read]
+            generation, end = generation - 1, None
+        return lines
+
+    def _read_file_back(self, path, end, count):
+        try:
+            with open(path, "rb") as log:
+                if end is None:
+                    end = log.seek(0, os.SEEK_END)
+                start = end
+                data = b""
+                # One more line end than lines, so the first line is whole
+                while start > 0 and data.count(b"\n") <= count:
+                    step = min(self.READ_BLOCK, start)
+                    start -= step
+                    log.seek(start)
+                    data = log.read(step) + data
+        except FileNotFoundError:
+            return []
+        except OSError:
+            logger.exception("Could not read chat log {}".format(path))
+            return []
+
+        # Anything after the last line end wasn't written completely
+        entries = data.split(b"\n")[:-1]
+        if start > 0:
+            start += len(entries.pop(0)) + 1
+        lines = []
+        offset = start
+        for entry in entries:
+            line = self._parse(entry)
+            if line is not None:
+                lines.append((offset, line))
+            offset += len(entry) + 1
+        return lines[-count:]
+
+    @staticmethod
+    def _parse(entry):
+        try:
+            time, type_, sender, text = json.loads(entry)
+            return ChatLine(sender, text, ChatLineType(type_), time)
+        except (ValueError, TypeError):
+            return None
@@ -46,6 +46,16 @@ class Game(ModelItem):
     OBSERVER_TEAMS = ['-1', 'null']
     LIVE_REPLAY_DELAY_SECS = 60 * 5
 
+    _data_fields = (
+        "state", "launched_at", "num_players", "max_players", "title", "host",
+        "mapname", "map_file_path", "teams", "featured_mod", "sim_mods",
+        "password_protected", "visibility",
+    )
+    __slots__ = _data_fields + (
+        "_playerset", "uid", "_aborted", "_casefolded", "_live_replay_timer",
+        "has_live_replay",
+    )
+
     def __init__(
         self,
         playerset,
@@ -71,25 +81,24 @@ class Game(ModelItem):
         self._playerset = playerset
 
         self.uid = uid
-        self.add_field("state", state)
-        self.add_field("launched_at", launched_at)
-        self.add_field("num_players", num_players)
-        self.add_field("max_players", max_players)
-        self.add_field("title", title)
-        self.add_field("host", host)
-        self.add_field("mapname", mapname)
-        self.add_field("map_file_path", map_file_path)
-        self.add_field("teams", teams)
-        self.add_field("featured_mod", featured_mod)
-        self.add_field("sim_mods", sim_mods)
-        self.add_field("password_protected", password_protected)
-        self.add_field("visibility", visibility)
+        self.state = state
+        self.launched_at = launched_at
+        self.num_players = num_players
+        self.max_players = max_players
+        self.title = title
+        self.host = host
+        self.mapname = mapname
+        self.map_file_path = map_file_path
+        self.teams = teams
+        self.featured_mod = featured_mod
+        self.sim_mods = sim_mods
+        self.password_protected = password_protected
+        self.visibility = visibility
         self._aborted = False
+        self._casefolded = {}
 
-        self._live_replay_timer = QTimer()
-        self._live_replay_timer.setSingleShot(True)
-        self._live_replay_timer.setInterval(self.LIVE_REPLAY_DELAY_SECS * 1000)
-        self._live_replay_timer.timeout.connect(self._emit_live_replay)
+        # Created once the game is playing
+        self._live_replay_timer = None
         self.has_live_replay = False
         self._check_live_replay_timer()
 
@@ -97,9 +106,20 @@ class Game(ModelItem):
     def id_key(self):
         return self.uid
 
-    def copy(self):
-        old = Game(self._playerset, self.uid, **self.field_dict)
+    def copy(self, **changed):
+        """
+        Returns a copy, with the given fields replaced. Copies are only
+        snapshots for update signals, so they don't track live replays.
+        """
+        old = Game.__new__(Game)
+        ModelItem.__init__(old)
+        old._playerset = self._playerset
+        old.uid = self.uid
+        for name in self._data_fields:
+            setattr(old, name, changed.get(name, getattr(self, name)))
         old._aborted = self._aborted
+        old._casefolded = {}
+        old._live_replay_timer = None
         old.has_live_replay = self.has_live_replay
         return old
 
@@ -109,20 +129,27 @@ class Game(ModelItem):
             return
 
         _transaction = kwargs.pop("_transaction")
-        old = self.copy()
-        ModelItem.update(self, **kwargs)
+        # Updates that change nothing aren't emitted
+        changed = ModelItem.update(self, **kwargs)
+        if not changed:
+            return
+        self._casefolded.clear()
         self._check_live_replay_timer()
-        self.emit_update(old, _transaction)
+        self.emit_update(self.copy(**changed), _transaction)
 
     def _check_live_replay_timer(self) -> None:
         if (
             self.state != GameState.PLAYING
-            or self._live_replay_timer.isActive()
             or self.launched_at is None
+            or self.has_live_replay
         ):
             return
 
-        if self.has_live_replay:
+        if self._live_replay_timer is None:
+            self._live_replay_timer = QTimer()
+            self._live_replay_timer.setSingleShot(True)
+            self._live_replay_timer.timeout.connect(self._emit_live_replay)
+        elif self._live_replay_timer.isActive():
             return
 
         time_elapsed = round(time.time() - self.launched_at, 0)
@@ -137,6 +164,14 @@ class Game(ModelItem):
         _transaction.emit(self.liveReplayAvailable, self)
         self.before_replay_available.emit(self, _transaction)
 
+    def casefolded(self, name):
+        # Used by game filters, cached until the next update
+        try:
+            return self._casefolded[name]
+        except KeyError:
+            value = self._casefolded[name] = getattr(self, name).casefold()
+            return value
+
     def closed(self):
         return self.state == GameState.CLOSED or self._aborted
 
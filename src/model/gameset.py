@@ -39,6 +39,46 @@ class Gameset(ModelItemSet):
         self._logger.debug("Added game, uid {}".format(value.id_key))
         self.emit_added(value, _transaction)
 
+    @transactional
+    def set_items(self, values, _transaction=None):
+        for value in values:
+            if not isinstance(value, game.Game):
+                raise TypeError
+            if value.closed():
+                raise ValueError
+
+        ModelItemSet.set_items(self, values, _transaction)
+        for value in values:
+            value.before_updated.connect(self._at_game_update)
+            value.before_replay_available.connect(self._at_live_replay)
+            self._new_state(value, _transaction)
+        self._logger.debug("Added {} games".format(len(values)))
+        self.emit_added_batch(values, _transaction)
+
+    @transactional
+    def apply_batch(self, messages, _transaction=None):
+        """
+        Creates or updates games from a list of game_info messages, such as
+        the one the server sends after login. New games are added together,
+        so listeners get a single added_batch signal for all of them.
+        """
+        new_games = {}
+        for m in messages:
+            if not game.message_to_game_args(m):
+                continue
+            uid = m["uid"]
+            if uid in self:
+                self[uid].update(**m, _transaction=_transaction)
+            elif uid in new_games:
+                new_games[uid].update(**m, _transaction=_transaction)
+            else:
+                new_games[uid] = game.Game(playerset=self._playerset, **m)
+
+        self.set_items(
+            [g for g in new_games.values() if not g.closed()],
+            _transaction,
+        )
+
     @transactional
     def del_item(self, key, _transaction=None):
         g = ModelItemSet.del_item(self, key, _transaction)
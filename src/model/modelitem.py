@@ -8,12 +8,15 @@ class ModelItem(QObject):
     updated = pyqtSignal(object, object)
     before_updated = pyqtSignal(object, object, object)
 
+    # Items we keep many of declare their fields here, with __slots__ for
+    # them, instead of adding them one by one
+    _data_fields = ()
+
     def __init__(self):
         QObject.__init__(self)
-        self._data_fields = []
 
     def add_field(self, name, default):
-        self._data_fields.append(name)
+        self._data_fields = (*self._data_fields, name)
         setattr(self, name, default)
 
     @property
@@ -24,10 +27,20 @@ class ModelItem(QObject):
         raise NotImplementedError
 
     def update(self, **kwargs):
+        """
+        Sets the given fields and returns the previous values of those that
+        changed.
+        """
+        changed = {}
         # Ignore unknown fields for convenience
         for f in self._data_fields:
             if f in kwargs:
-                setattr(self, f, kwargs[f])
+                old = getattr(self, f)
+                new = kwargs[f]
+                if new != old:
+                    changed[f] = old
+                    setattr(self, f, new)
+        return changed
 
     @transactional
     def emit_update(self, old, _transaction=None):
@@ -7,6 +7,9 @@ from src.model.transaction import transactional
 class ModelItemSet(QObjectMapping):
     added = pyqtSignal(object)
     removed = pyqtSignal(object)
+    # Items added with set_items are reported once, as a list, instead of
+    # through 'added'
+    added_batch = pyqtSignal(list)
     before_added = pyqtSignal(object, object)
     before_removed = pyqtSignal(object, object)
 
@@ -28,6 +31,13 @@ class ModelItemSet(QObjectMapping):
         _transaction.emit(self.added, value)
         self.before_added.emit(value, _transaction)
 
+    def emit_added_batch(self, values, _transaction=None):
+        if not values:
+            return
+        _transaction.emit(self.added_batch, values)
+        for value in values:
+            self.before_added.emit(value, _transaction)
+
     def emit_removed(self, value, _transaction=None):
         _transaction.emit(self.removed, value)
         self.before_removed.emit(value, _transaction)
@@ -40,6 +50,14 @@ class ModelItemSet(QObjectMapping):
             raise ValueError
         self._items[key] = value
 
+    @transactional
+    def set_items(self, values, _transaction=None):
+        for value in values:
+            if value.id_key in self:
+                raise ValueError
+        for value in values:
+            self._items[value.id_key] = value
+
     def __setitem__(self, key, value):
         # CAVEAT: use only as an entry point for model changes.
         self.set_item(key, value)
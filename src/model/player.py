@@ -12,6 +12,8 @@ class Player(ModelItem):
     """
     Represents a player the client knows about.
     """
+    _data_fields = ("avatar", "country", "clan", "league", "ratings")
+    __slots__ = _data_fields + ("id", "login", "_currentGame")
 
     def __init__(
         self,
@@ -33,11 +35,11 @@ class Player(ModelItem):
         self.id = int(id_)
         self.login = login
 
-        self.add_field("avatar", avatar)
-        self.add_field("country", country)
-        self.add_field("clan", clan)
-        self.add_field("league", league)
-        self.add_field("ratings", ratings)
+        self.avatar = avatar
+        self.country = country
+        self.clan = clan
+        self.league = league
+        self.ratings = ratings
 
         # The game the player is currently playing
         self._currentGame = None
@@ -46,18 +48,22 @@ class Player(ModelItem):
     def id_key(self):
         return self.id
 
-    def copy(self):
-        p = Player(self.id, self.login, **self.field_dict)
-        p.currentGame = self.currentGame
+    def copy(self, **changed):
+        """
+        Returns a copy, with the given fields replaced.
+        """
+        p = Player(self.id, self.login, **{**self.field_dict, **changed})
+        p._currentGame = self._currentGame
         return p
 
     @transactional
     def update(self, **kwargs):
         _transaction = kwargs.pop("_transaction")
 
-        old_data = self.copy()
-        ModelItem.update(self, **kwargs)
-        self.emit_update(old_data, _transaction)
+        # Updates that change nothing aren't emitted
+        changed = ModelItem.update(self, **kwargs)
+        if changed:
+            self.emit_update(self.copy(**changed), _transaction)
 
     def __index__(self):
         return self.id
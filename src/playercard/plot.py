@@ -139,23 +139,62 @@ class Crosshairs:
 
 
 class LineSeries:
+    """
+    Points sorted by x. Storage grows geometrically, so adding points in
+    order doesn't copy all of them every time.
+    """
+
     def __init__(self, size: int = 0) -> None:
         self._x: np.ndarray = np.zeros(size)
         self._y: np.ndarray = np.zeros(size)
+        self._size = size
+
+    @classmethod
+    def from_arrays(cls, x: np.ndarray, y: np.ndarray) -> LineSeries:
+        series = cls()
+        series._x = np.asarray(x, dtype=float)
+        series._y = np.asarray(y, dtype=float)
+        series._size = len(series._x)
+        return series
+
+    def __len__(self) -> int:
+        return self._size
 
     def x(self) -> np.ndarray:
-        return self._x
+        return self._x[:self._size]
 
     def y(self) -> np.ndarray:
-        return self._y
+        return self._y[:self._size]
 
     def set_point(self, index: int, point: QPointF) -> None:
         self._x[index] = point.x()
         self._y[index] = point.y()
 
+    def _reserve(self, size: int) -> None:
+        if size <= len(self._x):
+            return
+        capacity = max(size, 2 * len(self._x))
+        for name in ("_x", "_y"):
+            grown = np.empty(capacity)
+            grown[:self._size] = getattr(self, name)[:self._size]
+            setattr(self, name, grown)
+
     def extend(self, series: LineSeries) -> None:
-        self._x = np.append(self._x, series.x())
-        self._y = np.append(self._y, series.y())
+        count = len(series)
+        if count == 0:
+            return
+        if self._size and series.x()[0] < self._x[self._size - 1]:
+            # Points from earlier, like from a page that arrived late
+            x = np.concatenate((self.x(), series.x()))
+            order = np.argsort(x, kind="stable")
+            self._x = x[order]
+            self._y = np.concatenate((self.y(), series.y()))[order]
+            self._size = len(self._x)
+            return
+        self._reserve(self._size + count)
+        self._x[self._size:self._size + count] = series.x()
+        self._y[self._size:self._size + count] = series.y()
+        self._size += count
 
     def point_at(self, index: int) -> QPointF:
         return QPointF(self._x[index], self._y[index])
@@ -167,6 +206,7 @@ class PlotController:
         self.widget.setBackground("#202025")
         self.widget.setAxisItems({"bottom": DateAxisItem()})
         self.series = LineSeries()
+        self.curve: pg.PlotDataItem | None = None
         self.crosshairs = Crosshairs(self.widget, self.series)
         self.hide_scene_actions()
         self.hide_irrelevant_plot_actions()
@@ -174,9 +214,23 @@ class PlotController:
 
     def clear(self) -> None:
         self.widget.clear()
+        self.curve = None
+
+    def clear_data(self) -> None:
+        self.series = LineSeries()
+        self.crosshairs.set_series(self.series)
+        if self.curve is not None:
+            self.curve.setData(self.series.x(), self.series.y())
 
     def draw_series(self) -> None:
-        self.widget.plot(self.series.x(), self.series.y(), pen=pg.mkPen("orange"))
+        """
+        Draws the series, replacing the data of the curve drawn before, so
+        it can be called as data arrives.
+        """
+        if self.curve is None:
+            self.curve = self.widget.plot(self.series.x(), self.series.y(), pen=pg.mkPen("orange"))
+        else:
+            self.curve.setData(self.series.x(), self.series.y())
         self.widget.autoRange()
 
     def add_data(self, series: LineSeries) -> None:
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
+import numpy as np
 import pyqtgraph as pg
 from PyQt6.QtCore import QDateTime
 from PyQt6.QtCore import QObject
-from PyQt6.QtCore import QPointF
 from PyQt6.QtCore import Qt
 from PyQt6.QtCore import QThread
 from PyQt6.QtCore import pyqtSignal
@@ -12,13 +12,32 @@ from PyQt6.QtWidgets import QTabWidget
 from src.api.models.Leaderboard import Leaderboard
 from src.api.stats_api import LeaderboardApiConnector
 from src.api.stats_api import LeaderboardRatingJournalApiConnector
-from src.model.rating import Rating
 from src.playercard.plot import LineSeries
 from src.playercard.plot import PlotController
 
 
+def parse_iso_times(times: list[str]) -> np.ndarray:
+    """
+    Converts ISO 8601 UTC timestamps like 2020-01-01T12:00:00Z into seconds
+    since epoch, all at once.
+    """
+    try:
+        stamps = np.array([time.removesuffix("Z") for time in times], dtype="datetime64[ms]")
+    except ValueError:
+        # Leave anything numpy doesn't understand to Qt
+        return np.fromiter(
+            (
+                QDateTime.fromString(time, Qt.DateFormat.ISODate).toSecsSinceEpoch()
+                for time in times
+            ),
+            dtype=float,
+            count=len(times),
+        )
+    return stamps.astype(np.int64) // 1000
+
+
 class LineSeriesParser(QThread):
-    result_ready = pyqtSignal(LineSeries)
+    result_ready = pyqtSignal(int, LineSeries)
 
     def __init__(self, unparsed_api_response: dict) -> None:
         QThread.__init__(self)
@@ -28,46 +47,30 @@ class LineSeriesParser(QThread):
         self.parse()
 
     def parse(self) -> None:
+        page = self.data["meta"]["page"]["number"]
         journal = self.data["data"]
-        journal_leng = len(journal)
-
-        if journal_leng == 0:
-            self.result_ready.emit(LineSeries())
-            return
-
-        stats = self.data["included"]
-        stats_leng = len(stats)
-
-        series = LineSeries(stats_leng)
-
-        stats_index = journal_index = 0
-        while stats_index < stats_leng and journal_index < journal_leng:
-            if (
-                stats[stats_index]["id"]
-                != journal[journal_index]["relationships"]["gamePlayerStats"]["data"]["id"]
-            ):
-                journal_index += 1
-                continue
-
-            score_time_str = stats[stats_index]["attributes"]["scoreTime"]
-            score_time = QDateTime.fromString(score_time_str, Qt.DateFormat.ISODate)
-            # not creating additional objects (like Rating and QPointF)
-            # and not accessing their attributes in a loop will also give small
-            # improvement, but not quite noticeable (a few hundreds of a second
-            # per 10000 loop cycles -- ~10x less than API call deviation)
-            rating = Rating(
-                journal[journal_index]["attributes"]["meanAfter"],
-                journal[journal_index]["attributes"]["deviationAfter"],
-            )
-            point = QPointF(
-                score_time.toSecsSinceEpoch(),
-                rating.displayed(),
-            )
-            series.set_point(stats_index, point)
-            stats_index += 1
-            journal_index += 1
-
-        self.result_ready.emit(series)
+        score_times = {
+            stats["id"]: stats["attributes"]["scoreTime"]
+            for stats in self.data.get("included", ())
+        }
+
+        # Entries whose game stats weren't included are skipped
+        times = []
+        entries = []
+        for entry in journal:
+            score_time = score_times.get(entry["relationships"]["gamePlayerStats"]["data"]["id"])
+            if score_time is not None:
+                times.append(score_time)
+                entries.append(entry["attributes"])
+
+        count = len(entries)
+        means = np.fromiter((entry["meanAfter"] for entry in entries), dtype=float, count=count)
+        deviations = np.fromiter(
+            (entry["deviationAfter"] for entry in entries), dtype=float, count=count,
+        )
+        # Same as Rating.displayed()
+        ratings = means - 3 * deviations
+        self.result_ready.emit(page, LineSeries.from_arrays(parse_iso_times(times), ratings))
 
 
 class RatingsPlotTab(QObject):
@@ -86,8 +89,11 @@ class RatingsPlotTab(QObject):
         self.leaderboard = leaderboard
         self.ratings_history_api = LeaderboardRatingJournalApiConnector()
         self.ratings_history_api.ratings_ready.connect(self.process_rating_history)
+        self.ratings_history_api.history_failed.connect(self.on_history_failed)
         self.plot = plot
         self._loaded = False
+        self._total_pages: int | None = None
+        self._parsed_pages: set[int] = set()
         self.workers = []
 
     def __del__(self) -> None:
@@ -101,7 +107,7 @@ class RatingsPlotTab(QObject):
             pass
 
     def enter(self) -> None:
-        if self._loaded:
+        if self._loaded or self._total_pages is not None:
             return
         self.name_changed.emit(self.index, "Loading...")
         self.ratings_history_api.get_full_history(self.player_id, self.leaderboard.technical_name)
@@ -112,24 +118,37 @@ class RatingsPlotTab(QObject):
                 worker.quit()
         self.workers.clear()
 
+    def on_history_failed(self) -> None:
+        # Start over the next time the tab is entered, without the pages
+        # still being parsed
+        for worker in self.workers:
+            worker.result_ready.disconnect(self.data_parsed)
+            worker.wait()
+        self.workers.clear()
+        self._total_pages = None
+        self._parsed_pages.clear()
+        self.plot.clear_data()
+        self.name_changed.emit(self.index, self.leaderboard.pretty_name)
+
     def finish(self) -> None:
+        self._loaded = True
         self.clear_threads()
-        self.plot.draw_series()
         self.name_changed.emit(self.index, self.leaderboard.pretty_name)
 
     def process_rating_history(self, message: dict) -> None:
-        total_pages = message["meta"]["page"]["totalPages"]
-        current_page = message["meta"]["page"]["number"]
-        self._loaded = current_page >= total_pages
+        self._total_pages = message["meta"]["page"]["totalPages"]
 
         worker = LineSeriesParser(message)
         self.workers.append(worker)
         worker.result_ready.connect(self.data_parsed)
         worker.start()
 
-    def data_parsed(self, series: LineSeries) -> None:
+    def data_parsed(self, page: int, series: LineSeries) -> None:
+        # Pages are drawn as they arrive
+        self._parsed_pages.add(page)
         self.plot.add_data(series)
-        if self._loaded:
+        self.plot.draw_series()
+        if len(self._parsed_pages) >= self._total_pages:
             self.finish()
 
 
@@ -1,15 +1,40 @@
 from PyQt6.QtCore import QAbstractListModel
 from PyQt6.QtCore import QModelIndex
 from PyQt6.QtCore import Qt
+from PyQt6.QtCore import QTimer
 
 
 class QtListModel(QAbstractListModel):
+    """
+    List model of items built from arbitrary data and identified by an id.
+
+    Rows of items are cached, so lookups don't scan the whole list. Removing a
+    row shifts all rows after it, so instead of rewriting the cache every
+    time, each entry remembers how many removals happened when it was stored.
+    The real row can only have moved back by at most the number of removals
+    since then, and is searched for in that window only. The window grows
+    with removals until the item is looked up again, up to the item's row,
+    so a lookup is only O(1) for items looked up regularly. Rebuilding the
+    cache to keep windows small was measured to be slower than searching
+    them, as list.index is cheap next to rebuilding a dict of all rows.
+    """
+
     def __init__(self, item_builder):
         QAbstractListModel.__init__(self)
         self._items = {}
         self._itemlist = []  # For queries
         self._item_builder = item_builder
 
+        self._rows = {}  # item -> (row, removal count when cached)
+        self._removals = 0
+
+        # Items updated since last event loop iteration
+        self._updated_items = {}
+        self._update_timer = QTimer(self)
+        self._update_timer.setSingleShot(True)
+        self._update_timer.setInterval(0)
+        self._update_timer.timeout.connect(self._emit_data_changed)
+
     def rowCount(self, parent: QModelIndex = QModelIndex()) -> int:
         if parent.isValid():
             return 0
@@ -22,25 +47,49 @@ class QtListModel(QAbstractListModel):
             return None
         return self._itemlist[index.row()]
 
-    # TODO - insertion and removal are O(n).
-    def _add_item(self, data, id_):
+    def _row(self, item):
+        row, removals = self._rows[item]
+        shift = self._removals - removals
+        if shift:
+            row = self._itemlist.index(item, max(0, row - shift), row + 1)
+            self._rows[item] = (row, self._removals)
+        return row
+
+    def _append(self, data, id_):
         assert id_ not in self._items
-        next_index = len(self._itemlist)
-        self.beginInsertRows(QModelIndex(), next_index, next_index)
         item = self._item_builder(data)
         item.updated.connect(self._at_item_updated)
         self._items[id_] = item
+        self._rows[item] = (len(self._itemlist), self._removals)
         self._itemlist.append(item)
+
+    def _add_item(self, data, id_):
+        next_index = len(self._itemlist)
+        self.beginInsertRows(QModelIndex(), next_index, next_index)
+        self._append(data, id_)
+        self.endInsertRows()
+
+    def _add_items(self, items):
+        if not items:
+            return
+        first_index = len(self._itemlist)
+        self.beginInsertRows(QModelIndex(), first_index, first_index + len(items) - 1)
+        for data, id_ in items:
+            self._append(data, id_)
         self.endInsertRows()
 
     def _remove_item(self, id_):
         assert id_ in self._items
         item = self._items[id_]
-        item_index = self._itemlist.index(item)
+        item_index = self._row(item)
         self.beginRemoveRows(QModelIndex(), item_index, item_index)
         item.updated.disconnect(self._at_item_updated)
         del self._items[id_]
+        del self._rows[item]
+        self._updated_items.pop(item, None)
         self._itemlist.pop(item_index)
+        if item_index < len(self._itemlist):
+            self._removals += 1
         self.endRemoveRows()
 
     def _clear_items(self):
@@ -49,9 +98,27 @@ class QtListModel(QAbstractListModel):
             item.updated.disconnect(self._at_item_updated)
         self._items.clear()
         self._itemlist.clear()
+        self._rows.clear()
+        self._updated_items.clear()
+        self._removals = 0
         self.endRemoveRows()
 
     def _at_item_updated(self, item):
-        item_index = self._itemlist.index(item)
-        index = self.index(item_index, 0)
-        self.dataChanged.emit(index, index)
+        self._updated_items[item] = None
+        if not self._update_timer.isActive():
+            self._update_timer.start()
+
+    def _emit_data_changed(self):
+        rows = sorted(self._row(item) for item in self._updated_items)
+        self._updated_items.clear()
+        if not rows:
+            return
+
+        # Emit one signal per contiguous range of updated rows
+        start = end = rows[0]
+        for row in rows[1:]:
+            if row != end + 1:
+                self.dataChanged.emit(self.index(start, 0), self.index(end, 0))
+                start = row
+            end = row
+        self.dataChanged.emit(self.index(start, 0), self.index(end, 0))
@@ -1,9 +1,7 @@
-import json
 import logging
 import os
 import time
 
-from pydantic import ValidationError
 from PyQt6 import QtCore
 from PyQt6 import QtGui
 from PyQt6 import QtWidgets
@@ -21,8 +19,10 @@ from src.api.stats_api import LeaderboardApiConnector
 from src.config import Settings
 from src.downloadManager import DownloadRequest
 from src.fa.replay import replay
+from src.fa.replayparser import ReplaySummary
 from src.model.game import GameState
-from src.replays.models import MetadataModel
+from src.replays.replayindex import LocalReplayIndex
+from src.replays.replayindex import LocalReplayIndexWorker
 from src.replays.replayitem import ReplayItem
 from src.replays.replayitem import ReplayItemDelegate
 from src.replays.replayToolbox import ReplayToolboxHandler
@@ -290,40 +290,15 @@ class LiveReplaysWidgetHandler(object):
         del self.games[game]
 
 
-class ReplayMetadata:
-    def __init__(self, data: str) -> None:
-        self.raw_data = data
-        self.is_broken = False
-        self.model: MetadataModel | None = None
-
-        try:
-            json_data = json.loads(data)
-        except json.decoder.JSONDecodeError:
-            self.is_broken = True
-            return
-
-        try:
-            self.model = MetadataModel(**json_data)
-        except ValidationError:
-            self.is_broken = True
-
-    @property
-    def is_incomplete(self) -> bool:
-        if self.model is None:
-            return True
-        return not self.model.complete
-
-    def launch_time(self) -> float:
-        if self.model.launched_at > 0:
-            return self.model.launched_at
-        return self.model.game_time
-
-
 class LocalReplayItem(QtWidgets.QTreeWidgetItem):
     def __init__(self, replay_file, metadata=None):
         QtWidgets.QTreeWidgetItem.__init__(self)
         self._replay_file = replay_file
         self._metadata = metadata
+        self._summary = None
+        self._summarized = False
+        # Map previews are only looked up once the item is shown
+        self._show_preview = False
         self._map_dl_request = DownloadRequest()
         self._map_dl_request.done.connect(self._map_preview_downloaded)
         self._setup_appearance()
@@ -331,6 +306,30 @@ class LocalReplayItem(QtWidgets.QTreeWidgetItem):
     def replay_path(self):
         return os.path.join(util.REPLAY_DIR, self._replay_file)
 
+    def summarized(self) -> bool:
+        return self._summarized
+
+    def set_summary(self, summary: ReplaySummary | None) -> None:
+        self._summary = summary
+        self._summarized = True
+
+    def summary_text(self) -> str:
+        summary = self._summary
+        if summary is None:
+            return "Could not read the replay."
+
+        minutes, seconds = divmod(int(summary.duration), 60)
+        lines = [f"Duration: {minutes}:{seconds:02d}"]
+        for source in sorted(summary.command_counts, key=lambda s: (s is None, s)):
+            if source is None:
+                continue
+            name = summary.player_name(source)
+            lines.append(f"{name}: {summary.apm(source):.0f} APM")
+        if summary.desyncs:
+            ticks = ", ".join(map(str, summary.desyncs[:10]))
+            lines.append(f"Desyncs: {len(summary.desyncs)} (at ticks {ticks})")
+        return "\n".join(lines)
+
     def _setup_appearance(self):
         if self._metadata is None:
             self._setup_no_metadata_appearance()
@@ -364,19 +363,20 @@ class LocalReplayItem(QtWidgets.QTreeWidgetItem):
         self.setForeground(1, QtGui.QColor("yellow"))
 
     def _setup_complete_appearance(self) -> None:
-        data = self._metadata.model
+        data = self._metadata
         launch_time = time.localtime(self._metadata.launch_time())
         try:
             game_time = time.strftime("%H:%M", launch_time)
         except ValueError:
             game_time = "Unknown"
 
-        icon = fa.maps.preview(data.mapname)
+        icon = fa.maps.preview(data.mapname) if self._show_preview else None
         if icon:
             self.setIcon(0, icon)
         else:
-            dler = client.instance.map_preview_downloader
-            dler.download_preview(data.mapname, self._map_dl_request)
+            if self._show_preview:
+                dler = client.instance.map_preview_downloader
+                dler.download_preview(data.mapname, self._map_dl_request)
             self.setIcon(0, util.THEME.icon("games/unknown_map.png"))
 
         self.setToolTip(0, fa.maps.getDisplayName(data.mapname))
@@ -388,15 +388,24 @@ class LocalReplayItem(QtWidgets.QTreeWidgetItem):
         self.setText(1, data.title)
         self.setToolTip(1, self._replay_file)
 
-        playerlist = []
-        for players in data.teams.values():
-            playerlist.extend(players)
-        self.setText(2, ", ".join(playerlist))
-        self.setToolTip(2, ", ".join(playerlist))
+        players = ", ".join(data.players)
+        self.setText(2, players)
+        self.setToolTip(2, players)
 
         self.setText(3, data.featured_mod)
         self.setTextAlignment(3, QtCore.Qt.AlignmentFlag.AlignCenter)
 
+    def show_preview(self):
+        if self._show_preview:
+            return
+        self._show_preview = True
+        self._setup_appearance()
+
+    def sort_key(self):
+        if self._metadata is None or self._metadata.is_broken:
+            return 0
+        return self._metadata.launch_time()
+
     def replay_bucket(self):
         if self._metadata is None:
             return "legacy"
@@ -415,11 +424,36 @@ class LocalReplayItem(QtWidgets.QTreeWidgetItem):
 
 
 class LocalReplayBucketItem(QtWidgets.QTreeWidgetItem):
-    def __init__(self, kind, children):
-        QtWidgets.QTreeWidgetItem.__init__(self)
-        self._setup_appearance(kind, children)
+    # Buckets which aren't dates go after the dates, in this order
+    SPECIAL_KINDS = ("incomplete", "legacy", "broken")
 
-    def _setup_appearance(self, kind, children):
+    def __init__(self, kind):
+        QtWidgets.QTreeWidgetItem.__init__(self)
+        self.kind = kind
+        self._setup_appearance(kind)
+
+    def sort_key(self):
+        # Sorted descending: newest dates first, then special buckets
+        if self.kind in self.SPECIAL_KINDS:
+            return (0, -self.SPECIAL_KINDS.index(self.kind))
+        return (1, self.kind)
+
+    def add_replay(self, item):
+        # Replays mostly come newest first, so look from the end
+        index = self.childCount()
+        while index > 0 and self.child(index - 1).sort_key() < item.sort_key():
+            index -= 1
+        self.insertChild(index, item)
+        self._update_count()
+
+    def remove_replay(self, item):
+        self.removeChild(item)
+        self._update_count()
+
+    def _update_count(self):
+        self.setText(3, "{} replays".format(self.childCount()))
+
+    def _setup_appearance(self, kind):
         if kind == "broken":
             self._setup_broken_appearance()
         elif kind == "incomplete":
@@ -431,15 +465,12 @@ class LocalReplayBucketItem(QtWidgets.QTreeWidgetItem):
 
         self.setIcon(0, util.THEME.icon("replays/bucket.png"))
         self.setText(0, kind)
-        self.setText(3, "{} replays".format(len(children)))
+        self._update_count()
         self.setForeground(
             3,
             QtGui.QColor(client.instance.player_colors.get_color("default")),
         )
 
-        for item in children:
-            self.addChild(item)
-
     def _setup_broken_appearance(self):
         # FIXME: Needs to come from theme
         self.setForeground(0, QtGui.QColor("red"))
@@ -479,10 +510,15 @@ class LocalReplayBucketItem(QtWidgets.QTreeWidgetItem):
 
 
 class LocalReplaysWidgetHandler(object):
+    # Delay before reacting to changes in the replay folder, as a replay
+    # being written triggers many of them
+    REFRESH_DELAY = 1000
+
     def __init__(self, myTree):
         self.myTree = myTree
         self.myTree.itemDoubleClicked.connect(self.myTreeDoubleClicked)
         self.myTree.itemPressed.connect(self.myTreePressed)
+        self.myTree.itemExpanded.connect(self.myTreeExpanded)
         self.myTree.header().setSectionResizeMode(
             0, QtWidgets.QHeaderView.ResizeMode.ResizeToContents,
         )
@@ -495,12 +531,27 @@ class LocalReplaysWidgetHandler(object):
         self.myTree.header().setSectionResizeMode(
             3, QtWidgets.QHeaderView.ResizeMode.ResizeToContents,
         )
-        self.myTree.modification_time = 0
 
-        replay_cache = os.path.join(util.CACHE_DIR, "local_replays_metadata")
-        self.replay_files = LocalReplayMetadataCache(
-            util.REPLAY_DIR, replay_cache,
-        )
+        self._items = {}
+        self._buckets = {}
+
+        replay_index = os.path.join(util.CACHE_DIR, "local_replays.sqlite3")
+        self.replay_index = LocalReplayIndex(util.REPLAY_DIR, replay_index)
+        self._index_thread = None
+        self._index_worker = LocalReplayIndexWorker(self.replay_index)
+        self._index_worker.replays_added.connect(self._add_replays)
+        self._index_worker.replays_removed.connect(self._remove_replays)
+        self._index_worker.summarized.connect(self._at_summarized)
+        # Items waiting for their summary, by replay path
+        self._summarizing = {}
+
+        self._refresh_timer = QtCore.QTimer(self.myTree)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(self.REFRESH_DELAY)
+        self._refresh_timer.timeout.connect(self._index_worker.refresh)
+
+        self._watcher = QtCore.QFileSystemWatcher(self.myTree)
+        self._watcher.directoryChanged.connect(self._refresh_timer.start)
 
     def myTreePressed(self, item):
         if QtWidgets.QApplication.mouseButtons() != QtCore.Qt.MouseButton.RightButton:
@@ -517,6 +568,7 @@ class LocalReplaysWidgetHandler(object):
         # Actions for Games and Replays
         actionReplay = QtGui.QAction("Replay", menu)
         actionExplorer = QtGui.QAction("Show in Explorer", menu)
+        actionSummary = QtGui.QAction("Show Summary", menu)
 
         # Adding to menu
         menu.addAction(actionReplay)
@@ -527,14 +579,45 @@ class LocalReplaysWidgetHandler(object):
         actionExplorer.triggered.connect(
             lambda: util.showFileInFileBrowser(item.replay_path()),
         )
+        actionSummary.triggered.connect(lambda: self.show_summary(item))
 
         # Adding to menu
         menu.addAction(actionReplay)
         menu.addAction(actionExplorer)
+        menu.addAction(actionSummary)
 
         # Finally: Show the popup
         menu.popup(QtGui.QCursor.pos())
 
+    def show_summary(self, item):
+        if item.summarized():
+            self._show_summary_text(item)
+            return
+
+        path = item.replay_path()
+        if path in self._summarizing:
+            return
+        self._summarizing[path] = item
+        # Summarizing reads the whole replay, keep it off the GUI thread
+        QtCore.QMetaObject.invokeMethod(
+            self._index_worker,
+            "summarize",
+            QtCore.Qt.ConnectionType.QueuedConnection,
+            QtCore.Q_ARG(str, path),
+        )
+
+    def _at_summarized(self, path, summary):
+        item = self._summarizing.pop(path, None)
+        if item is None:
+            return
+        item.set_summary(summary)
+        self._show_summary_text(item)
+
+    def _show_summary_text(self, item):
+        QtWidgets.QMessageBox.information(
+            self.myTree, "Replay Summary", item.summary_text(),
+        )
+
     def myTreeDoubleClicked(self, item):
         if item.isDisabled():
             return
@@ -542,87 +625,71 @@ class LocalReplaysWidgetHandler(object):
         if self.myTree.indexOfTopLevelItem(item) == -1:
             replay(item.replay_path())
 
+    def myTreeExpanded(self, item):
+        if self.myTree.indexOfTopLevelItem(item) == -1:
+            return
+        for index in range(item.childCount()):
+            item.child(index).show_preview()
+
     def updatemyTree(self):
-        modification_time = os.path.getmtime(util.REPLAY_DIR)
-        if self.myTree.modification_time == modification_time:
-            return  # nothing changed -> don't redo
-        self.myTree.modification_time = modification_time
-        self.myTree.clear()
-
-        # We put the replays into buckets by day first, then we add them to the
-        # treewidget.
-        buckets = {}
+        if self._index_thread is not None:
+            return
 
-        if not self.replay_files.cache_loaded:
-            self.replay_files.load_cache()
+        # The index is only used from its own thread from now on
+        self._index_thread = QtCore.QThread()
+        self._index_worker.moveToThread(self._index_thread)
+        self._index_thread.finished.connect(
+            self._index_worker.close, QtCore.Qt.ConnectionType.DirectConnection,
+        )
+        QtWidgets.QApplication.instance().aboutToQuit.connect(self.stop)
+        self._index_thread.start()
 
-        # Iterate
-        for infile in os.listdir(util.REPLAY_DIR):
-            if infile.endswith(".scfareplay"):
-                metadata = None
-            elif infile.endswith(".fafreplay"):
-                metadata = self.replay_files[infile]
-            else:
-                continue
-            item = LocalReplayItem(infile, metadata)
-            bucket = item.replay_bucket()
-            buckets.setdefault(bucket, [])
-            buckets[bucket].append(item)
-
-        self.replay_files.save_cache()
-        # Now, create a top level treeWidgetItem for every bucket, and put the
-        # bucket's contents into them
-        for bucket, items in buckets.items():
-            bucket_item = LocalReplayBucketItem(bucket, items)
-            self.myTree.addTopLevelItem(bucket_item)
-
-
-class LocalReplayMetadataCache:
-    CACHE_DIFF_THRESHOLD = 20
-
-    def __init__(self, cache_dir, cache_file):
-        self._cache_dir = cache_dir
-        self._cache_file = cache_file
-        self._cache = {}
-        self._new_cache_entries = set()
-        self._used_cache_entries = set()
-        self.cache_loaded = False
-
-    def load_cache(self):
-        if os.path.exists(self._cache_file):
-            with open(self._cache_file, "rt") as fh:
-                for line in fh:
-                    filename, metadata = line.split(':', 1)
-                    self._cache[filename] = ReplayMetadata(metadata)
-        self.cache_loaded = True
-
-    def save_cache(self):
-        if not self._cache_differs_much_from_files():
+        self._watcher.addPath(util.REPLAY_DIR)
+        QtCore.QMetaObject.invokeMethod(self._index_worker, "refresh")
+
+    def stop(self):
+        if self._index_thread is None:
             return
-        with open(self._cache_file, "wt") as fh:
-            for filename in self._used_cache_entries:
-                fh.write(filename + ":" + self._cache[filename].raw_data)
-
-    def _cache_differs_much_from_files(self):
-        new_entries = len(self._new_cache_entries)
-        all_entries = len(self._cache)
-        all_used_entries = len(self._used_cache_entries)
-        unused_entries = all_entries - all_used_entries
-        return new_entries + unused_entries > self.CACHE_DIFF_THRESHOLD
-
-    def __getitem__(self, filename):
-        if filename not in self._cache:
-            try:
-                target_file = os.path.join(self._cache_dir, filename)
-                with open(target_file, "rt") as fh:
-                    metadata = fh.readline()
-                    self._cache[filename] = ReplayMetadata(metadata)
-                self._new_cache_entries.add(filename)
-            except IOError:
-                raise KeyError
-
-        self._used_cache_entries.add(filename)
-        return self._cache[filename]
+        self._refresh_timer.stop()
+        self._index_thread.quit()
+        self._index_thread.wait()
+
+    def _bucket_item(self, kind):
+        bucket = self._buckets.get(kind)
+        if bucket is not None:
+            return bucket
+
+        bucket = LocalReplayBucketItem(kind)
+        self._buckets[kind] = bucket
+        index = self.myTree.topLevelItemCount()
+        while (
+            index > 0
+            and self.myTree.topLevelItem(index - 1).sort_key() < bucket.sort_key()
+        ):
+            index -= 1
+        self.myTree.insertTopLevelItem(index, bucket)
+        return bucket
+
+    def _add_replays(self, replays):
+        for replay_file, metadata in replays:
+            item = LocalReplayItem(replay_file, metadata)
+            self._items[replay_file] = item
+            bucket = self._bucket_item(item.replay_bucket())
+            bucket.add_replay(item)
+            if bucket.isExpanded():
+                item.show_preview()
+
+    def _remove_replays(self, filenames):
+        for filename in filenames:
+            item = self._items.pop(filename, None)
+            if item is None:
+                continue
+            self._summarizing.pop(item.replay_path(), None)
+            bucket = item.parent()
+            bucket.remove_replay(item)
+            if bucket.childCount() == 0:
+                del self._buckets[bucket.kind]
+                self.myTree.takeTopLevelItem(self.myTree.indexOfTopLevelItem(bucket))
 
 
 class ReplayVaultWidgetHandler(object):
@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import json
 from typing import Any
 from typing import Callable
 
 from pydantic import BaseModel
 from pydantic import Field
+from pydantic import ValidationError
 from PyQt6.QtCore import QObject
 from PyQt6.QtCore import Qt
 from PyQt6.QtCore import pyqtSignal
@@ -29,6 +31,35 @@ class MetadataModel(BaseModel):
     game_time: float = Field(0.0)
 
 
+class ReplayMetadata:
+    def __init__(self, data: str) -> None:
+        self.raw_data = data
+        self.is_broken = False
+        self.model: MetadataModel | None = None
+
+        try:
+            json_data = json.loads(data)
+        except json.decoder.JSONDecodeError:
+            self.is_broken = True
+            return
+
+        try:
+            self.model = MetadataModel(**json_data)
+        except ValidationError:
+            self.is_broken = True
+
+    @property
+    def is_incomplete(self) -> bool:
+        if self.model is None:
+            return True
+        return not self.model.complete
+
+    def launch_time(self) -> float:
+        if self.model.launched_at > 0:
+            return self.model.launched_at
+        return self.model.game_time
+
+
 class ScoreboardModelItem(QObject):
     updated = pyqtSignal()
 
@@ -0,0 +1,334 @@
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+from typing import NamedTuple
+
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import pyqtSignal
+from PyQt6.QtCore import pyqtSlot
+
+from src.fa.replayparser import ReplaySummary
+from src.replays.models import ReplayMetadata
+
+logger = logging.getLogger(__name__)
+
+
+class IndexedMetadata(NamedTuple):
+    """
+    Replay metadata as kept in the index columns, so listing replays
+    doesn't parse their headers again.
+    """
+    raw_data: str
+    is_broken: bool
+    is_incomplete: bool
+    mapname: str | None
+    featured_mod: str | None
+    players: list[str]
+    title: str | None
+    launched_at: float | None
+
+    def launch_time(self) -> float | None:
+        return self.launched_at
+
+    def parse(self) -> ReplayMetadata:
+        """
+        Reads the whole replay header.
+        """
+        return ReplayMetadata(self.raw_data)
+
+
+class LocalReplay(NamedTuple):
+    filename: str
+    metadata: IndexedMetadata | None
+
+
+class LocalReplayIndex:
+    """
+    On-disk index of replays in the local replay folder. Files are only
+    re-read when their modification time or size changes, and metadata used
+    for searching and sorting is kept in indexed columns.
+    """
+    REPLAY_EXTENSIONS = (".fafreplay", ".scfareplay")
+    SCHEMA_VERSION = 2
+    # Replays are read in parallel when there are more new ones than this
+    PARALLEL_READ_THRESHOLD = 50
+    READ_WORKERS = 4
+    # SQLite limits the number of parameters in a query
+    QUERY_CHUNK = 500
+
+    def __init__(self, replay_dir: str, db_file: str) -> None:
+        self._replay_dir = replay_dir
+        self._db_file = db_file
+        self._db: sqlite3.Connection | None = None
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            self._db = sqlite3.connect(self._db_file)
+            self._create_schema()
+        return self._db
+
+    def close(self) -> None:
+        if self._db is not None:
+            self._db.close()
+            self._db = None
+
+    def _create_schema(self) -> None:
+        version, = self.db.execute("PRAGMA user_version").fetchone()
+        if version != self.SCHEMA_VERSION:
+            self.db.execute("DROP TABLE IF EXISTS replays")
+        self.db.executescript(
+            f"""
+            PRAGMA user_version = {self.SCHEMA_VERSION};
+            CREATE TABLE IF NOT EXISTS replays (
+                filename TEXT PRIMARY KEY,
+                mtime REAL NOT NULL,
+                size INTEGER NOT NULL,
+                metadata TEXT,
+                broken INTEGER NOT NULL DEFAULT 0,
+                complete INTEGER NOT NULL DEFAULT 0,
+                mapname TEXT,
+                featured_mod TEXT,
+                players TEXT,
+                launch_time REAL,
+                title TEXT
+            );
+            CREATE INDEX IF NOT EXISTS replays_launch_time ON replays(launch_time);
+            CREATE INDEX IF NOT EXISTS replays_mapname ON replays(mapname);
+            CREATE INDEX IF NOT EXISTS replays_featured_mod ON replays(featured_mod);
+            CREATE INDEX IF NOT EXISTS replays_complete ON replays(complete);
+            """,
+        )
+
+    def _scan(self) -> dict[str, tuple[float, int]]:
+        files = {}
+        with os.scandir(self._replay_dir) as entries:
+            for entry in entries:
+                if not entry.name.endswith(self.REPLAY_EXTENSIONS):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files[entry.name] = (stat.st_mtime, stat.st_size)
+        return files
+
+    def _read_metadata(self, filename: str) -> str | None:
+        if not filename.endswith(".fafreplay"):
+            return None
+        path = os.path.join(self._replay_dir, filename)
+        with open(path, "rt", errors="replace") as fh:
+            return fh.readline()
+
+    def _row(self, filename: str, mtime: float, size: int) -> tuple:
+        try:
+            raw = self._read_metadata(filename)
+        except OSError:
+            logger.warning(f"Could not read replay {filename}")
+            raw = ""
+        if raw is None:
+            return (filename, mtime, size, None, 0, 0, None, None, None, None, None)
+
+        metadata = ReplayMetadata(raw)
+        model = metadata.model
+        if model is None:
+            return (filename, mtime, size, raw, 1, 0, None, None, None, None, None)
+
+        players = ",".join(
+            player for team in model.teams.values() for player in team
+        )
+        return (
+            filename, mtime, size, raw, 0, int(not metadata.is_incomplete),
+            model.mapname, model.featured_mod, players, metadata.launch_time(),
+            model.title,
+        )
+
+    def update(self) -> tuple[list[str], list[str]]:
+        """
+        Brings the index in sync with the replay folder. Returns filenames
+        that were added or changed, and filenames that were removed.
+        """
+        files = self._scan()
+        known = {
+            filename: (mtime, size)
+            for filename, mtime, size in self.db.execute(
+                "SELECT filename, mtime, size FROM replays",
+            )
+        }
+
+        removed = [filename for filename in known if filename not in files]
+        changed = [
+            filename for filename, stat in files.items()
+            if known.get(filename) != stat
+        ]
+        if not removed and not changed:
+            return changed, removed
+
+        def row(filename):
+            return self._row(filename, *files[filename])
+
+        if len(changed) > self.PARALLEL_READ_THRESHOLD:
+            with ThreadPoolExecutor(max_workers=self.READ_WORKERS) as pool:
+                rows = list(pool.map(row, changed))
+        else:
+            rows = [row(filename) for filename in changed]
+        with self.db:
+            self.db.executemany(
+                "DELETE FROM replays WHERE filename = ?",
+                ((filename,) for filename in removed),
+            )
+            self.db.executemany(
+                "INSERT OR REPLACE INTO replays VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return changed, removed
+
+    @staticmethod
+    def _conditions(
+            mapname: str | None = None,
+            featured_mod: str | None = None,
+            player: str | None = None,
+            complete: bool | None = None,
+    ) -> tuple[str, list]:
+        clauses = []
+        params = []
+        if mapname is not None:
+            clauses.append("mapname = ?")
+            params.append(mapname)
+        if featured_mod is not None:
+            clauses.append("featured_mod = ?")
+            params.append(featured_mod)
+        if player is not None:
+            # Logins often contain '_', which LIKE would take as a wildcard
+            escaped = player.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+            clauses.append("(',' || players || ',') LIKE ? ESCAPE '\\'")
+            params.append(f"%,{escaped},%")
+        if complete is not None:
+            clauses.append("complete = ?")
+            params.append(int(complete))
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        return where, params
+
+    # Columns LocalReplays are built from, see _local_replay
+    REPLAY_COLUMNS = (
+        "filename, metadata, broken, complete, mapname, featured_mod, players, "
+        "title, launch_time"
+    )
+
+    @staticmethod
+    def _local_replay(row: tuple) -> LocalReplay:
+        filename, raw, broken, complete, mapname, featured_mod, players, title, launch_time = row
+        if raw is None:
+            return LocalReplay(filename, None)
+        metadata = IndexedMetadata(
+            raw, bool(broken), not complete, mapname, featured_mod,
+            players.split(",") if players else [], title, launch_time,
+        )
+        return LocalReplay(filename, metadata)
+
+    def count(self, **filters) -> int:
+        where, params = self._conditions(**filters)
+        count, = self.db.execute(f"SELECT COUNT(*) FROM replays{where}", params).fetchone()
+        return count
+
+    def query(
+            self,
+            offset: int = 0,
+            limit: int = -1,
+            **filters,
+    ) -> list[LocalReplay]:
+        """
+        Returns replays newest first. Replays without metadata come last.
+        """
+        where, params = self._conditions(**filters)
+        rows = self.db.execute(
+            f"SELECT {self.REPLAY_COLUMNS} FROM replays{where} "
+            "ORDER BY launch_time IS NULL, launch_time DESC, filename "
+            "LIMIT ? OFFSET ?",
+            params + [limit, offset],
+        )
+        return [self._local_replay(row) for row in rows]
+
+    def replays(self, filenames: list[str]) -> list[LocalReplay]:
+        """
+        Returns replays with given filenames, newest first.
+        """
+        result = []
+        for start in range(0, len(filenames), self.QUERY_CHUNK):
+            chunk = filenames[start:start + self.QUERY_CHUNK]
+            placeholders = ", ".join("?" * len(chunk))
+            result.extend(
+                self.db.execute(
+                    f"SELECT {self.REPLAY_COLUMNS} FROM replays "
+                    f"WHERE filename IN ({placeholders})",
+                    chunk,
+                ),
+            )
+        result.sort(key=lambda row: (row[-1] is not None, row[-1] or 0), reverse=True)
+        return [self._local_replay(row) for row in result]
+
+    def pages(self, page_size: int, **filters) -> Iterator[list[LocalReplay]]:
+        offset = 0
+        while True:
+            page = self.query(offset, page_size, **filters)
+            if not page:
+                return
+            yield page
+            offset += len(page)
+
+
+class LocalReplayIndexWorker(QObject):
+    """
+    Keeps the index up to date on a worker thread, reporting the replays
+    that appeared or disappeared since the last refresh. On the first
+    refresh all replays are reported, newest first, in pages. Replays are
+    also summarized here, as that reads through the whole replay.
+    """
+    replays_added = pyqtSignal(list)
+    replays_removed = pyqtSignal(list)
+    # path, ReplaySummary or None if the replay could not be read
+    summarized = pyqtSignal(str, object)
+
+    PAGE_SIZE = 200
+
+    def __init__(self, index: LocalReplayIndex) -> None:
+        QObject.__init__(self)
+        self._index = index
+        self._loaded = False
+
+    @pyqtSlot()
+    def refresh(self) -> None:
+        try:
+            changed, removed = self._index.update()
+        except (OSError, sqlite3.Error):
+            logger.exception("Could not update local replay index")
+            return
+
+        if not self._loaded:
+            self._loaded = True
+            for page in self._index.pages(self.PAGE_SIZE):
+                self.replays_added.emit(page)
+            return
+
+        # Changed replays are removed and added again
+        if removed or changed:
+            self.replays_removed.emit(removed + changed)
+        if changed:
+            self.replays_added.emit(self._index.replays(changed))
+
+    @pyqtSlot(str)
+    def summarize(self, path: str) -> None:
+        try:
+            summary = ReplaySummary.from_file(path)
+        except Exception:
+            logger.exception(f"Could not summarize replay {path}")
+            summary = None
+        self.summarized.emit(path, summary)
+
+    @pyqtSlot()
+    def close(self) -> None:
+        self._index.close()
@@ -13,9 +13,11 @@ class LeaderboardTableView(TableView):
                 name_index = self.model().index(row, 0)
                 id_index = self.model().index(row, 8)
                 name = self.model().data(name_index)
-                uid = int(self.model().data(id_index))
-                self.selectRow(row)
-                self.context_menu(name, uid)
+                uid = self.model().data(id_index)
+                # Rows of pages that aren't loaded yet have no data
+                if name is not None and uid is not None:
+                    self.selectRow(row)
+                    self.context_menu(name, int(uid))
             self.update_hover_row(event)
             self.verticalHeader().update_hover_section(event)
         else:
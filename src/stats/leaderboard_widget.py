@@ -11,7 +11,6 @@ from src.api.stats_api import LeaderboardRatingApiConnector
 from src.config import Settings
 
 from .itemviews.leaderboarditemdelegate import LeaderboardItemDelegate
-from .models.leaderboardfiltermodel import LeaderboardFilterModel
 from .models.leaderboardtablemodel import LeaderboardTableModel
 
 if TYPE_CHECKING:
@@ -36,13 +35,10 @@ class LeaderboardWidget(BaseClass, FormClass):
 
         self.setupUi(self)
 
-        self.model = None
-
         self.client = client
         self.parent = parent
         self.leaderboardName = leaderboardName
         self.apiConnector = LeaderboardRatingApiConnector()
-        self.apiConnector.data_ready.connect(self.process_rating_info)
         self.playerApiConnector = PlayerApiConnector()
         self.onlyActive = True
         self.pageNumber = 1
@@ -50,9 +46,9 @@ class LeaderboardWidget(BaseClass, FormClass):
         self.pageSize = 1000
         self.query = dict(
             include="player,leaderboard",
-            sort="-rating",
             filter=self.prepareFilters(),
         )
+        self.started = False
 
         self.onlyActiveCheckBox.stateChanged.connect(
             self.onlyActiveCheckBoxChange,
@@ -85,11 +81,6 @@ class LeaderboardWidget(BaseClass, FormClass):
         )
         self.searchPlayerButton.clicked.connect(self.searchPlayerInLeaderboard)
 
-        self.timer = QtCore.QTimer()
-        self.timer.timeout.connect(self.resetLoading)
-
-        self.loading = False
-
         self.showColumnCheckBoxes = [
             self.showName,
             self.showRating,
@@ -133,6 +124,20 @@ class LeaderboardWidget(BaseClass, FormClass):
         self.tableView.horizontalHeader().setSortIndicatorShown(True)
         self.tableView.horizontalHeader().setSectionsMovable(True)
 
+        self.model = LeaderboardTableModel(self.apiConnector, self.pageSize)
+        self.model.loading_changed.connect(self.setLoading)
+        self.model.page_loaded.connect(self.processPage)
+        self.model.page_failed.connect(self.showPageFailed)
+        self.tableView.setModel(self.model)
+        self.tableView.setItemDelegate(LeaderboardItemDelegate(self))
+        self.tableView.sortByColumn(1, QtCore.Qt.SortOrder.DescendingOrder)
+        self.tableView.horizontalHeader().sortIndicatorChanged.connect(
+            self.checkSortIndicator,
+        )
+        self.tableView.verticalScrollBar().valueChanged.connect(
+            self.updatePageNumber,
+        )
+
     def showAllCheckBoxChange(self, state):
         self.showAllColumns = True if state else False
         Settings.set("leaderboards/showAllColumns", self.showAllColumns)
@@ -165,23 +170,15 @@ class LeaderboardWidget(BaseClass, FormClass):
 
             self.showColumnCheckBoxes[index].blockSignals(False)
 
-    def process_rating_info(self, message: dict) -> None:
-        self.createLeaderboard(message)
-        self.processMeta(message["meta"])
-        self.resetLoading()
-        self.timer.stop()
-
-    def createLeaderboard(self, data):
-        self.model = LeaderboardTableModel(data)
-        self.findInPageLine.set_completion_list(self.model.logins)
-        proxyModel = LeaderboardFilterModel(self.model)
-        proxyModel.setSourceModel(self.model)
-        self.tableView.verticalHeader().setModel(proxyModel)
-        self.tableView.setModel(proxyModel)
-        self.tableView.setItemDelegate(LeaderboardItemDelegate(self))
+    def processPage(self, number: int) -> None:
+        self.totalPages = self.model.total_pages()
+        self.labelTotalPages.setText(str(self.totalPages))
+        self.updatePageNumber()
 
+        logins = self.model.logins()
+        self.findInPageLine.set_completion_list(logins)
         completer = QtWidgets.QCompleter(
-            sorted(self.model.logins, key=lambda login: login.lower()),
+            sorted(logins, key=lambda login: login.lower()),
         )
         completer.setCaseSensitivity(QtCore.Qt.CaseSensitivity.CaseInsensitive)
         completer.popup().setStyleSheet(
@@ -189,27 +186,29 @@ class LeaderboardWidget(BaseClass, FormClass):
         )
         self.findInPageLine.setCompleter(completer)
 
-        self.showColumns()
+    def updatePageNumber(self) -> None:
+        top = self.tableView.rowAt(0)
+        self.pageNumber = self.model.page_of_row(top) if top != -1 else 1
+        self.pageBox.setValue(self.pageNumber)
 
-    def processMeta(self, meta):
-        totalPages = meta["page"]["totalPages"]
-        self.totalPages = totalPages if totalPages > 0 else 1
-        self.labelTotalPages.setText(str(self.totalPages))
+    def setLoading(self, loading: bool) -> None:
+        if loading:
+            self.labelLoading.setText("Loading...")
+        else:
+            self.labelLoading.clear()
 
-        pageNumber = meta["page"]["number"]
-        self.pageNumber = pageNumber if pageNumber > 0 else 1
-        self.pageBox.setValue(self.pageNumber)
+    def showPageFailed(self, number: int) -> None:
+        self.labelLoading.setText(f"Could not load page {number}")
 
-    def resetLoading(self):
-        self.loading = False
-        self.labelLoading.clear()
+    def checkSortIndicator(self, column: int, order: QtCore.Qt.SortOrder) -> None:
+        # Columns the api can't sort by leave the rows as they are
+        if not self.model.can_sort(column):
+            self.tableView.horizontalHeader().setSortIndicator(*self.model.sort_indicator())
 
     def findEntry(self, text):
-        if self.model is not None:
-            for row in self.model.logins:
-                if row.lower() == text.lower():
-                    self.tableView.selectRow(self.model.logins.index(row))
-                    break
+        row = self.model.row_of_login(text)
+        if row != -1:
+            self.tableView.selectRow(row)
 
     def searchPlayer(self) -> None:
         query = {
@@ -283,7 +282,7 @@ class LeaderboardWidget(BaseClass, FormClass):
         self.searchPlayerLine.clear()
         self.pageSize = self.quantityBox.value()
         self.query["filter"] = self.prepareFilters()
-        self.getPage(1)
+        self.model.load(self.query, self.pageSize)
 
     def searchPlayerInLeaderboard(self, player=None):
         filters = [
@@ -296,34 +295,30 @@ class LeaderboardWidget(BaseClass, FormClass):
                 'player.login=="{}"'.format(self.searchPlayerLine.text()),
             )
             self.query["filter"] = "({})".format(";".join(filters))
-            self.getPage(1)
+            self.model.load(self.query, self.pageSize)
 
     def checkTotalPages(self):
         if self.pageBox.value() > self.totalPages:
             self.pageBox.setValue(self.totalPages)
 
     def getPage(self, number):
-        if self.loading:
-            QtWidgets.QMessageBox.critical(
-                self.client,
-                "Leaderboards",
-                "Please, wait for previous request to finish.",
-            )
-            return
-
+        """
+        Scrolls to the first row of the page, which the model loads when
+        it's shown.
+        """
         if 1 <= number <= self.totalPages:
-            self.query["page[size]"] = self.pageSize
-            self.query["page[number]"] = number
-            self.query["page[totals]"] = "yes"
-
-            self.apiConnector.requestData(self.query)
-            self.labelLoading.setText("Loading...")
-            self.loading = True
-            self.timer.start(40000)
+            row = (number - 1) * self.model.page_size
+            self.tableView.scrollTo(
+                self.model.index(row, 0),
+                QtWidgets.QAbstractItemView.ScrollHint.PositionAtTop,
+            )
+            self.pageNumber = number
+            self.pageBox.setValue(number)
 
     def entered(self):
-        if self.model is None and not self.loading:
-            self.getPage(1)
+        if not self.started:
+            self.started = True
+            self.model.load(self.query, self.pageSize)
 
         self.shownColumns = Settings.get(
             "leaderboards/shownColumns",
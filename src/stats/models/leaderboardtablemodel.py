@@ -1,76 +1,257 @@
+from __future__ import annotations
+
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from collections.abc import Sequence
+
 from PyQt6.QtCore import QAbstractTableModel
 from PyQt6.QtCore import QModelIndex
 from PyQt6.QtCore import Qt
+from PyQt6.QtCore import pyqtSignal
 
+from src.api.stats_api import LeaderboardRatingApiConnector
 from src.util import utctolocal
 
 
+class LeaderboardPage:
+    """
+    Rows of one page, stored by column as the strings they're displayed as.
+    """
+    __slots__ = ("columns",)
+
+    def __init__(self, entries: Sequence[Mapping]) -> None:
+        logins, ratings, means, deviations = [], [], [], []
+        games, won, win_rates, updated, player_ids = [], [], [], [], []
+        for entry in entries:
+            player = entry["player"]
+            logins.append(player["login"])
+            ratings.append(str(int(entry["rating"])))
+            means.append(f"{entry['mean']:.2f}")
+            deviations.append(f"{entry['deviation']:.2f}")
+            total_games = entry["totalGames"]
+            games.append(str(total_games))
+            won.append(str(entry["wonGames"]))
+            win_rate = 100 * entry["wonGames"] / total_games if total_games else 0
+            win_rates.append(f"{win_rate:.2f}%")
+            updated.append(utctolocal(entry["updateTime"]))
+            player_ids.append(str(player["id"]))
+        self.columns = (
+            logins, ratings, means, deviations, games, won, win_rates, updated, player_ids,
+        )
+
+    def __len__(self) -> int:
+        return len(self.columns[0])
+
+    @property
+    def logins(self) -> list[str]:
+        return self.columns[0]
+
+
 class LeaderboardTableModel(QAbstractTableModel):
-    def __init__(self, data=None):
+    """
+    The whole leaderboard as one table. Pages are fetched from the api when
+    their rows are shown, together with the page after them, and only the
+    most recently shown pages are kept. Sorting is done by the api. A page
+    that failed to load is requested again when shown after a delay that
+    doubles with each failure, and not at all after MAX_PAGE_FAILURES.
+    """
+    COLUMNS = (
+        "Name", "Rating", "Mean", "Deviation", "Games", "Won", "Win rate",
+        "Updated", "Player Id",
+    )
+    # api fields to sort the columns by, win rate isn't one
+    SORT_FIELDS = (
+        "player.login", "rating", "mean", "deviation", "totalGames",
+        "wonGames", None, "updateTime", "player.id",
+    )
+    MAX_PAGES = 20
+    # Seconds before a failed page is requested again the first time
+    RETRY_DELAY = 5
+    MAX_PAGE_FAILURES = 3
+
+    loading_changed = pyqtSignal(bool)
+    page_loaded = pyqtSignal(int)
+    page_failed = pyqtSignal(int)
+
+    def __init__(self, api: LeaderboardRatingApiConnector, page_size: int = 1000) -> None:
         QAbstractTableModel.__init__(self)
-        self.load_data(data)
+        self._api = api
+        self.page_size = page_size
+        self.query: dict = {}
+        self.sort_field = "-rating"
+
+        self._row_count = 0
+        self._pages: OrderedDict[int, LeaderboardPage] = OrderedDict()
+        self._requested: set[int] = set()
+        # Failures and the time to try again of pages that failed to load
+        self._failed: dict[int, tuple[int, float]] = {}
+        # Responses to requests from before a reload are ignored
+        self._generation = 0
+
+    @property
+    def loading(self) -> bool:
+        return bool(self._requested)
+
+    def load(self, query: dict, page_size: int | None = None) -> None:
+        """
+        Starts over with a new query, fetching the first page.
+        """
+        self.beginResetModel()
+        self._api.abort()
+        self._generation += 1
+        self.query = query
+        if page_size is not None:
+            self.page_size = page_size
+        self._row_count = 0
+        self._pages.clear()
+        self._failed.clear()
+        was_loading = self.loading
+        self._requested.clear()
+        self.endResetModel()
+        if was_loading:
+            self.loading_changed.emit(False)
+        self._request(1)
+
+    def page_of_row(self, row: int) -> int:
+        return row // self.page_size + 1
 
-    def load_data(self, data: dict) -> None:
-        self.values = data["data"]
-        self.meta = data["meta"]
-        self.logins = []
-        for value in self.values:
-            self.logins.append(value["player"]["login"])
-        self.column_count = 9
-        self.row_count = len(data["data"])
+    def total_pages(self) -> int:
+        return max(1, -(-self._row_count // self.page_size))
+
+    def logins(self) -> list[str]:
+        """
+        Logins of the rows that are loaded.
+        """
+        return [login for page in self._pages.values() for login in page.logins]
+
+    def row_of_login(self, login: str) -> int:
+        login = login.lower()
+        for number, page in self._pages.items():
+            for offset, other in enumerate(page.logins):
+                if other.lower() == login:
+                    return (number - 1) * self.page_size + offset
+        return -1
+
+    def _request(self, page: int) -> None:
+        if page in self._pages or page in self._requested:
+            return
+        if page < 1 or (page > 1 and page > self.total_pages()):
+            return
+        failures, retry_at = self._failed.get(page, (0, 0))
+        if failures >= self.MAX_PAGE_FAILURES or time.monotonic() < retry_at:
+            return
+
+        query = self.query.copy()
+        query.update({
+            "sort": self.sort_field,
+            "page[size]": self.page_size,
+            "page[number]": page,
+            "page[totals]": "yes",
+        })
+        generation = self._generation
+        self._requested.add(page)
+        self._api.get_by_query(
+            query,
+            lambda message: self._at_page(generation, page, message),
+            lambda reply: self._at_page_failed(generation, page),
+        )
+        if len(self._requested) == 1:
+            self.loading_changed.emit(True)
+
+    def _finish_request(self, page: int) -> None:
+        self._requested.discard(page)
+        if not self._requested:
+            self.loading_changed.emit(False)
+
+    def _at_page_failed(self, generation: int, page: int) -> None:
+        if generation != self._generation:
+            return
+        failures, _ = self._failed.get(page, (0, 0))
+        delay = self.RETRY_DELAY * 2 ** failures
+        self._failed[page] = (failures + 1, time.monotonic() + delay)
+        self._finish_request(page)
+        self.page_failed.emit(page)
+
+    def _at_page(self, generation: int, page: int, message: dict) -> None:
+        if generation != self._generation:
+            return
+        meta = message["meta"]["page"]
+        row_count = meta.get("totalRecords", meta["totalPages"] * self.page_size)
+        self._pages[page] = LeaderboardPage(message["data"])
+        self._failed.pop(page, None)
+        while len(self._pages) > self.MAX_PAGES:
+            self._pages.popitem(last=False)
+
+        if row_count > self._row_count:
+            self.beginInsertRows(QModelIndex(), self._row_count, row_count - 1)
+            self._row_count = row_count
+            self.endInsertRows()
+        elif row_count < self._row_count:
+            self.beginRemoveRows(QModelIndex(), row_count, self._row_count - 1)
+            self._row_count = row_count
+            self.endRemoveRows()
+
+        first = (page - 1) * self.page_size
+        last = min(first + self.page_size, self._row_count) - 1
+        if last >= first:
+            self.dataChanged.emit(
+                self.index(first, 0), self.index(last, len(self.COLUMNS) - 1),
+            )
+        self._finish_request(page)
+        self.page_loaded.emit(page)
 
     def rowCount(self, parent=QModelIndex()):
-        return self.row_count
+        return 0 if parent.isValid() else self._row_count
 
     def columnCount(self, parent=QModelIndex()):
-        return self.column_count
+        return 0 if parent.isValid() else len(self.COLUMNS)
 
     def headerData(self, section, orientation, role):
         if role == Qt.ItemDataRole.DisplayRole:
             if orientation == Qt.Orientation.Horizontal:
-                return (
-                    "Name", "Rating", "Mean", "Deviation", "Games", "Won",
-                    "Win rate", "Updated", "Player Id",
-                )[section]
+                return self.COLUMNS[section]
             else:
-                return "{}".format(
-                    int(self.meta["page"]["number"] - 1)
-                    * int(self.meta["page"]["limit"])
-                    + section
-                    + 1,
-                )
+                return str(section + 1)
         elif role == Qt.ItemDataRole.TextAlignmentRole:
             return Qt.AlignmentFlag.AlignCenter
 
     def data(self, index, role=Qt.ItemDataRole.DisplayRole):
-        column = index.column()
-        row = index.row()
+        if role != Qt.ItemDataRole.DisplayRole or not index.isValid():
+            return None
 
-        if role == Qt.ItemDataRole.DisplayRole:
-            if column == 0:
-                return "{}".format(self.values[row]["player"]["login"])
-            elif column == 1:
-                return "{}".format(int(self.values[row]["rating"]))
-            elif column == 2:
-                return "{:.2f}".format(round(self.values[row]["mean"], 2))
-            elif column == 3:
-                return "{:.2f}".format(round(self.values[row]["deviation"], 2))
-            elif column == 4:
-                return "{}".format(self.values[row]["totalGames"])
-            elif column == 5:
-                return "{}".format(self.values[row]["wonGames"])
-            elif column == 6:
-                if self.values[row]["totalGames"] == 0:
-                    return "{:.2f}%".format(0)
-                else:
-                    return "{:.2f}%".format(
-                        100
-                        * self.values[row]["wonGames"]
-                        / self.values[row]["totalGames"],
-                    )
-            elif column == 7:
-                return utctolocal(self.values[row]["updateTime"])
-            elif column == 8:
-                return "{}".format(self.values[row]["player"]["id"])
-
-        return None
+        number, offset = divmod(index.row(), self.page_size)
+        number += 1
+        page = self._pages.get(number)
+        if page is None:
+            self._request(number)
+            return None
+        self._pages.move_to_end(number)
+        # Be ready before the rows of the next page are shown
+        self._request(number + 1)
+        if offset >= len(page):
+            return None
+        return page.columns[index.column()][offset]
+
+    def can_sort(self, column: int) -> bool:
+        return self.SORT_FIELDS[column] is not None
+
+    def sort_indicator(self) -> tuple[int, Qt.SortOrder]:
+        """
+        Column and order the rows are sorted by.
+        """
+        if self.sort_field.startswith("-"):
+            return self.SORT_FIELDS.index(self.sort_field[1:]), Qt.SortOrder.DescendingOrder
+        return self.SORT_FIELDS.index(self.sort_field), Qt.SortOrder.AscendingOrder
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        field = self.SORT_FIELDS[column]
+        if field is None:
+            return
+        if order == Qt.SortOrder.DescendingOrder:
+            field = f"-{field}"
+        if field != self.sort_field:
+            self.sort_field = field
+            # Nothing to reload before the first load
+            if self.query:
+                self.load(self.query)
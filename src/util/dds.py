@@ -0,0 +1,109 @@
+"""
+Conversion of DirectDraw Surface images, as used for map and mod previews,
+into QImages.
+"""
+from __future__ import annotations
+
+import struct
+
+import numpy as np
+from PyQt6.QtGui import QImage
+
+MAGIC = b"DDS "
+HEADER = struct.Struct("<4s7I44x2I4s5I")
+DATA_OFFSET = 4 + 124
+
+DDPF_FOURCC = 0x4
+DXT_BLOCK_SIZES = {b"DXT1": 8, b"DXT3": 16, b"DXT5": 16}
+
+
+class DDSError(ValueError):
+    pass
+
+
+def load_dds(path: str) -> QImage:
+    with open(path, "rb") as fh:
+        header = fh.read(DATA_OFFSET)
+        return _image(header, fh.read())
+
+
+def dds_to_image(data: bytes) -> QImage:
+    return _image(data[:DATA_OFFSET], data[DATA_OFFSET:])
+
+
+def _image(header: bytes, pixels: bytes) -> QImage:
+    """
+    Builds an image from the header and pixel data of a DDS file.
+    Uncompressed pixels are used in place, compressed ones are decoded in one
+    go. Alpha is ignored, as previews are shown on opaque backgrounds.
+    """
+    if len(header) < DATA_OFFSET:
+        raise DDSError("File too short for a DDS header")
+    (
+        magic, _, _, height, width, _, _, _,
+        _, pf_flags, fourcc, bit_count, r_mask, g_mask, b_mask, _,
+    ) = HEADER.unpack_from(header)
+    if magic != MAGIC:
+        raise DDSError("Not a DDS file")
+
+    if pf_flags & DDPF_FOURCC:
+        if fourcc not in DXT_BLOCK_SIZES:
+            raise DDSError(f"Unsupported DDS compression {fourcc!r}")
+        return _decode_dxt(pixels, width, height, fourcc)
+
+    formats = {
+        (32, 0xff0000, 0xff00, 0xff): QImage.Format.Format_RGB32,
+        (32, 0xff, 0xff00, 0xff0000): QImage.Format.Format_RGBX8888,
+        (24, 0xff0000, 0xff00, 0xff): QImage.Format.Format_BGR888,
+        (24, 0xff, 0xff00, 0xff0000): QImage.Format.Format_RGB888,
+    }
+    image_format = formats.get((bit_count, r_mask, g_mask, b_mask))
+    if image_format is None:
+        raise DDSError(f"Unsupported DDS pixel format ({bit_count} bit)")
+
+    stride = width * bit_count // 8
+    if len(pixels) < stride * height:
+        raise DDSError("DDS pixel data is truncated")
+    # The image keeps a reference to the pixel data instead of copying it
+    return QImage(pixels, width, height, stride, image_format)
+
+
+def _rgb565(colors: np.ndarray) -> np.ndarray:
+    r = (colors >> 11) & 0x1f
+    g = (colors >> 5) & 0x3f
+    b = colors & 0x1f
+    return np.stack(((r * 255 + 15) // 31, (g * 255 + 31) // 63, (b * 255 + 15) // 31), axis=-1)
+
+
+def _decode_dxt(data: bytes, width: int, height: int, fourcc: bytes) -> QImage:
+    block_size = DXT_BLOCK_SIZES[fourcc]
+    blocks_wide = (width + 3) // 4
+    blocks_high = (height + 3) // 4
+    count = blocks_wide * blocks_high
+    if len(data) < count * block_size:
+        raise DDSError("DDS pixel data is truncated")
+
+    blocks = np.frombuffer(data, np.uint8, count * block_size)
+    # The color part is the last 8 bytes of each block
+    colors = blocks.reshape(count, block_size)[:, -8:]
+    c0 = colors[:, 0:2].copy().view("<u2")[:, 0]
+    c1 = colors[:, 2:4].copy().view("<u2")[:, 0]
+    indices = colors[:, 4:8].copy().view("<u4")[:, 0]
+
+    p0 = _rgb565(c0.astype(np.uint32))
+    p1 = _rgb565(c1.astype(np.uint32))
+    # DXT1 blocks with c0 <= c1 have 3 colors and transparent black
+    four_colors = (c0 > c1)[:, None] if fourcc == b"DXT1" else True
+    p2 = np.where(four_colors, (2 * p0 + p1) // 3, (p0 + p1) // 2)
+    p3 = np.where(four_colors, (p0 + 2 * p1) // 3, 0)
+    palette = np.stack((p0, p1, p2, p3), axis=1).astype(np.uint8)
+
+    # 16 two-bit indices per block, first pixel in the lowest bits
+    shifts = np.arange(16, dtype=np.uint32) * 2
+    pixel_indices = (indices[:, None] >> shifts) & 3
+    pixels = palette[np.arange(count)[:, None], pixel_indices]
+    pixels = pixels.reshape(blocks_high, blocks_wide, 4, 4, 3)
+    pixels = pixels.transpose(0, 2, 1, 3, 4).reshape(blocks_high * 4, blocks_wide * 4, 3)
+
+    rgb = np.ascontiguousarray(pixels[:height, :width])
+    return QImage(rgb.tobytes(), width, height, width * 3, QImage.Format.Format_RGB888)
@@ -1,17 +1,18 @@
 class MagicDict:
     def __init__(self, value=None):
-        super().__setattr__('_dict', {})
         super().__setattr__('_value', value)
 
     def __getattr__(self, attr):
-        return self._dict.get(attr, _magic_none)
+        # Entries are plain attributes, so this is only reached for missing
+        # ones, and reading entries that exist doesn't go through Python code
+        return _magic_none
 
     def __setattr__(self, attr, val):
-        self._dict[attr] = MagicDict(val)
+        super().__setattr__(attr, MagicDict(val))
 
     def put(self, attr):
         self.__setattr__(attr, None)
-        return self.__getattr__(attr)
+        return getattr(self, attr)
 
     def __bool__(self):
         return True
@@ -0,0 +1,274 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Iterator
+from typing import NamedTuple
+
+from PyQt6.QtCore import QFileSystemWatcher
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import QTimer
+from PyQt6.QtCore import pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+_rescan_executor: ThreadPoolExecutor | None = None
+
+
+def _rescan_pool() -> ThreadPoolExecutor:
+    global _rescan_executor
+    if _rescan_executor is None:
+        _rescan_executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="local-content",
+        )
+    return _rescan_executor
+
+
+class LocalContent(NamedTuple):
+    name: str
+    mtime: int
+    metadata: Any
+
+
+class LocalContentIndex(QObject):
+    """
+    Index of the entries of a content folder, like the user's maps or mods,
+    by casefolded name. Metadata is read once per entry and kept in a cache
+    file together with the entry's modification time, so only new or changed
+    entries are read again - also across sessions.
+
+    The cached index is used as it is at startup, and checked for entries
+    edited meanwhile on a worker thread. While in use, only the folder itself
+    is watched; when it changes, only new, removed or replaced entries are
+    read.
+    """
+    CACHE_VERSION = 2
+    # Delay before reacting to changes, as copying a folder triggers many
+    REFRESH_DELAY = 500
+    # Entries are read in parallel when there are many new ones, like on the
+    # first start. Reading is mostly file access, so threads are enough
+    READ_WORKERS = 4
+
+    changed = pyqtSignal()
+    _rescanned = pyqtSignal(object, object)
+
+    def __init__(
+            self,
+            folder: str,
+            cache_file: str,
+            read_metadata: Callable[[str], Any],
+    ) -> None:
+        QObject.__init__(self)
+        self.folder = folder
+        self._cache_file = cache_file
+        self._read_metadata = read_metadata
+        self._entries: dict[str, LocalContent] | None = None
+        self._rescanned.connect(self._at_rescanned)
+        self._rescan_future: Future | None = None
+
+        self._watcher: QFileSystemWatcher | None = None
+        self._refresh_timer: QTimer | None = None
+
+    @property
+    def entries(self) -> dict[str, LocalContent]:
+        if self._entries is None:
+            self._load()
+            if self._entries:
+                self._watch()
+                self._rescan_in_background()
+            else:
+                self.refresh()
+        return self._entries
+
+    def __contains__(self, name: str) -> bool:
+        return name.casefold() in self.entries
+
+    def __iter__(self) -> Iterator[LocalContent]:
+        return iter(self.entries.values())
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def get(self, name: str) -> LocalContent | None:
+        return self.entries.get(name.casefold())
+
+    def path(self, name: str) -> str | None:
+        entry = self.get(name)
+        return None if entry is None else os.path.join(self.folder, entry.name)
+
+    def discard(self, name: str) -> None:
+        """
+        Forgets an entry right away, without waiting for the file system to
+        report it as removed.
+        """
+        if self.entries.pop(name.casefold(), None) is not None:
+            self.changed.emit()
+
+    def refresh(self) -> bool:
+        """
+        Brings the index in sync with the entries of the folder. Entries are
+        read if they're new or were replaced, files edited inside of them
+        are only noticed by rescan.
+        """
+        if self._entries is None:
+            self._load()
+        return self._apply(self._scan(self._entries or {}, deep=False))
+
+    def rescan(self) -> bool:
+        """
+        Like refresh, but also reads entries in which files were edited.
+        """
+        if self._entries is None:
+            self._load()
+        return self._apply(self._scan(self._entries or {}, deep=True))
+
+    def _rescan_in_background(self) -> None:
+        if self._rescan_future is not None and not self._rescan_future.done():
+            return
+        self._rescan_future = _rescan_pool().submit(self._rescan_in_thread, dict(self._entries))
+
+    def _rescan_in_thread(self, old: dict[str, LocalContent]) -> None:
+        try:
+            entries = self._scan(old, deep=True)
+        except Exception:
+            logger.exception(f"Could not rescan {self.folder!r}")
+            return
+        try:
+            self._rescanned.emit(old, entries)
+        except RuntimeError:
+            # deleted meanwhile
+            pass
+
+    def _at_rescanned(
+            self,
+            old: dict[str, LocalContent],
+            entries: dict[str, LocalContent],
+    ) -> None:
+        if self._entries != old:
+            # Refreshed meanwhile, so the result may be outdated already
+            self._rescan_in_background()
+        elif self._apply(entries):
+            logger.info(f"Entries of {self.folder!r} changed since they were cached")
+
+    def _scan(self, old: dict[str, LocalContent], *, deep: bool) -> dict[str, LocalContent]:
+        """
+        Lists the folder and reads the entries that changed since old. Runs
+        on a worker thread too, so it mustn't touch Qt objects.
+        """
+        entries = {}
+        stale = []
+        try:
+            with os.scandir(self.folder) as it:
+                for dir_entry in it:
+                    key = dir_entry.name.casefold()
+                    entry = old.get(key)
+                    try:
+                        if entry is None or entry.name != dir_entry.name:
+                            stale.append((key, dir_entry.name, self._entry_mtime(dir_entry)))
+                        elif deep:
+                            mtime = self._entry_mtime(dir_entry)
+                            if mtime != entry.mtime:
+                                stale.append((key, dir_entry.name, mtime))
+                            else:
+                                entries[key] = entry
+                        elif dir_entry.stat().st_mtime_ns > entry.mtime:
+                            # Replaced, or a file was added or removed in it
+                            stale.append((key, dir_entry.name, self._entry_mtime(dir_entry)))
+                        else:
+                            entries[key] = entry
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+
+        names = [name for _, name, _ in stale]
+        if len(names) > 1:
+            with ThreadPoolExecutor(max_workers=self.READ_WORKERS) as pool:
+                metadata = list(pool.map(self._read, names))
+        else:
+            metadata = [self._read(name) for name in names]
+        for (key, name, mtime), data in zip(stale, metadata):
+            entries[key] = LocalContent(name, mtime, data)
+        return entries
+
+    def _apply(self, entries: dict[str, LocalContent]) -> bool:
+        changed = entries != self._entries
+        self._entries = entries
+        self._watch()
+        if changed:
+            self._save()
+            self.changed.emit()
+        return changed
+
+    @staticmethod
+    def _entry_mtime(dir_entry: os.DirEntry) -> int:
+        """
+        Latest modification time of an entry and, for a folder, of the files
+        directly in it. Editing a file doesn't change its folder's time.
+        """
+        mtime = dir_entry.stat().st_mtime_ns
+        if dir_entry.is_dir():
+            with os.scandir(dir_entry.path) as it:
+                for child in it:
+                    try:
+                        mtime = max(mtime, child.stat().st_mtime_ns)
+                    except OSError:
+                        continue
+        return mtime
+
+    def _read(self, name: str) -> Any:
+        try:
+            return self._read_metadata(name)
+        except Exception:
+            logger.exception(f"Could not read {name!r} in {self.folder!r}")
+            return None
+
+    def _load(self) -> None:
+        self._entries = {}
+        try:
+            with open(self._cache_file) as fh:
+                cache = json.load(fh)
+            if cache["version"] != self.CACHE_VERSION or cache["folder"] != self.folder:
+                return
+            entries = {
+                name.casefold(): LocalContent(name, mtime, metadata)
+                for name, mtime, metadata in cache["entries"]
+            }
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError):
+            logger.warning(f"Could not read local content cache {self._cache_file}")
+            return
+        self._entries = entries
+
+    def _save(self) -> None:
+        cache = {
+            "version": self.CACHE_VERSION,
+            "folder": self.folder,
+            "entries": list(self._entries.values()),
+        }
+        tmp_file = f"{self._cache_file}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self._cache_file), exist_ok=True)
+            with open(tmp_file, "w") as fh:
+                json.dump(cache, fh)
+            os.replace(tmp_file, self._cache_file)
+        except (OSError, TypeError, ValueError):
+            logger.warning(f"Could not write local content cache {self._cache_file}")
+
+    def _watch(self) -> None:
+        # Only the folder itself, a watch per entry runs into handle limits
+        # on Windows with thousands of maps
+        if self._watcher is not None or not os.path.isdir(self.folder):
+            return
+        self._refresh_timer = QTimer(self)
+        self._refresh_timer.setSingleShot(True)
+        self._refresh_timer.setInterval(self.REFRESH_DELAY)
+        self._refresh_timer.timeout.connect(self.refresh)
+        self._watcher = QFileSystemWatcher([self.folder], self)
+        self._watcher.directoryChanged.connect(self._refresh_timer.start)
@@ -1,5 +1,5 @@
 """
-lua data parser by Raging_Squirrel
+lua data parser
 
 to parse lua file, initialize the class with path to the file
 call parse method to extract the data you need
@@ -38,9 +38,193 @@ Default value will be returned instead
         __parent__ - returns item parent
     destination - you can specify a dictionary for matched items in the
     resulting array
+
+Files are read in a single pass by a tokenizer, and tables become plain
+dicts. Values are kept as strings: quotes are removed from strings, other
+values (numbers, booleans, calls like STRING('a')) are kept as written.
+Positional table entries are keyed by their position, starting at '0'.
+Besides lua comments, # outside of strings starts a comment that runs to
+the end of the line, as FA files use them.
 """
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
+
+TOKEN = re.compile(
+    r"""
+    \s*(?:
+        (?P<comment>--(?:\[(?P<cdepth>=*)\[[\s\S]*?\](?P=cdepth)\]|[^\n]*)|\#[^\n]*)
+        | (?P<longstring>\[(?P<sdepth>=*)\[(?P<lbody>[\s\S]*?)\](?P=sdepth)\])
+        | (?P<string>"(?P<dbody>(?:[^"\\\n]|\\.)*)"|'(?P<sbody>(?:[^'\\\n]|\\.)*)')
+        | (?P<number>0[xX][0-9a-fA-F]+|(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)
+        | (?P<name>[A-Za-z_][A-Za-z0-9_]*)
+        | (?P<op>\.\.|[{}\[\]=,;()\-+*/.<>~^%:])
+        | (?P<end>$)
+        | (?P<error>.)
+    )
+    """,
+    re.VERBOSE,
+)
+ESCAPE = re.compile(r"\\(.)")
+ESCAPES = {"n": "\n", "t": "\t", "r": "\r"}
+# Binary operators, which are skipped together with their second operand
+OPERATORS = {"..", "+", "-", "*", "/", "%", "^", "<", ">", "~", "."}
+KEY_FILTER = re.compile(r"[\[\],'\"]")
+# Kinds of tokens that are values
+VALUES = {"string", "number", "name"}
+
+
+class LuaSyntaxError(ValueError):
+    pass
+
+
+def _unescape(text):
+    if "\\" not in text:
+        return text
+    return ESCAPE.sub(lambda m: ESCAPES.get(m.group(1), m.group(1)), text)
+
+
+def tokenize(text):
+    """
+    Returns a list of (kind, value, start, end) for every meaningful token
+    in the text. Operators are their own kind.
+    """
+    tokens = []
+    for m in TOKEN.finditer(text):
+        group = kind = m.lastgroup
+        if kind == "comment":
+            continue
+        if kind == "end":
+            break
+        if kind == "error":
+            raise LuaSyntaxError(f"Unexpected character {m.group(kind)!r} at {m.start(kind)}")
+        if kind == "op":
+            value = kind = m.group(group)
+        elif kind == "longstring":
+            kind = "string"
+            value = m.group("lbody").removeprefix("\n")
+        elif kind == "string":
+            body = m.group("dbody")
+            value = _unescape(m.group("sbody") if body is None else body)
+        else:
+            value = m.group(kind)
+        tokens.append((kind, value, m.start(group), m.end(group)))
+    return tokens
+
+
+class _Parser:
+    """
+    Parses a sequence of assignments and table constructors into nested
+    dicts. The whole file is treated like the inside of a table.
+    """
+
+    def __init__(self, text, lower_keys):
+        self._text = text
+        tokens = tokenize(text)
+        self._kinds = [token[0] for token in tokens] + ["eof"]
+        self._tokens = tokens
+        self._pos = 0
+        self._lower_keys = lower_keys
+
+    def _error(self, message):
+        if self._pos < len(self._tokens):
+            message = f"{message} at {self._tokens[self._pos][2]}"
+        raise LuaSyntaxError(message)
+
+    def _expect(self, kind):
+        if self._kinds[self._pos] != kind:
+            self._error(f"Expected {kind!r}")
+        self._pos += 1
+
+    def _key(self, key):
+        key = KEY_FILTER.sub("", key).strip()
+        return key.lower() if self._lower_keys else key
+
+    def parse(self):
+        return self._fields("eof")
+
+    def _fields(self, closing):
+        kinds = self._kinds
+        table = {}
+        counter = 0
+        while True:
+            kind = kinds[self._pos]
+            if kind == closing:
+                self._pos += 1
+                return table
+            if kind == "," or kind == ";":
+                self._pos += 1
+                continue
+            if kind == "eof":
+                self._error("Unterminated table")
+
+            if kind == "[":
+                key = self._tokens[self._pos + 1][1]
+                self._pos += 2
+                self._expect("]")
+                self._expect("=")
+                table[self._key(key)] = self._value()
+            elif kind == "name" and kinds[self._pos + 1] == "=":
+                key = self._tokens[self._pos][1]
+                self._pos += 2
+                table[self._key(key)] = self._value()
+            else:
+                table[str(counter)] = self._value()
+            counter += 1
+
+    def _value(self):
+        kinds = self._kinds
+        kind = kinds[self._pos]
+        if kind == "{":
+            self._pos += 1
+            return self._fields("}")
+        if kind == "-":
+            self._pos += 1
+            return kind + self._value()
+        if kind not in VALUES:
+            self._error(f"Unexpected {kind!r}")
+
+        _, value, start, end = self._tokens[self._pos]
+        self._pos += 1
+        if kind == "name" and kinds[self._pos] == "(":
+            # A call, like STRING('text') or VECTOR3(1, 2, 3), is kept as is
+            depth = 0
+            while True:
+                kind = kinds[self._pos]
+                if kind == "eof":
+                    self._error("Unterminated call")
+                self._pos += 1
+                if kind == "(":
+                    depth += 1
+                elif kind == ")":
+                    depth -= 1
+                    if depth == 0:
+                        value = self._text[start:self._tokens[self._pos - 1][3]]
+                        break
+        # Only the first operand of expressions like "a" .. "b" is kept
+        while kinds[self._pos] in OPERATORS:
+            self._pos += 1
+            self._value()
+        return value
+
+
+def parse_lua(text, lower_keys=True):
+    """
+    Parses the text of a lua data file, like a scenario or mod_info file,
+    into a dict of its top level assignments.
+    """
+    return _Parser(text, lower_keys).parse()
+
+
+def _walk(table, parent=""):
+    """
+    Yields (parent, key, value) of every item, children before the table
+    that contains them.
+    """
+    for key, value in table.items():
+        if isinstance(value, dict):
+            yield from _walk(value, parent + ">" + key)
+        yield parent, key, value
 
 
 class luaParser:
@@ -49,16 +233,9 @@ class luaParser:
         self.iszip = False
         self.zip = None
         self.__path = luaPath
-        self.__keyFilter = re.compile(r"[\[\],'\"]")
-        self.__valFilter = re.compile(r"[\[\]]")
         self.__searchResult = dict()
         self.__searchPattern = dict()
         self.__foundItemsCount = dict()
-        self.__stream = list()
-        self.__lines = list()
-        self.__prevUnfinished = False
-        self.__inString = False
-        self.__stringChar = ""
         self.__parsedData = dict()
         self.__defaultValues = dict()
         self.errors = 0
@@ -68,225 +245,108 @@ class luaParser:
         self.errorMsg = ""
         self.loweringKeys = True
 
-    def __checkUninterruptibleStr(self, char):
-        if char == "\"" or char == "'":
-            if not self.__inString:
-                self.__stringChar = char
-                self.__inString = True
-            elif char == self.__stringChar:
-                self.__inString = False
-        elif not self.__inString and char == "(":
-            self.__inString = True
-            self.__stringChar = ")"
-
-    def __processLine(self, parent=""):
-        counter = 0
-        lua = dict()
-        value = ""
-        key = ""
-        prevkey = ""
-        # start cycle
-        while len(self.__stream):
-            # get a line from the list or read next line from the file
-            if len(self.__lines) == 0:
-                line = self.__stream.pop(0)
-                # cut commentary section (either start whit '#' or is a
-                # '--[[  ]]--' section
-                comment = re.compile(r"((#.*))$|((--\[\[).*(\]\]--)$)")
-                line = comment.sub("", line)
-                # process line to see if it one command or a stack of them
-                newLine = 0
-                pos = 0
-                self.__inString = False
-                while len(line) > pos:
-                    char = line[pos]
-                    self.__checkUninterruptibleStr(char)
-                    if char == "{":
-                        pos = pos + 1
-                        char = line[pos]
-                        self.__checkUninterruptibleStr(char)
-                        self.__lines.append(line[newLine:pos])
-                        newLine = pos
-                    elif char == "," and not self.__inString:
-                        self.__lines.append(line[newLine:pos])
-                        pos = pos + 1
-                        char = line[pos]
-                        self.__checkUninterruptibleStr(char)
-                        newLine = pos
-                    elif char == "}":
-                        self.__lines.append(line[newLine:pos])
-                        self.__lines.append("}")
-                        pos = pos + 1
-                        if pos <= len(line):
-                            self.__checkUninterruptibleStr(line[pos])
-                        newLine = pos
-                    pos = pos + 1
-                if len(self.__lines) > 0:
-                    line = self.__lines.pop(0)
-            else:
-                line = self.__lines.pop(0)
-            line = line.strip()
-            # if the string is not empty, proceed
-            if line != "":
-                # split it by '=' -- actually, by ' = ', because
-                # there can be values with '=' inside, e.g. '=============',
-                lineArray = line.split(" = ")
-                # if result is one element list
-                if len(lineArray) == 1:
-                    # this element is value
-                    value = lineArray[0].strip()
-                    # assign counter value to key
-                    key = str(counter)
-                else:
-                    # first is key
-                    if self.loweringKeys:
-                        key = lineArray[0].lower()
-                    else:
-                        key = lineArray[0]
-                    # get rid of redundant chars in key
-                    key = self.__keyFilter.sub("", key).strip()
-                    # second is value
-                    value = lineArray[1].strip()
-                # if value is '}' - which is end of lua array, stop parsing
-                if value == "}":
-                    break
-                if len(value) != 0:
-                    # remove finishing comma if there is one
-                    if value[-1] == ",":
-                        value = value[:-1]
-                    # get rid of redundant chars in value
-                    value = self.__valFilter.sub("", value)
-                if len(value) != 0:
-                    # parse value:
-                    # if the string starts with '{'
-                    if value[-1] == "{":
-                        # add new item into the array: recursive function call
-                        if self.__prevUnfinished:
-                            self.__prevUnfinished = False
-                            lua[prevkey] = self.__processLine(parent + ">" + prevkey)
-                        else:
-                            lua[key] = self.__processLine(parent + ">" + key)
-                    else:
-                        # add new item into the array: value itself
-                        if value[0] == "\"" or value[0] == "'":
-                            value = value[1:]
-                        if value[-1] == "\"" or value[-1] == "'":
-                            value = value[:-1]
-                        lua[key] = value
-                elif len(key) != 0:
-                    self.__prevUnfinished = True
-                    prevkey = key
-            # checking line if it suits searchPattern, and adding if so
-                for searchKey in self.__searchPattern:
-                    # regkey = re.compile(
-                    #    ".*("+searchKey.split(":")[-1].replace("*", ".*")+")$"
-                    # )
-                    # if regkey.match(parent+">"+key):
-                    matchKey = searchKey.split(":")[-1].replace("*", ".*")
-                    if re.match(".*>(" + matchKey + ")$", parent + ">" + key):
-                        # get command from key
-                        valcmd = searchKey.split(":")
-                        valcmd = valcmd[0] if len(valcmd) == 2 else "none"
-                        # add new value into the resulting array
-                        resultKey = self.__searchPattern[searchKey]
-                        if valcmd == "count":
-                            if key in lua:
-                                if isinstance(lua[key], str):
-                                    count = 1
-                                else:
-                                    count = len(lua[key])
-                            else:
-                                count = 0
-                            if resultKey in self.__searchResult:
-                                resultVal = self.__searchResult[resultKey] + count
-                            else:
-                                resultVal = count
-                        else:
-                            resultVal = lua[key]
-                        resultKey = resultKey.replace("__self__", key)
-                        resultKey = resultKey.replace(
-                            "__parent__", parent.split(">")[-1],
-                        )
-                        keycmd = resultKey.split(":")
-                        # unpack command from search key
-                        if len(keycmd) == 2:
-                            resultKey = keycmd[1]
-                            keydst = keycmd[0]
-                        else:
-                            keydst = "__nowhere__"
-                        # write result into the array
-                        if keydst == "__nowhere__":
-                            self.__searchResult[resultKey] = resultVal
-                        else:
-                            if keydst in self.__searchResult:
-                                if isinstance(self.__searchResult[keydst], dict):
-                                    self.__searchResult[keydst][resultKey] = resultVal
-                            else:
-                                self.__searchResult[keydst] = dict()
-                                self.__searchResult[keydst][resultKey] = resultVal
-                        if isinstance(resultVal, int):
-                            self.__foundItemsCount[searchKey] += resultVal
-                        else:
-                            self.__foundItemsCount[searchKey] += 1
-            # increase counter
-            counter = counter + 1
-        # return resulting array
-        return lua
+    def __readLua(self):
+        if not self.iszip:
+            with open(self.__path, "r", errors="replace") as f:
+                return f.read()
+        for member in self.zip.namelist():
+            if os.path.basename(member) == self.__path:
+                with self.zip.open(member) as f:
+                    return f.read().decode(errors="replace")
+        return None
 
     def __parseLua(self):
-        # open file
-        if not self.iszip:
-            f = open(self.__path, "r")
+        text = self.__readLua()
+        if text is None:
+            return dict()
+        try:
+            return parse_lua(text, self.loweringKeys)
+        except LuaSyntaxError as e:
+            self.error = True
+            self.errors += 1
+            self.errorMsg += f"Error: {e}\n"
+            return dict()
+
+    def __search(self):
+        patterns = [
+            (searchKey, re.compile(".*>(" + searchKey.split(":")[-1].replace("*", ".*") + ")$"))
+            for searchKey in self.__searchPattern
+        ]
+        for parent, key, value in _walk(self.__parsedData):
+            path = parent + ">" + key
+            for searchKey, pattern in patterns:
+                if pattern.match(path):
+                    self.__addResult(searchKey, parent, key, value)
+
+    def __addResult(self, searchKey, parent, key, value):
+        # get command from key
+        valcmd = searchKey.split(":")
+        valcmd = valcmd[0] if len(valcmd) == 2 else "none"
+        resultKey = self.__searchPattern[searchKey]
+        if valcmd == "count":
+            count = 1 if isinstance(value, str) else len(value)
+            resultVal = self.__searchResult.get(resultKey, 0) + count
         else:
-            if self.zip.testzip() is None:
-                for member in self.zip.namelist():
-                    filename = os.path.basename(member)
-                    if not filename:
-                        continue
-                    if filename == self.__path:
-                        f = self.zip.open(member)
-                        break
-        if not f:
-            return
-
-        self.__stream = f.readlines()
-        if self.__stream[-1][-1] != "\n":  # file doesn't end in a newline
-            # needed to prevent a bug happening when a file doesn't end with a
-            # newline.
-            self.__stream[-1] += "\n"
-        f.close()
-        # call recursive function
-        result = self.__processLine()
-        return result
+            resultVal = value
+        resultKey = resultKey.replace("__self__", key)
+        resultKey = resultKey.replace("__parent__", parent.split(">")[-1])
+        # unpack command from search key
+        keycmd = resultKey.split(":")
+        if len(keycmd) == 2:
+            keydst, resultKey = keycmd
+            destination = self.__searchResult.setdefault(keydst, dict())
+            if isinstance(destination, dict):
+                destination[resultKey] = resultVal
+        else:
+            self.__searchResult[resultKey] = resultVal
+        if isinstance(resultVal, int):
+            self.__foundItemsCount[searchKey] += resultVal
+        else:
+            self.__foundItemsCount[searchKey] += 1
 
     def __checkErrors(self):
         for key in self.__foundItemsCount:
             resultKey = self.__searchPattern[key]
-            if len(key.split(":")) == 2 or key.find("*") != -1:
-                if self.__foundItemsCount[key] == 0:
-                    if resultKey in self.__defaultValues:
-                        self.__searchResult[resultKey] = self.__defaultValues[resultKey]
-                    else:
-                        self.error = True
-                        self.errors += 1
-                        self.errorMsg += f"Error: no matches for {key!r} were found\n"
-            else:
-                if self.__foundItemsCount[key] == 0:
-                    if resultKey in self.__defaultValues:
-                        self.__searchResult[resultKey] = self.__defaultValues[resultKey]
-                    else:
-                        self.error = True
-                        self.errors += 1
-                        self.errorMsg += f"Error: no matches for {key!r} were found\n"
-                elif self.__foundItemsCount[key] > 1:
-                    self.warning = True
-                    self.warnings += 1
-                    self.errorMsg += f"Warning: there were duplicate occurrences for {key!r}\n"
+            if self.__foundItemsCount[key] == 0:
+                if resultKey in self.__defaultValues:
+                    self.__searchResult[resultKey] = self.__defaultValues[resultKey]
+                else:
+                    self.error = True
+                    self.errors += 1
+                    self.errorMsg += f"Error: no matches for {key!r} were found\n"
+            elif (
+                self.__foundItemsCount[key] > 1
+                and len(key.split(":")) != 2
+                and key.find("*") == -1
+            ):
+                self.warning = True
+                self.warnings += 1
+                self.errorMsg += f"Warning: there were duplicate occurrences for {key!r}\n"
 
     def parse(self, luaSearch, defValues=dict()):
         self.__searchPattern.update(luaSearch)
         self.__defaultValues.update(defValues)
         self.__foundItemsCount = {}.fromkeys(self.__searchPattern, 0)
         self.__parsedData = self.__parseLua()
+        self.__search()
         self.__checkErrors()
         return self.__searchResult
+
+
+def parse_files(paths, luaSearch, defValues=dict(), max_workers=4):
+    """
+    Parses many lua files, like every scenario in a maps folder, in a
+    thread pool. Returns a dict of path to (result, parser).
+    """
+    def parse(path):
+        parser = luaParser(path)
+        try:
+            return parser.parse(luaSearch, defValues), parser
+        except OSError as e:
+            parser.error = True
+            parser.errors += 1
+            parser.errorMsg += f"Error: {e}\n"
+            return dict(), parser
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(paths, pool.map(parse, paths)))
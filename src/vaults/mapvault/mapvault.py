@@ -253,5 +253,6 @@ class MapVault(Vault):
         maps_folder = os.path.join(maps.getUserMapsFolder(), folder)
         if os.path.exists(maps_folder):
             shutil.rmtree(maps_folder)
+            maps.user_maps().discard(folder)
             self.installed_maps.remove(folder)
             self.update_visibilities()
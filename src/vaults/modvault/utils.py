@@ -5,14 +5,16 @@ import shutil
 import zipfile
 
 from PyQt6 import QtCore
-from PyQt6 import QtGui
 from PyQt6 import QtWidgets
 
 from src import util
 from src.config import Settings
 from src.util import PREFSFILENAME
+from src.util.dds import DDSError
+from src.util.dds import load_dds
 from src.vaults import luaparser
 from src.vaults.dialogs import downloadVaultAsset
+from src.vaults.localcontent import LocalContentIndex
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +36,7 @@ MODVAULT_DOWNLOAD_ROOT = "{}/faf/vault/".format(Settings.get('content/host'))
 
 installedMods = []  # This is a global list that should be kept intact.
 # So it should be cleared using installedMods[:] = []
+_installed_mods = None
 
 # mods selected by user, are not overwritten by temporary mods selected when
 # joining game
@@ -80,22 +83,40 @@ def getAllModFolders():  # returns a list of names of installed mods
     return mods
 
 
+def installed_mods() -> LocalContentIndex:
+    """
+    Index of the user's mods folder, with mod info of every mod.
+    """
+    global _installed_mods
+    if _installed_mods is None or _installed_mods.folder != MODFOLDER:
+        _installed_mods = LocalContentIndex(
+            MODFOLDER,
+            os.path.join(util.CACHE_DIR, "local_mods.json"),
+            readModInfo,
+        )
+    return _installed_mods
+
+
+def readModInfo(name):
+    """
+    Reads mod info of a mod folder or zip in MODFOLDER, bypassing modCache
+    """
+    modCache.pop(name, None)
+    if os.path.isdir(os.path.join(MODFOLDER, name)):
+        m = getModInfoFromFolder(name)
+    else:
+        m = getModInfoFromZip(name)
+    return None if m is None else m.to_dict()
+
+
 def getInstalledMods():
     installedMods[:] = []
-    for f in getAllModFolders():
-        m = None
-        if os.path.isdir(os.path.join(MODFOLDER, f)):
-            try:
-                m = getModInfoFromFolder(f)
-            except BaseException:
-                continue
-        else:
-            try:
-                m = getModInfoFromZip(f)
-            except BaseException:
-                continue
-        if m:
-            installedMods.append(m)
+    for entry in installed_mods():
+        if entry.metadata is None:
+            continue
+        m = ModInfo(**entry.metadata)
+        m.update()
+        installedMods.append(m)
     logger.debug("Getting installed mods. Count:{}".format(len(installedMods)))
     return installedMods
 
@@ -398,20 +419,11 @@ def generateThumbnail(sourcename, destname):
     )
 
     try:
-        img = bytearray()
-        buf = bytearray(16)
-        with open(sourcename, "rb") as f:
-            f.seek(128)  # skip header
-            while f.readinto(buf):
-                img += buf[:3] + buf[4:7] + buf[8:11] + buf[12:15]
-
-        size = int((len(img) / 3) ** (1.0 / 2))
-        image = QtGui.QImage(img, size, size, QtGui.QImage.Format_RGB888)
-        imageFile = image.rgbSwapped().scaled(
+        imageFile = load_dds(sourcename).scaled(
             100, 100, transformMode=QtCore.Qt.TransformationMode.SmoothTransformation,
         )
         imageFile.save(destname)
-    except IOError:
+    except (IOError, DDSError):
         return False
 
     if os.path.isfile(destname):
@@ -442,7 +454,10 @@ def downloadMod(link: str, name: str) -> bool:
         removeMod(oldmod)
         return True
 
-    return downloadVaultAsset(link, MODFOLDER, handle_exist, name, "mod", silent=False)
+    if not downloadVaultAsset(link, MODFOLDER, handle_exist, name, "mod", silent=False):
+        return False
+    installed_mods().refresh()
+    return True
 
 
 def removeMod(mod):
@@ -459,6 +474,7 @@ def removeMod(mod):
     if real.localfolder in modCache:
         del modCache[real.localfolder]
     installedMods.remove(real)
+    installed_mods().discard(real.localfolder)
     return True
     # we don't update the installed mods, because the operating system takes
     # some time registering the deleted folder.
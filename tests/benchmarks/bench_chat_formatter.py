@@ -0,0 +1,102 @@
+"""
+Formats the lines of a channel log the way a chat tab does and reports how
+long it took.
+
+Usage: python tests/benchmarks/bench_chat_formatter.py [channel.log]
+
+The log has one "<sender> text" line per message, as irc clients save them,
+optionally with a "[HH:MM]" in front. Without one, a log of a busy channel is
+generated.
+"""
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from PyQt6.QtWidgets import QApplication  # noqa: E402
+
+from src.model.chat.chatline import ChatLine  # noqa: E402
+from src.model.chat.chatline import ChatLineMetadata  # noqa: E402
+from src.model.chat.chatline import ChatLineType  # noqa: E402
+from src.util.magic_dict import MagicDict  # noqa: E402
+
+LOG_LINE = re.compile(r"(?:\[[\d:]+\]\s*)?<([^>]+)>\s(.*)")
+SENDERS = 200
+LINES = 20000
+ME = "player0"
+
+
+def generate_log(seed=0):
+    rng = random.Random(seed)
+    words = "gg wp anyone for setons need 1 more 4v4 rated lobby map".split()
+    for _ in range(LINES):
+        sender = f"player{int(rng.paretovariate(1)) % SENDERS}"
+        text = " ".join(rng.choice(words) for _ in range(rng.randrange(1, 15)))
+        if rng.random() < 0.02:
+            text += f" {ME}"
+        yield sender, text
+
+
+def read_log(path):
+    with open(path, encoding="utf-8", errors="replace") as log:
+        for line in log:
+            match = LOG_LINE.match(line)
+            if match:
+                yield match.group(1), match.group(2)
+
+
+def line_data(senders, sender, text, timestamp):
+    # What ChatLineMetadataBuilder puts together for a line
+    id_, clan, is_mod, is_friend, is_foe = senders.setdefault(
+        sender, (len(senders), random.choice([None, "FAF"]), False,
+                 random.random() < 0.05, random.random() < 0.01),
+    )
+    meta = MagicDict()
+    cmeta = meta.put("chatter")
+    cmeta.is_mod = is_mod
+    cmeta.name = sender
+    pmeta = meta.put("player")
+    pmeta.clan = clan
+    pmeta.id = id_
+    meta.is_friend = is_friend
+    meta.is_foe = is_foe
+    meta.is_me = sender == ME
+    meta.is_clannie = clan == "FAF"
+    meta.mentions_me = ME in text and sender != ME
+    line = ChatLine(sender, text, ChatLineType.MESSAGE, timestamp)
+    return ChatLineMetadata(line, meta)
+
+
+def main(argv):
+    app = QApplication(argv)  # noqa: F841
+    # The client package needs an application, and has to be imported
+    # before the chat views
+    import src.client  # noqa: F401
+    from src.chat.channel_view import ChatLineFormatter
+    from src.client.playercolors import PlayerColors
+    from src.util import THEME
+
+    log = read_log(argv[1]) if len(argv) > 1 else generate_log()
+    random.seed(0)
+    senders = {}
+    start_time = time.time()
+    lines = [
+        line_data(senders, sender, text, start_time + n)
+        for n, (sender, text) in enumerate(log)
+    ]
+
+    formatter = ChatLineFormatter(THEME, PlayerColors(None, None, THEME))
+    start = time.perf_counter()
+    for data in lines:
+        formatter.format(data)
+    elapsed = time.perf_counter() - start
+
+    print(f"{len(lines)} lines from {len(senders)} senders in {elapsed * 1000:.0f} ms")
+    print(f"{elapsed / len(lines) * 1e6:.1f} us per line")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,175 @@
+"""
+Resolves a replay vault page with src.api.jsonapi and with the resolution
+DataApiAccessor used before, and reports how long each took and how much
+memory it needed at its peak.
+
+Usage: python tests/benchmarks/bench_jsonapi.py [page.json [revision]]
+
+The page is a response of the api's game endpoint with its includes, as the
+replay vault requests it. Without one, a page of 100 games with 8 players
+each is generated. The old resolution is read from git at the given
+revision, by default the one before src.api.jsonapi was added.
+"""
+import ast
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+sys.path.insert(0, ROOT)
+
+from src.api.jsonapi import resolve_document  # noqa: E402
+
+GAMES = 100
+PLAYERS_PER_GAME = 8
+PLAYERS = 1000
+MAPS = 60
+MODS = ("faf", "ladder1v1", "coop", "nomads")
+REPEATS = 20
+
+
+def ref(type_, id_):
+    return {"data": {"type": type_, "id": str(id_)}}
+
+
+def generate_page(seed=0):
+    rng = random.Random(seed)
+    games, included = [], []
+    included.extend(
+        {"type": "player", "id": str(i), "attributes": {"login": f"player{i}"}}
+        for i in range(PLAYERS)
+    )
+    for i in range(MAPS):
+        included.append({
+            "type": "map", "id": str(i),
+            "attributes": {"displayName": f"Map {i}", "gamesPlayed": rng.randrange(10**5)},
+        })
+        included.append({
+            "type": "mapVersion", "id": str(i),
+            "attributes": {
+                "folderName": f"map_{i}.v0001", "version": 1, "width": 512, "height": 512,
+            },
+            "relationships": {"map": ref("map", i)},
+        })
+    included.extend(
+        {"type": "featuredMod", "id": str(i), "attributes": {"technicalName": name}}
+        for i, name in enumerate(MODS)
+    )
+    for game_id in range(GAMES):
+        stats = []
+        for slot in range(PLAYERS_PER_GAME):
+            stats_id = game_id * PLAYERS_PER_GAME + slot
+            stats.append({"type": "gamePlayerStats", "id": str(stats_id)})
+            included.append({
+                "type": "gamePlayerStats", "id": str(stats_id),
+                "attributes": {
+                    "faction": rng.randrange(1, 5), "team": slot % 2 + 2,
+                    "score": rng.randrange(-10, 10), "startSpot": slot + 1,
+                },
+                "relationships": {"player": ref("player", rng.randrange(PLAYERS))},
+            })
+        games.append({
+            "type": "game", "id": str(game_id),
+            "attributes": {
+                "name": f"Game {game_id}", "startTime": "2024-01-01T00:00:00Z",
+                "endTime": "2024-01-01T00:30:00Z", "replayTicks": 18000,
+                "validity": "VALID", "victoryCondition": "DEMORALIZATION",
+            },
+            "relationships": {
+                "mapVersion": ref("mapVersion", rng.randrange(MAPS)),
+                "featuredMod": ref("featuredMod", rng.randrange(len(MODS))),
+                "playerStats": {"data": stats},
+            },
+        })
+    return {"data": games, "included": included, "meta": {"page": {"totalPages": 1}}}
+
+
+def git(*args):
+    return subprocess.run(
+        ["git", *args], cwd=ROOT, capture_output=True, check=True, text=True,
+    ).stdout
+
+
+def old_resolution(revision=None):
+    """
+    Returns the parse methods of the old DataApiAccessor as a plain class,
+    so they can run without Qt.
+    """
+    if revision is None:
+        first = git(
+            "log", "--reverse", "--format=%H", "-S", "resolve_document", "--",
+            "src/api/ApiAccessors.py",
+        ).split()[0]
+        revision = f"{first}^"
+    source = git("show", f"{revision}:src/api/ApiAccessors.py")
+    accessor = next(
+        node for node in ast.parse(source).body
+        if isinstance(node, ast.ClassDef) and node.name == "DataApiAccessor"
+    )
+    methods = [
+        node for node in accessor.body
+        if isinstance(node, ast.FunctionDef) and node.name.startswith("parse")
+    ]
+    module = ast.Module(
+        body=[ast.ClassDef(
+            name="OldResolution", bases=[], keywords=[], body=methods, decorator_list=[],
+        )],
+        type_ignores=[],
+    )
+    namespace = {"logger": __import__("logging").getLogger("old_resolution")}
+    exec(compile(ast.fix_missing_locations(module), revision, "exec"), namespace)
+    return git("rev-parse", "--short", revision).strip(), namespace["OldResolution"]()
+
+
+def read_summary(games):
+    # What a vault item shows before it's opened
+    return [(game["name"], game["mapVersion"]["map"]["displayName"],
+             game["featuredMod"]["technicalName"]) for game in games]
+
+
+def read_players(games):
+    read_summary(games)
+    return [[stats["player"]["login"] for stats in game["playerStats"]] for game in games]
+
+
+def measure(resolve, read, raw):
+    best = None
+    for _ in range(REPEATS):
+        message = json.loads(raw)
+        start = time.perf_counter()
+        read(resolve(message)["data"])
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+
+    message = json.loads(raw)
+    tracemalloc.start()
+    result = resolve(message)
+    read(result["data"])
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+def main(argv):
+    if len(argv) > 1:
+        with open(argv[1], "rb") as fh:
+            raw = fh.read()
+    else:
+        raw = json.dumps(generate_page()).encode()
+    revision, old = old_resolution(argv[2] if len(argv) > 2 else None)
+    games = len(json.loads(raw)["data"])
+    print(f"{games} games, {len(raw) / 1024:.0f} KiB")
+
+    for read in (read_summary, read_players):
+        print(f"{read.__name__}:")
+        for name, resolve in ((f"old ({revision})", old.parse_message), ("new", resolve_document)):
+            elapsed, peak = measure(resolve, read, raw)
+            print(f"  {name}: {elapsed * 1000:.2f} ms, {peak / 1024:.0f} KiB peak")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,128 @@
+"""
+Parses the scenario and mod_info files in a folder with the lua parser and
+with the one it replaced, and reports how long each took and for how many
+files their results differ.
+
+Usage: python tests/benchmarks/bench_luaparser.py <folder> [revision]
+
+The folder is searched for *_scenario.lua and mod_info.lua files, so it can
+be a maps or mods folder, or the game's data unpacked. The old parser is
+read from git at the given revision, by default the one before the
+tokenizer replaced it.
+"""
+import os
+import subprocess
+import sys
+import time
+import types
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "..")
+sys.path.insert(0, ROOT)
+
+from src.vaults import luaparser  # noqa: E402
+
+# What the client looks for in these files, see fa.maps and modvault.utils
+SCENARIO_SEARCH = (
+    {
+        "scenarioinfo>name": "name",
+        "size": "map_size",
+        "description": "description",
+        "count:armies": "max_players",
+        "map_version": "version",
+        "type": "map_type",
+    },
+    {"version": "1", "description": "", "map_type": "skirmish"},
+)
+MOD_INFO_SEARCH = (
+    {
+        "name": "name",
+        "uid": "uid",
+        "version": "version",
+        "author": "author",
+        "description": "description",
+        "ui_only": "ui_only",
+        "icon": "icon",
+    },
+    {"version": "1", "ui_only": "false", "description": "", "icon": "", "author": ""},
+)
+REPEATS = 3
+
+
+def git(*args):
+    return subprocess.run(
+        ["git", *args], cwd=ROOT, capture_output=True, check=True, text=True,
+    ).stdout
+
+
+def old_parser(revision=None):
+    if revision is None:
+        first = git(
+            "log", "--reverse", "--format=%H", "-S", "def tokenize", "--",
+            "src/vaults/luaparser.py",
+        ).split()[0]
+        revision = f"{first}^"
+    module = types.ModuleType("old_luaparser")
+    source = git("show", f"{revision}:src/vaults/luaparser.py")
+    exec(compile(source, f"{revision}:luaparser.py", "exec"), module.__dict__)
+    return git("rev-parse", "--short", revision).strip(), module
+
+
+def find_files(folder):
+    for dirpath, _, filenames in os.walk(folder):
+        for filename in filenames:
+            name = filename.lower()
+            if name.endswith("_scenario.lua"):
+                yield os.path.join(dirpath, filename), SCENARIO_SEARCH
+            elif name == "mod_info.lua":
+                yield os.path.join(dirpath, filename), MOD_INFO_SEARCH
+
+
+def parse_all(module, files):
+    results = []
+    for path, (search, defaults) in files:
+        try:
+            results.append(module.luaParser(path).parse(dict(search), dict(defaults)))
+        except Exception as e:
+            results.append(e)
+    return results
+
+
+def timed(module, files):
+    best = None
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        results = parse_all(module, files)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, results
+
+
+def main(argv):
+    if len(argv) < 2:
+        print(__doc__)
+        return 1
+    files = list(find_files(argv[1]))
+    if not files:
+        print(f"No scenario or mod_info files in {argv[1]}")
+        return 1
+    revision, old = old_parser(argv[2] if len(argv) > 2 else None)
+
+    old_time, old_results = timed(old, files)
+    new_time, new_results = timed(luaparser, files)
+
+    print(f"{len(files)} files")
+    for name, elapsed in ((f"old ({revision})", old_time), ("new", new_time)):
+        print(f"{name}: {elapsed * 1000:.0f} ms, {elapsed / len(files) * 1e6:.0f} us per file")
+
+    differing = [
+        path for (path, _), old_result, new_result in zip(files, old_results, new_results)
+        if old_result != new_result
+    ]
+    print(f"{len(differing)} files parsed differently")
+    for path in differing[:10]:
+        print(f"  {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv))
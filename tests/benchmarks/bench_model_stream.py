@@ -0,0 +1,156 @@
+"""
+Replays a stream of player_info and game_info messages into the player and
+game models and reports how long it took and how much memory the models
+hold afterwards.
+
+Usage: python tests/benchmarks/bench_model_stream.py [stream.jsonl]
+
+The stream has one server message per line, as the server sends them. Without
+one, a stream with the shape of a busy evening on the server is generated.
+"""
+import copy
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", ".."))
+
+from PyQt6.QtCore import QCoreApplication  # noqa: E402
+
+from src.model.game import Game  # noqa: E402
+from src.model.game import message_to_game_args  # noqa: E402
+from src.model.gameset import Gameset  # noqa: E402
+from src.model.gameset import PlayerGameIndex  # noqa: E402
+from src.model.player import Player  # noqa: E402
+from src.model.playerset import Playerset  # noqa: E402
+
+PLAYERS = 10000
+GAMES = 1000
+UPDATES = 50000
+
+
+def generate_stream(seed=0):
+    rng = random.Random(seed)
+
+    def player_info(id_):
+        return {
+            "id": id_,
+            "login": f"player{id_}",
+            "avatar": None,
+            "country": rng.choice(["PL", "DE", "US", "RU", ""]),
+            "clan": rng.choice([None, "FAF", "SCF"]),
+            "league": None,
+            "ratings": {
+                "global": {
+                    "rating": [rng.gauss(1500, 300), rng.uniform(50, 500)],
+                    "number_of_games": rng.randrange(1000),
+                },
+                "ladder_1v1": {
+                    "rating": [rng.gauss(1500, 300), rng.uniform(50, 500)],
+                    "number_of_games": rng.randrange(1000),
+                },
+            },
+        }
+
+    def game_info(uid, state="open"):
+        host = rng.randrange(PLAYERS)
+        teams = {"1": [f"player{host}"], "2": []}
+        return {
+            "command": "game_info",
+            "uid": uid,
+            "state": state,
+            "launched_at": time.time() if state == "playing" else None,
+            "num_players": 1,
+            "max_players": 8,
+            "title": f"Game {uid}",
+            "host": f"player{host}",
+            "mapname": "scmp_009",
+            "map_file_path": "maps/scmp_009.zip",
+            "teams": teams,
+            "featured_mod": "faf",
+            "sim_mods": {},
+            "password_protected": False,
+            "visibility": "public",
+        }
+
+    players = {id_: player_info(id_) for id_ in range(PLAYERS)}
+    games = {uid: game_info(uid) for uid in range(GAMES)}
+    yield copy.deepcopy({"command": "player_info", "players": list(players.values())})
+    yield copy.deepcopy({"command": "game_info", "games": list(games.values())})
+
+    for _ in range(UPDATES):
+        roll = rng.random()
+        if roll < 0.5:
+            # Most player updates resend what we already know
+            player = players[rng.randrange(PLAYERS)]
+            if rng.random() < 0.3:
+                player["ratings"]["global"]["number_of_games"] += 1
+            yield {"command": "player_info", "players": [copy.deepcopy(player)]}
+        else:
+            game = games[rng.randrange(GAMES)]
+            if roll < 0.9:
+                game["teams"]["2"].append(f"player{rng.randrange(PLAYERS)}")
+                game["num_players"] += 1
+            elif roll < 0.95:
+                game["state"] = "playing"
+                game["launched_at"] = time.time()
+            yield copy.deepcopy(game)
+
+
+def read_stream(path):
+    with open(path) as stream:
+        for line in stream:
+            if line.strip():
+                yield json.loads(line)
+
+
+def replay(messages, playerset, gameset):
+    for message in messages:
+        if message["command"] == "player_info":
+            for player in message["players"]:
+                player = dict(player, id_=player["id"])
+                del player["id"]
+                if player["id_"] in playerset:
+                    playerset[player["id_"]].update(**player)
+                else:
+                    playerset[player["id_"]] = Player(**player)
+        elif "games" in message:
+            gameset.apply_batch(message["games"])
+        elif message_to_game_args(message):
+            uid = message["uid"]
+            if uid in gameset:
+                gameset[uid].update(**message)
+            else:
+                try:
+                    gameset[uid] = Game(playerset=playerset, **message)
+                except ValueError:
+                    pass
+
+
+def main(argv):
+    app = QCoreApplication(argv)  # noqa: F841
+    if len(argv) > 1:
+        messages = list(read_stream(argv[1]))
+    else:
+        messages = list(generate_stream())
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    playerset = Playerset()
+    gameset = Gameset(playerset)
+    index = PlayerGameIndex(gameset, playerset)  # noqa: F841
+    replay(messages, playerset, gameset)
+    elapsed = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{len(messages)} messages in {elapsed:.2f} s ({len(messages) / elapsed:.0f}/s)")
+    print(f"{len(playerset)} players, {len(gameset)} games")
+    print(f"{held / 2 ** 20:.1f} MiB held, {peak / 2 ** 20:.1f} MiB peak")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -0,0 +1,49 @@
+import hashlib
+import os
+
+from src.fa.game_updater.hashcache import FileHashCache
+
+
+def test_hashes_are_cached_by_size_and_mtime(tmp_path):
+    cache_file = str(tmp_path / "cache" / "hashes.json")
+    path = tmp_path / "file.bin"
+    path.write_bytes(b"a" * 1000)
+    missing = str(tmp_path / "missing.bin")
+
+    cache = FileHashCache(cache_file)
+    reported = []
+    md5s = cache.get_many([str(path), missing], reported.append)
+    assert md5s == {
+        str(path): hashlib.md5(b"a" * 1000).hexdigest(),
+        missing: None,
+    }
+    assert sorted(reported) == sorted([str(path), missing])
+    cache.save()
+
+    # A fresh cache trusts the stored hash while size and mtime match
+    st = os.stat(path)
+    cached = FileHashCache(cache_file)
+    cached.hashes[str(path)] = (st.st_size, st.st_mtime_ns, "stored")
+    assert cached.get(str(path)) == "stored"
+
+    path.write_bytes(b"b" * 1000)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert cached.get(str(path)) == hashlib.md5(b"b" * 1000).hexdigest()
+
+
+def test_hashes_survive_restart(tmp_path):
+    cache_file = str(tmp_path / "hashes.json")
+    paths = []
+    for i in range(10):
+        path = tmp_path / f"{i}.bin"
+        path.write_bytes(bytes([i]) * 100)
+        paths.append(str(path))
+
+    cache = FileHashCache(cache_file)
+    md5s = cache.get_many(paths)
+    cache.save()
+
+    reloaded = FileHashCache(cache_file)
+    assert len(reloaded.hashes) == 10
+    assert reloaded.get_many(paths) == md5s
+    assert not reloaded._dirty
@@ -0,0 +1,106 @@
+import logging
+import os
+
+import pytest
+from PyQt6 import QtGui
+
+from src import util
+from src.fa import maps
+
+
+@pytest.fixture
+def preview_dir(tmp_path, mocker):
+    mocker.patch.object(util, "MAP_PREVIEW_SMALL_DIR", str(tmp_path))
+    mocker.patch.object(maps, "export_preview_from_map", return_value=None)
+    return tmp_path
+
+
+def write_preview(directory, mapname):
+    image = QtGui.QImage(4, 4, QtGui.QImage.Format.Format_RGB32)
+    image.fill(0xff0000)
+    assert image.save(os.path.join(directory, f"{mapname}.png"))
+
+
+def test_previews_are_cached_in_memory(application, preview_dir):
+    previews = maps.MapPreviews()
+    write_preview(preview_dir, "scmp_001")
+
+    assert previews.cached("scmp_001") is None
+    assert isinstance(previews.get("scmp_001"), QtGui.QIcon)
+    os.remove(preview_dir / "scmp_001.png")
+    assert previews.get("scmp_001", pixmap=True).width() == 4
+
+
+def test_missing_previews_are_remembered(application, preview_dir, mocker):
+    previews = maps.MapPreviews()
+    assert previews.get("scmp_002") is None
+    assert previews.missing("scmp_002")
+
+    write_preview(preview_dir, "scmp_002")
+    assert previews.get("scmp_002") is None
+
+    mocker.patch.object(maps.time, "monotonic", return_value=maps.time.monotonic() + 61)
+    assert not previews.missing("scmp_002")
+    assert previews.get("scmp_002") is not None
+
+
+def test_forget_allows_reload(application, preview_dir):
+    previews = maps.MapPreviews()
+    assert previews.get("scmp_003") is None
+    write_preview(preview_dir, "scmp_003")
+    previews.forget("scmp_003")
+    assert previews.get("scmp_003") is not None
+
+
+def test_least_recently_used_previews_are_dropped(application, preview_dir, mocker):
+    mocker.patch.object(maps.MapPreviews, "MAX_PREVIEWS", 2)
+    previews = maps.MapPreviews()
+    for name in ("a", "b", "c"):
+        write_preview(preview_dir, name)
+
+    previews.get("a")
+    previews.get("b")
+    previews.cached("a")
+    previews.get("c")
+    assert previews.cached("b") is None
+    assert previews.cached("a") is not None
+    assert previews.cached("c") is not None
+
+
+def test_request_loads_in_background(application, preview_dir, qtbot):
+    previews = maps.MapPreviews()
+    write_preview(preview_dir, "scmp_004")
+    try:
+        with qtbot.waitSignal(previews.loaded) as blocker:
+            previews.request("scmp_004")
+        assert blocker.args == ["scmp_004", True]
+        assert previews.cached("scmp_004") is not None
+
+        with qtbot.waitSignal(previews.loaded) as blocker:
+            previews.request("scmp_005")
+        assert blocker.args == ["scmp_005", False]
+        assert previews.missing("scmp_005")
+    finally:
+        previews.stop()
+
+
+def test_user_maps_follow_personal_dir(application, tmp_path, mocker):
+    mocker.patch.object(maps, "__user_maps", None)
+    mocker.patch.object(util, "CACHE_DIR", str(tmp_path / "cache"))
+    mocker.patch.object(util, "PERSONAL_DIR", str(tmp_path / "a"))
+    first = maps.user_maps()
+    assert maps.user_maps() is first
+
+    mocker.patch.object(util, "PERSONAL_DIR", str(tmp_path / "b"))
+    assert maps.user_maps().folder == maps.getUserMapsFolder()
+    assert maps.user_maps() is not first
+
+
+def test_unreadable_dds_is_logged(tmp_path, caplog):
+    source = tmp_path / "preview.dds"
+    source.write_bytes(b"not a dds file")
+
+    with caplog.at_level(logging.DEBUG, logger=maps.logger.name):
+        with pytest.raises(IOError):
+            maps.genPrevFromDDS(str(source), str(tmp_path / "preview.png"))
+    assert any(record.exc_info for record in caplog.records)
@@ -0,0 +1,203 @@
+import base64
+import io
+import struct
+import zlib
+
+import pytest
+import zstandard
+
+from src.fa.replayparser import ReplayCommand
+from src.fa.replayparser import ReplayCommandType
+from src.fa.replayparser import ReplayDataParser
+from src.fa.replayparser import ReplayParser
+from src.fa.replayparser import ReplayStreamParser
+from src.fa.replayparser import ReplaySummary
+
+
+def lua_string(value):
+    return b"\x01" + value.encode() + b"\x00"
+
+
+def lua_table(items):
+    data = b"\x04"
+    for key, value in items.items():
+        data += lua_string(key)
+        if isinstance(value, str):
+            data += lua_string(value)
+        elif isinstance(value, bool):
+            data += b"\x03" + bytes([value])
+        elif value is None:
+            data += b"\x02\x00"
+        elif isinstance(value, dict):
+            data += lua_table(value)
+        else:
+            data += b"\x00" + struct.pack("<f", value)
+    return data + b"\x05"
+
+
+def sized(data):
+    return struct.pack("<i", len(data)) + data
+
+
+def replay_header(players=("Alice", "Bob")):
+    data = b"Supreme Commander v1.50.3780\x00"
+    data += b"\r\n\x00"
+    data += b"Replay v1.9\r\n/maps/scmp_001/scmp_001.scmap\x00"
+    data += b"\r\n\x1a\x00"
+    data += sized(lua_table({"mod": {"uid": "abc", "name": "Mod"}}))
+    data += sized(lua_table({"Ranked": True, "Size": 256, "None": None}))
+    data += bytes([len(players)])
+    for player_id, name in enumerate(players):
+        data += name.encode() + b"\x00" + struct.pack("<i", player_id)
+    data += b"\x00"  # cheats
+    data += bytes([len(players)])
+    for source, name in enumerate(players):
+        data += sized(lua_table({"PlayerName": name})) + bytes([source, 255])
+    data += struct.pack("<I", 1234)
+    return data
+
+
+def test_parse_header():
+    header = ReplayDataParser(replay_header()).parse_header()
+
+    assert header["game_version"] == 3780
+    assert header["replay_version"] == "Replay v1.9"
+    assert header["mapname"] == "scmp_001"
+    assert header["sim_mods"] == {"mod": {"uid": "abc", "name": "Mod"}}
+    assert "players" not in header
+
+
+@pytest.mark.parametrize("wrap", [bytes, bytearray, memoryview])
+def test_parse_full_header(wrap):
+    data = replay_header() + b"body"
+    parser = ReplayDataParser(wrap(data))
+    header = parser.parse_header(full=True)
+
+    assert header["scenario"] == {"Ranked": True, "Size": 256.0, "None": None}
+    assert header["players"] == {"Alice": 0, "Bob": 1}
+    assert not header["cheats_enabled"]
+    assert header["armies"] == {0: {"PlayerName": "Alice"}, 1: {"PlayerName": "Bob"}}
+    assert header["random_seed"] == 1234
+    assert parser.body_offset == len(data) - len(b"body")
+
+
+def test_replay_parser_reads_file(tmp_path):
+    replay_file = tmp_path / "test.scfareplay"
+    replay_file.write_bytes(replay_header())
+
+    header = ReplayParser(str(replay_file)).parse_header(full=True)
+
+    assert header["mapname"] == "scmp_001"
+    assert header["random_seed"] == 1234
+
+
+def test_unterminated_string_raises():
+    with pytest.raises(struct.error):
+        ReplayDataParser(memoryview(b"Supreme Commander")).parse_header()
+
+
+def operation(op, data=b""):
+    return struct.pack("<BH", op, len(data) + 3) + data
+
+
+def advance(ticks=1):
+    return operation(ReplayCommandType.ADVANCE, struct.pack("<I", ticks))
+
+
+def set_source(source):
+    return operation(ReplayCommandType.SET_COMMAND_SOURCE, bytes([source]))
+
+
+def checksum(value, tick):
+    data = bytes([value]) * 16 + struct.pack("<I", tick)
+    return operation(ReplayCommandType.VERIFY_CHECKSUM, data)
+
+
+def replay_body():
+    body = b""
+    for tick in range(600):
+        body += set_source(0) + operation(ReplayCommandType.ISSUE_COMMAND, b"x" * 10)
+        if tick % 2 == 0:
+            body += set_source(1) + operation(ReplayCommandType.ISSUE_FACTORY_COMMAND)
+        if tick == 100:
+            body += set_source(0) + checksum(1, 50) + set_source(1) + checksum(1, 50)
+        if tick == 200:
+            body += set_source(0) + checksum(1, 150) + set_source(1) + checksum(2, 150)
+        body += advance()
+    return body
+
+
+def test_iter_ticks():
+    parser = ReplayStreamParser(io.BytesIO(replay_header() + replay_body()))
+    parser.READ_CHUNK = 64
+
+    ticks = list(parser.iter_ticks())
+
+    assert parser.header["players"] == {"Alice": 0, "Bob": 1}
+    assert parser.tick == 600
+    assert len(ticks) == 600
+    assert ticks[0].tick == 0
+    assert ticks[0].commands == [
+        ReplayCommand(0, ReplayCommandType.ISSUE_COMMAND, b"x" * 10),
+        ReplayCommand(1, ReplayCommandType.ISSUE_FACTORY_COMMAND, b""),
+    ]
+    assert len(ticks[1].commands) == 1
+
+
+def test_iter_ticks_stops_at_truncated_operation():
+    data = replay_header() + advance() + set_source(0) + operation(12, b"abc")
+    parser = ReplayStreamParser(io.BytesIO(data[:-2]))
+
+    assert list(parser.iter_ticks()) == []
+    assert parser.tick == 1
+
+
+def test_summary(tmp_path):
+    replay_file = tmp_path / "test.scfareplay"
+    replay_file.write_bytes(replay_header() + replay_body())
+
+    summary = ReplaySummary.from_file(str(replay_file))
+
+    assert summary.duration == 60
+    assert summary.apm(0) == 600
+    assert summary.apm(1) == 300
+    assert summary.command_counts[0][ReplayCommandType.VERIFY_CHECKSUM] == 2
+    assert summary.player_name(1) == "Bob"
+    assert summary.desyncs == [150]
+
+
+def test_summary_of_zstd_fafreplay(tmp_path):
+    replay_file = tmp_path / "test.fafreplay"
+    compressed = zstandard.ZstdCompressor().compress(replay_header() + replay_body())
+    replay_file.write_bytes(b'{"compression": "zstd"}\n' + compressed)
+
+    summary = ReplaySummary.from_file(str(replay_file))
+
+    assert summary.ticks == 600
+    assert summary.desyncs == [150]
+
+
+def test_summary_of_legacy_fafreplay(tmp_path):
+    replay_file = tmp_path / "test.fafreplay"
+    data = replay_header() + replay_body()
+    compressed = struct.pack(">I", len(data)) + zlib.compress(data)
+    replay_file.write_bytes(b'{}\n' + base64.b64encode(compressed))
+
+    summary = ReplaySummary.from_file(str(replay_file))
+
+    assert summary.ticks == 600
+    assert summary.apm(0) == 600
+
+
+def test_summary_forgets_checksums_outside_window():
+    summary = ReplaySummary({})
+    window = summary.CHECKSUM_WINDOW
+    for tick in range(window * 3):
+        summary._check_sync(b"a", tick)
+        assert len(summary._checksums) <= window + 1
+
+    last = window * 3 - 1
+    summary._check_sync(b"b", last - window)
+    summary._check_sync(b"b", last - window - 1)
+
+    assert summary.desyncs == [last - window]
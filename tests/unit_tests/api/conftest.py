@@ -0,0 +1,57 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from src.api.ApiBase import ApiBase
+from src.api.response_cache import ApiResponseCache
+
+
+class Handler(BaseHTTPRequestHandler):
+    """
+    Answers every GET with ``body``, or 304 if the client has it already.
+    Requests are recorded as (path, If-None-Match header).
+    """
+    body = b""
+    requests = []
+
+    def do_GET(self):
+        self.requests.append((self.path, self.headers.get("If-None-Match")))
+        time.sleep(0.05)
+        if self.headers.get("If-None-Match") == '"v1"':
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = self.body
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    handler = type("TestHandler", (Handler,), {
+        "body": b'{"data": [], "meta": {}}',
+        "requests": [],
+    })
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    httpd.url = f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.handler = handler
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def api_cache(tmp_path, mocker):
+    mocker.patch.object(ApiBase, "oauth")
+    mocker.patch.object(ApiBase, "cache", ApiResponseCache(str(tmp_path)))
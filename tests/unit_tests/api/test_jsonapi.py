@@ -0,0 +1,135 @@
+import json
+from collections.abc import Mapping
+
+from PyQt6.QtCore import QUrl
+
+from src.api.ApiAccessors import DataApiAccessor
+from src.api.jsonapi import resolve_document
+from src.api.models.Player import Player
+
+DOCUMENT = {
+    "data": [
+        {
+            "type": "game",
+            "id": "1",
+            "attributes": {"name": "Game 1"},
+            "relationships": {
+                "mapVersion": {"data": {"type": "mapVersion", "id": "10"}},
+                "playerStats": {"data": [
+                    {"type": "gamePlayerStats", "id": "100"},
+                    {"type": "gamePlayerStats", "id": "101"},
+                ]},
+                "host": {"data": None},
+                "reviews": {"links": {"self": "http://api/game/1/reviews"}},
+                "featuredMod": {"data": {"type": "featuredMod", "id": "0"}},
+            },
+        },
+    ],
+    "included": [
+        {
+            "type": "mapVersion",
+            "id": "10",
+            "attributes": {"folderName": "scmp_001"},
+        },
+        {
+            "type": "gamePlayerStats",
+            "id": "100",
+            "attributes": {"score": 10},
+            "relationships": {"player": {"data": {"type": "player", "id": "5"}}},
+        },
+        {
+            "type": "gamePlayerStats",
+            "id": "101",
+            "attributes": {"score": 20},
+            "relationships": {"player": {"data": {"type": "player", "id": "5"}}},
+        },
+        {
+            "type": "player",
+            "id": "5",
+            "attributes": {
+                "login": "Rhyza",
+                "userAgent": None,
+                "createTime": "2020-01-01T00:00:00Z",
+                "updateTime": "2020-01-01T00:00:00Z",
+            },
+            "relationships": {"avatarAssignments": {"data": []}},
+        },
+    ],
+    "meta": {"page": {"number": 1}},
+}
+
+
+def plain(value):
+    if isinstance(value, Mapping):
+        return {key: plain(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [plain(item) for item in value]
+    return value
+
+
+def test_resolves_includes():
+    result = resolve_document(json.loads(json.dumps(DOCUMENT)))
+
+    player = {
+        "id": "5",
+        "type": "player",
+        "login": "Rhyza",
+        "userAgent": None,
+        "createTime": "2020-01-01T00:00:00Z",
+        "updateTime": "2020-01-01T00:00:00Z",
+        "avatarAssignments": [],
+    }
+    assert result["meta"] == {"page": {"number": 1}}
+    assert plain(result["data"]) == [{
+        "id": "1",
+        "type": "game",
+        "name": "Game 1",
+        "mapVersion": {"id": "10", "type": "mapVersion", "folderName": "scmp_001"},
+        "playerStats": [
+            {"id": "100", "type": "gamePlayerStats", "score": 10, "player": player},
+            {"id": "101", "type": "gamePlayerStats", "score": 20, "player": player},
+        ],
+        "host": {},
+        "reviews": {},
+        "featuredMod": {"id": "0", "type": "featuredMod"},
+    }]
+
+
+def test_resources_are_shared_and_lazy():
+    result = resolve_document(json.loads(json.dumps(DOCUMENT)))
+    game, = result["data"]
+
+    first, second = game["playerStats"]
+    assert first["player"] is second["player"]
+    assert game["playerStats"] is game["playerStats"]
+    assert "player" in first
+    assert "login" not in first
+    assert len(game) == 8
+
+
+def test_single_resource_and_models():
+    message = {
+        "data": {"type": "player", "id": "5"},
+        "included": DOCUMENT["included"],
+    }
+    result = resolve_document(message)
+
+    assert result["meta"] == {}
+    player = Player(**result["data"])
+    assert player.login == "Rhyza"
+    assert player.avatar_assignments is None
+
+
+def test_parse_in_thread(application, server, api_cache):
+    server.handler.body = json.dumps(DOCUMENT).encode()
+
+    class Api(DataApiAccessor):
+        parse_in_thread = True
+
+    api = Api()
+    results = []
+    api.get(QUrl(f"{server.url}/data/game"), results.append)
+    api.waitForCompletion()
+
+    result, = results
+    assert result["data"][0]["mapVersion"]["folderName"] == "scmp_001"
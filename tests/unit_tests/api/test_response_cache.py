@@ -0,0 +1,96 @@
+import time
+
+from PyQt6.QtCore import QUrl
+
+from src.api.ApiBase import ApiBase
+from src.api.response_cache import ApiResponseCache
+from src.api.response_cache import CachedResponse
+
+
+def response(body, expires=None, etag=""):
+    expires = time.time() + 60 if expires is None else expires
+    return CachedResponse(body, etag, "", expires)
+
+
+def test_cache_survives_restart(tmp_path):
+    cache = ApiResponseCache(str(tmp_path))
+    cache.put("http://api/data/a", response(b'{"a": 1}', etag='"1"'))
+
+    cached = ApiResponseCache(str(tmp_path)).get("http://api/data/a")
+    assert cached.body == b'{"a": 1}'
+    assert cached.etag == '"1"'
+    assert cached.fresh()
+    assert ApiResponseCache(str(tmp_path)).get("http://api/data/b") is None
+
+
+def test_cache_is_bounded(tmp_path, mocker):
+    mocker.patch.object(ApiResponseCache, "MAX_MEMORY_SIZE", 25)
+    mocker.patch.object(ApiResponseCache, "MAX_DISK_SIZE", 250)
+    cache = ApiResponseCache(str(tmp_path))
+    for i in range(5):
+        cache.put(f"key{i}", response(b"x" * 10))
+        cache.get("key0")
+
+    assert list(cache._memory) == ["key4", "key0"]
+    assert len(list(tmp_path.iterdir())) < 5
+    # The least recently used entry is dropped first
+    assert ApiResponseCache(str(tmp_path)).get("key0") is not None
+    assert ApiResponseCache(str(tmp_path)).get("key1") is None
+
+    cache.clear()
+    assert list(tmp_path.iterdir()) == []
+
+
+class CachedApi(ApiBase):
+    cache_ttl = 60
+
+
+def fetch(apis, url):
+    results = []
+    for api in apis:
+        api.get(QUrl(url), results.append, results.append)
+    for api in apis:
+        api.waitForCompletion()
+    return results
+
+
+def test_identical_requests_share_one_reply(application, server, api_cache):
+    apis = [ApiBase(), ApiBase(), CachedApi()]
+
+    results = fetch(apis, f"{server.url}/data/a")
+
+    assert results == [{"data": [], "meta": {}}] * 3
+    assert server.handler.requests == [("/data/a", None)]
+
+
+def test_responses_are_served_from_cache(application, server, api_cache):
+    fetch([CachedApi()], f"{server.url}/data/a")
+    results = fetch([CachedApi()], f"{server.url}/data/a")
+    fetch([ApiBase()], f"{server.url}/data/a")
+
+    assert results == [{"data": [], "meta": {}}]
+    # Routes without a ttl always ask the server
+    assert server.handler.requests == [("/data/a", None), ("/data/a", None)]
+
+
+def test_expired_responses_are_revalidated(application, server, api_cache, mocker):
+    fetch([CachedApi()], f"{server.url}/data/a")
+    key = f"{server.url}/data/a"
+    ApiBase.cache.put(key, ApiBase.cache.get(key)._replace(expires=0))
+
+    results = fetch([CachedApi()], f"{server.url}/data/a")
+
+    assert results == [{"data": [], "meta": {}}]
+    assert server.handler.requests == [("/data/a", None), ("/data/a", '"v1"')]
+    assert ApiBase.cache.get(key).fresh()
+
+
+def test_abort_keeps_shared_reply_running(application, server, api_cache):
+    first, second = ApiBase(), ApiBase()
+    results = []
+    first.get(QUrl(f"{server.url}/data/a"), results.append)
+    second.get(QUrl(f"{server.url}/data/a"), results.append)
+    first.abort()
+    second.waitForCompletion()
+
+    assert results == [{"data": [], "meta": {}}]
@@ -0,0 +1,226 @@
+import os
+
+import pytest
+from PyQt6 import uic
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import pyqtSignal
+
+from src.chat.channel_widget import ChannelWidget
+from src.model.chat.channel import Channel
+from src.model.chat.channel import ChannelID
+from src.model.chat.channel import ChannelType
+from src.model.chat.channel import Lines
+from src.model.chat.chatline import ChatLine
+from src.model.chat.chatline import ChatLineMetadata
+from src.model.chat.chatline import ChatLineType
+from src.model.chat.chatlog import ChatLog
+
+RES = os.path.join(os.path.dirname(__file__), "..", "..", "..", "res")
+
+# Like chatline.qhtml, a table row that wraps in a narrow chat area
+LINE = (
+    '<tr><td class="col_sender" width=100>{}</td>'
+    '<td width=100% class="col_text">{}</td></tr>'
+)
+
+
+class ChatAreaCss(QObject):
+    changed = pyqtSignal()
+
+    def __init__(self):
+        QObject.__init__(self)
+        self.css = "td { padding: 1px; }"
+
+
+def shown_text(widget):
+    # Non-empty lines of text in the chat area
+    return [line for line in widget.chat_area.toPlainText().split("\n") if line]
+
+
+@pytest.fixture
+def chat_area_css(qapp):
+    return ChatAreaCss()
+
+
+@pytest.fixture
+def channel_widget(qtbot, mocker, chat_area_css):
+    theme = mocker.Mock()
+    theme.loadUiType.side_effect = lambda filename: uic.loadUiType(
+        os.path.join(RES, filename),
+    )
+    widget = ChannelWidget(mocker.Mock(), chat_area_css, theme, mocker.Mock())
+    qtbot.addWidget(widget.base)
+    widget.base.resize(200, 300)
+    return widget
+
+
+@pytest.fixture
+def channel(qapp, tmp_path):
+    log = ChatLog(str(tmp_path / "aeolus.log"))
+    return Channel(ChannelID(ChannelType.PUBLIC, "#aeolus"), Lines(log), "")
+
+
+@pytest.fixture
+def chat_area_view(qapp, mocker, channel, channel_widget):
+    # src.chat imports the client window
+    from src import client  # noqa: F401
+    from src.chat.channel_view import ChatAreaView
+
+    formatter = mocker.Mock()
+    formatter.format.side_effect = lambda data: LINE.format(data.line.sender, data.line.text)
+    formatter.format_older.side_effect = lambda lines: [formatter.format(data) for data in lines]
+    return ChatAreaView(
+        channel, channel_widget, mocker.Mock(), mocker.Mock(), mocker.Mock(), formatter,
+    )
+
+
+def add_line(channel, sender, text, mocker):
+    meta = mocker.Mock()
+    meta.player.avatar.url = None
+    line = ChatLine(sender, text, ChatLineType.MESSAGE)
+    channel.lines.add_line(ChatLineMetadata(line, meta))
+
+
+def test_remove_wrapped_lines(channel_widget):
+    channel_widget.base.show()
+    channel_widget.append_lines([
+        LINE.format("Kazbek", "long " * 60),
+        LINE.format("Rhyza", "first<br>second"),
+        LINE.format("Tex", "third"),
+    ])
+    assert shown_text(channel_widget)[2:5] == ["Rhyza", "first", "second"]
+
+    channel_widget.remove_lines(1)
+    assert shown_text(channel_widget)[0] == "Rhyza"
+
+    # Ends of lines added after a trim are kept past the trimmed text
+    channel_widget.append_lines([
+        LINE.format("Tex", "fourth<br>fifth"),
+        LINE.format("Rhyza", "sixth"),
+    ])
+    channel_widget.remove_lines(3)
+    assert shown_text(channel_widget) == ["Rhyza", "sixth"]
+
+
+def test_remove_lines_after_clearing(channel_widget):
+    channel_widget.append_lines([
+        LINE.format("Kazbek", "long " * 60),
+        LINE.format("Rhyza", "gg<br>wp"),
+    ])
+    channel_widget.remove_lines(1)
+
+    channel_widget.clear_chat()
+    channel_widget.append_lines([
+        LINE.format("Tex", "gg"),
+        LINE.format("Rhyza", "wp " * 60),
+    ])
+    channel_widget.remove_lines(1)
+    assert shown_text(channel_widget)[0] == "Rhyza"
+
+    channel_widget.remove_lines(5)
+    assert shown_text(channel_widget) == []
+
+
+def test_trim_after_css_reload(qtbot, mocker, channel, channel_widget, chat_area_view,
+                               chat_area_css):
+    channel_widget.base.show()
+    for sender in ("Rhyza", "Kazbek", "Tex"):
+        add_line(channel, sender, "gg<br>" + "wp " * 40, mocker)
+    qtbot.waitUntil(lambda: len(shown_text(channel_widget)) >= 6)
+    channel.lines.remove_lines(1)
+
+    chat_area_css.changed.emit()
+    assert shown_text(channel_widget)[::3] == ["Kazbek", "Tex"]
+
+    channel.lines.remove_lines(1)
+    assert shown_text(channel_widget)[0] == "Tex"
+    add_line(channel, "Rhyza", "again", mocker)
+    qtbot.waitUntil(lambda: "again" in shown_text(channel_widget))
+    channel.lines.remove_lines(1)
+    assert shown_text(channel_widget) == ["Rhyza", "again"]
+
+
+def test_lines_added_while_hidden_are_shown(qtbot, mocker, channel, channel_widget,
+                                            chat_area_view):
+    assert channel_widget.hidden
+    for text in ("one", "two", "three"):
+        add_line(channel, "Rhyza", text, mocker)
+    channel.lines.remove_lines(1)
+    qtbot.wait(10)
+    assert shown_text(channel_widget) == []
+
+    channel_widget.base.show()
+    chat_area_view.on_shown()
+    assert shown_text(channel_widget) == ["Rhyza", "two", "Rhyza", "three"]
+
+    # Shown lines are formatted once per event loop iteration
+    add_line(channel, "Rhyza", "four", mocker)
+    assert "four" not in shown_text(channel_widget)
+    qtbot.waitUntil(lambda: "four" in shown_text(channel_widget))
+
+
+def test_remove_prepended_lines(channel_widget):
+    channel_widget.append_lines([LINE.format("Tex", "third<br>fourth")])
+    channel_widget.prepend_lines([
+        LINE.format("Kazbek", "long " * 60),
+        LINE.format("Rhyza", "second"),
+    ])
+    assert shown_text(channel_widget)[2:] == ["Rhyza", "second", "Tex", "third", "fourth"]
+
+    channel_widget.remove_lines(1)
+    assert shown_text(channel_widget) == ["Rhyza", "second", "Tex", "third", "fourth"]
+    channel_widget.append_lines([LINE.format("Rhyza", "fifth")])
+    channel_widget.remove_lines(2)
+    assert shown_text(channel_widget) == ["Rhyza", "fifth"]
+
+
+def test_scrolling_to_top_shows_logged_lines(qtbot, mocker, channel, channel_widget,
+                                             chat_area_view):
+    chat_area_view.SCROLLBACK_LINES = 10
+    channel_widget.base.show()
+    for n in range(60):
+        add_line(channel, "Rhyza", f"line {n}", mocker)
+    channel.lines.remove_lines(30)
+    qtbot.waitUntil(lambda: "line 59" in shown_text(channel_widget))
+    assert shown_text(channel_widget)[1] == "line 30"
+
+    scrollbar = channel_widget.chat_area.verticalScrollBar()
+    scrollbar.setValue(scrollbar.minimum())
+    assert shown_text(channel_widget)[1::2][:11] == [f"line {n}" for n in range(20, 31)]
+    assert scrollbar.value() > scrollbar.minimum()
+
+    # Trimming drops read back lines first, reading back goes on before
+    # the first line shown
+    channel.lines.remove_lines(4)
+    assert shown_text(channel_widget)[1] == "line 24"
+    scrollbar.setValue(scrollbar.minimum())
+    assert shown_text(channel_widget)[1::2][:11] == [f"line {n}" for n in range(14, 25)]
+
+    chat_area_view.SCROLLBACK_LINES = 100
+    scrollbar.setValue(scrollbar.minimum())
+    lines = shown_text(channel_widget)[1::2]
+    assert lines == [f"line {n}" for n in range(60)]
+
+
+def test_format_logged_lines(qapp, mocker):
+    from src import client  # noqa: F401
+    from src.chat.channel_view import ChatLineFormatter
+    from src.util.magic_dict import MagicDict
+
+    def readfile(filename):
+        with open(os.path.join(RES, filename)) as fh:
+            return fh.read()
+
+    formatter = ChatLineFormatter(mocker.Mock(readfile=readfile), mocker.Mock())
+    newest = ChatLineMetadata(ChatLine("Rhyza", "gg", ChatLineType.MESSAGE, 1000), MagicDict())
+    with_time = formatter.format(newest)
+    without_time = formatter.format(newest)
+    assert with_time != without_time
+
+    older = ChatLineMetadata(ChatLine("Kazbek", "<wp>", ChatLineType.MESSAGE, 0), MagicDict())
+    texts = formatter.format_older([older])
+    assert "Kazbek" in texts[0] and "&lt;wp&gt;" in texts[0]
+    # The first older line has its time, whatever came after it
+    assert formatter.format_older([newest]) == [with_time]
+    # Lines in the same minute as the newest one still go without time
+    assert formatter.format(newest) == without_time
@@ -0,0 +1,24 @@
+from irc.client import Event
+
+from src.chat.ircconnection import IrcConnection
+
+
+def test_names_are_emitted_at_end_of_names(qtbot, mocker):
+    connection = IrcConnection("localhost", 443)
+    new_chatters = mocker.Mock()
+    connection.new_channel_chatters.connect(new_chatters)
+
+    connection.on_namreply(None, Event("namreply", "server", "me", ["=", "#aeolus", "@a b"]))
+    connection.on_namreply(None, Event("namreply", "server", "me", ["=", "#aeolus", "+c"]))
+    assert not new_chatters.called
+
+    end = Event("endofnames", "server", "me", ["#aeolus", "End of /NAMES list."])
+    connection.on_endofnames(None, end)
+    new_chatters.assert_called_once()
+    cid, chatters = new_chatters.call_args.args
+    assert cid.name == "#aeolus"
+    assert [(c.name, c.elevation) for c in chatters] == [("a", "@"), ("b", ""), ("c", "+")]
+
+    # Nothing is left over for the next listing
+    connection.on_endofnames(None, end)
+    new_chatters.assert_called_once()
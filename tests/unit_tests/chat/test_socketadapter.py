@@ -0,0 +1,55 @@
+from PyQt6.QtNetwork import QAbstractSocket
+
+from src.chat.socketadapter import ReactorForSocketAdapter
+from src.chat.socketadapter import WebSocketToSocket
+
+
+def connected_adapter(mocker):
+    adapter = WebSocketToSocket()
+    mocker.patch.object(
+        adapter.socket, "state", return_value=QAbstractSocket.SocketState.ConnectedState,
+    )
+    return adapter
+
+
+def test_read_buffered_messages(qtbot, mocker):
+    adapter = connected_adapter(mocker)
+    adapter.COMPACT_SIZE = 8
+
+    adapter.on_bin_message_received(b"PING :a")
+    adapter.on_bin_message_received(b"PING :b")
+    assert adapter.read(4) == b"PING"
+    assert adapter.read(8) == b" :a\r\nPIN"
+    assert len(adapter._buffer) < 18
+    adapter.on_bin_message_received(b"PING :c")
+    assert adapter.read(2**14) == b"G :b\r\nPING :c\r\n"
+    assert adapter.read(2**14) == b""
+
+
+def test_deliver_lines(qtbot, mocker):
+    adapter = connected_adapter(mocker)
+    adapter.on_bin_message_received(b"PING :a")
+
+    with qtbot.waitSignal(adapter.line_received) as blocker:
+        adapter.deliver_lines()
+    assert blocker.args == [b"PING :a\r\n"]
+
+    with qtbot.assertNotEmitted(adapter.message_received):
+        with qtbot.waitSignal(adapter.line_received) as blocker:
+            adapter.on_bin_message_received(b"PING :b")
+    assert blocker.args == [b"PING :b"]
+
+
+def test_reactor_processes_delivered_lines(qtbot, mocker):
+    reactor = ReactorForSocketAdapter()
+    adapter = connected_adapter(mocker)
+    mocker.patch.object(adapter, "write")
+    connection = reactor.server()
+    connection.connect("localhost", 443, "nick", connect_factory=lambda address: adapter)
+
+    pings = []
+    connection.add_global_handler("ping", lambda conn, event: pings.append(event.target))
+    with qtbot.assertNotEmitted(adapter.message_received):
+        adapter.on_bin_message_received(b"PING :a")
+        adapter.on_bin_message_received(b"PING :b\r\nPING :c")
+    assert pings == ["a", "b", "c"]
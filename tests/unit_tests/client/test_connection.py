@@ -0,0 +1,91 @@
+import json
+
+import pytest
+from PyQt6.QtCore import QByteArray
+
+
+@pytest.fixture
+def decoder(qapp):
+    # Importing src.client builds the main window, so it needs a QApplication
+    from src.client.connection import MessageDecoder
+    return MessageDecoder()
+
+
+@pytest.fixture
+def connection(qapp, mocker):
+    from src.client.connection import ServerConnection
+    connection = ServerConnection("localhost", 0, mocker.Mock())
+    mocker.patch.object(connection, "handle_message")
+    return connection
+
+
+@pytest.fixture
+def threaded_connection(qapp, mocker):
+    from src.client.connection import ServerConnection
+    connection = ServerConnection("localhost", 0, mocker.Mock(), threaded_decoding=True)
+    mocker.patch.object(connection, "handle_message")
+    yield connection
+    connection.stop_decoder_thread()
+
+
+def dispatched(connection):
+    return [call.args[0] for call in connection.handle_message.call_args_list]
+
+
+def test_decoder_handles_complete_messages(decoder):
+    messages = decoder.feed(b'{"command": "a"}\n{"command": "b"}\n')
+
+    assert messages == [{"command": "a"}, {"command": "b"}]
+    assert decoder.pending == 0
+
+
+def test_decoder_handles_messages_split_across_frames(decoder):
+    assert decoder.feed(b'{"command": ') == []
+    assert decoder.feed(b'"game_info", "uid": 1}\n{"comm') == [
+        {"command": "game_info", "uid": 1},
+    ]
+    assert decoder.pending == len(b'{"comm')
+    assert decoder.feed(b'and": "ping"}\n') == [{"command": "ping"}]
+    assert decoder.pending == 0
+
+
+def test_decoder_skips_invalid_lines(decoder):
+    messages = decoder.feed(b'{"command": "a"}\nnot json\n\n{"command": "b"}\n')
+
+    assert messages == [{"command": "a"}, {"command": "b"}]
+
+
+def test_decoder_reset_drops_partial_message(decoder):
+    decoder.feed(b'{"command": "a"')
+    decoder.reset()
+
+    assert decoder.feed(b'{"command": "b"}\n') == [{"command": "b"}]
+
+
+def test_messages_received_before_disconnect_are_dispatched(connection):
+    connection.processDataFromServer(b'{"command": "a"}\n{"command": "b"}\n')
+    connection.on_disconnect()
+
+    assert dispatched(connection) == [{"command": "a"}, {"command": "b"}]
+
+
+def test_closing_notice_is_dispatched_from_decoder_thread(threaded_connection):
+    notice = {"command": "notice", "style": "kick", "text": "Kicked"}
+    threaded_connection.on_binary_message_received(
+        QByteArray(b'{"command": "a"}\n' + json.dumps(notice).encode() + b"\n"),
+    )
+    threaded_connection.on_disconnect()
+
+    assert dispatched(threaded_connection) == [{"command": "a"}, notice]
+
+
+def test_messages_of_old_session_are_dropped_after_reconnect(connection, qtbot):
+    old_session = connection._session
+    connection.on_disconnect()
+    connection.on_connected()
+    # Decoded on the worker thread, but delivered after the reconnect
+    connection.enqueue_messages(old_session, [{"command": "c"}])
+    connection.processDataFromServer(b'{"command": "d"}\n')
+
+    qtbot.waitUntil(lambda: connection.handle_message.called)
+    connection.handle_message.assert_called_once_with({"command": "d"})
@@ -0,0 +1,75 @@
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import pyqtSignal
+
+from src.downloadManager import DownloadQueue
+
+
+class FakeDownload(QObject):
+    progress = pyqtSignal(object)
+    finished = pyqtSignal(object)
+
+    def __init__(self):
+        QObject.__init__(self)
+        self.running = False
+        self.canceled = False
+        self.error = False
+        self.bytes_total = 0
+        self.bytes_progress = 0
+
+    def run(self):
+        self.running = True
+        self.bytes_total = 10
+        self.progress.emit(self)
+
+    def complete(self, error=False):
+        self.error = error
+        self.bytes_progress = self.bytes_total
+        self.running = False
+        self.finished.emit(self)
+
+    def cancel(self):
+        self.canceled = True
+        self.complete()
+
+    def failed(self):
+        return self.error or self.canceled
+
+
+def test_queue_runs_bounded_number_of_downloads(application):
+    queue = DownloadQueue(max_running=2)
+    downloads = [FakeDownload() for _ in range(5)]
+    for dl in downloads:
+        queue.add(dl)
+    finished = []
+    queue.finished.connect(finished.append)
+
+    queue.run()
+    assert [dl.running for dl in downloads] == [True, True, False, False, False]
+    assert queue.bytes_total == 20
+
+    downloads[1].complete()
+    assert [dl.running for dl in downloads] == [True, False, True, False, False]
+    assert queue.bytes_progress == 10
+
+    while any(dl.running for dl in downloads):
+        next(dl for dl in downloads if dl.running).complete()
+    assert all(dl.bytes_progress == 10 for dl in downloads)
+    assert finished == [queue]
+    assert queue.succeeded()
+
+
+def test_failed_download_cancels_queue(application):
+    queue = DownloadQueue(max_running=2)
+    downloads = [FakeDownload() for _ in range(4)]
+    for dl in downloads:
+        queue.add(dl)
+    finished = []
+    queue.finished.connect(finished.append)
+
+    queue.run()
+    downloads[0].complete(error=True)
+    assert queue.failed_download is downloads[0]
+    assert downloads[1].canceled
+    assert not downloads[2].running and not downloads[3].running
+    assert finished == [queue]
+    assert queue.failed()
@@ -0,0 +1,57 @@
+import pytest
+
+from src.model.chat.channel import Channel
+from src.model.chat.channel import ChannelID
+from src.model.chat.channel import ChannelType
+from src.model.chat.channelchatter import ChannelChatter
+from src.model.chat.channelchatterset import ChannelChatterRelation
+from src.model.chat.channelchatterset import ChannelChatterset
+from src.model.chat.chatter import Chatter
+
+
+@pytest.fixture
+def ccs(mocker):
+    ccs = ChannelChatterset()
+    # Keep the relation alive for the whole test
+    ccs.relation = ChannelChatterRelation(mocker.Mock(), mocker.Mock(), ccs)
+    return ccs
+
+
+@pytest.fixture
+def channel(mocker):
+    cid = ChannelID(ChannelType.PUBLIC, "aeolus")
+    return Channel(cid, mocker.Mock(spec_set=[]), "")
+
+
+def test_set_items_adds_chatters_to_channel_at_once(ccs, channel, mocker):
+    chatters = [Chatter(f"chatter{i}", "") for i in range(5)]
+    new_ccs = [ChannelChatter(channel, chatter, "") for chatter in chatters]
+
+    added = mocker.Mock()
+    added_batch = mocker.Mock()
+    added_chatter = mocker.Mock()
+    added_chatters = mocker.Mock()
+    ccs.added.connect(added)
+    ccs.added_batch.connect(added_batch)
+    channel.added_chatter.connect(added_chatter)
+    channel.added_chatters.connect(added_chatters)
+
+    ccs.set_items(new_ccs)
+
+    assert len(ccs) == 5
+    assert not added.called
+    added_batch.assert_called_once_with(new_ccs)
+    assert not added_chatter.called
+    added_chatters.assert_called_once_with(new_ccs)
+    assert list(channel.chatters.values()) == new_ccs
+    for cc in new_ccs:
+        assert cc.chatter.channels == {cc.id_key: cc}
+
+
+def test_set_items_rejects_existing_chatters(ccs, channel):
+    cc = ChannelChatter(channel, Chatter("chatter", ""), "")
+    ccs[cc.id_key] = cc
+
+    with pytest.raises(ValueError):
+        ccs.set_items([ChannelChatter(channel, cc.chatter, "@")])
+    assert ccs[cc.id_key] is cc
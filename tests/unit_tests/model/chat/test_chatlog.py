@@ -0,0 +1,100 @@
+import json
+
+from src.model.chat.channel import ChannelID
+from src.model.chat.channel import ChannelType
+from src.model.chat.channel import Lines
+from src.model.chat.chatline import ChatLine
+from src.model.chat.chatline import ChatLineMetadata
+from src.model.chat.chatline import ChatLineType
+from src.model.chat.chatlog import ChatLog
+
+
+def read_entries(path):
+    with open(path, encoding="utf-8") as log:
+        return [json.loads(entry) for entry in log]
+
+
+def add_lines(lines, texts, time=1000):
+    for n, text in enumerate(texts):
+        line = ChatLine("Rhyza", text, ChatLineType.MESSAGE, time + n)
+        lines.add_line(ChatLineMetadata(line, None))
+
+
+def test_trimmed_lines_are_logged(tmp_path):
+    cid = ChannelID(ChannelType.PUBLIC, "#aeolus")
+    log = ChatLog.for_channel(str(tmp_path / "chat"), cid)
+    lines = Lines(log)
+    add_lines(lines, ["gg", "wp <b>", "żółw"])
+
+    lines.remove_lines(2)
+    lines.remove_lines(1)
+
+    assert read_entries(tmp_path / "chat" / "#aeolus.log") == [
+        [1000, ChatLineType.MESSAGE.value, "Rhyza", "gg"],
+        [1001, ChatLineType.MESSAGE.value, "Rhyza", "wp <b>"],
+        [1002, ChatLineType.MESSAGE.value, "Rhyza", "żółw"],
+    ]
+
+
+def test_full_log_is_rotated(tmp_path, mocker):
+    mocker.patch.object(ChatLog, "MAX_SIZE", 90)
+    path = tmp_path / "aeolus.log"
+    lines = Lines(ChatLog(str(path)))
+
+    add_lines(lines, ["a" * 50, "b", "c"])
+    lines.remove_lines(1)
+    lines.remove_lines(1)
+    assert [entry[3] for entry in read_entries(path)] == ["a" * 50, "b"]
+
+    lines.remove_lines(1)
+    assert [entry[3] for entry in read_entries(path)] == ["c"]
+    assert [entry[3] for entry in read_entries(f"{path}.1")] == ["a" * 50, "b"]
+
+
+def texts(read):
+    return [line.text for _, line in read]
+
+
+def test_lines_are_read_back_from_the_end(tmp_path, mocker):
+    mocker.patch.object(ChatLog, "READ_BLOCK", 16)
+    log = ChatLog(str(tmp_path / "aeolus.log"))
+    lines = Lines(log)
+    add_lines(lines, ["gg", "wp <b>", "żółw", "glhf", "o7"])
+    lines.remove_lines(5)
+
+    read = log.read_back(None, 2)
+    assert texts(read) == ["glhf", "o7"]
+    assert read[0][1].sender == "Rhyza"
+    assert read[0][1].time == 1003
+
+    read = log.read_back(read[0][0], 2)
+    assert texts(read) == ["wp <b>", "żółw"]
+    assert texts(log.read_back(read[0][0], 2)) == ["gg"]
+    assert log.read_back((log.generation, 0), 2) == []
+
+
+def test_reading_back_goes_on_in_rotated_log(tmp_path, mocker):
+    mocker.patch.object(ChatLog, "MAX_SIZE", 90)
+    log = ChatLog(str(tmp_path / "aeolus.log"))
+    lines = Lines(log)
+    add_lines(lines, ["a" * 50, "b", "c", "d"])
+    lines.remove_lines(2)
+    read = log.read_back(None, 1)
+    assert texts(read) == ["b"]
+
+    # Moves the first two lines aside
+    lines.remove_lines(1)
+    assert texts(log.read_back(read[0][0], 5)) == ["a" * 50]
+    lines.remove_lines(1)
+    assert texts(log.read_back(None, 5)) == ["a" * 50, "b", "c", "d"]
+
+
+def test_incomplete_line_is_not_read_back(tmp_path):
+    path = tmp_path / "aeolus.log"
+    path.write_text('[1000, 0, "Rhyza", "gg"]\nnot json\n[1001, 0, "Rhy')
+
+    assert texts(ChatLog(str(path)).read_back(None, 5)) == ["gg"]
+
+
+def test_missing_log_reads_nothing(tmp_path):
+    assert ChatLog(str(tmp_path / "none.log")).read_back(None, 5) == []
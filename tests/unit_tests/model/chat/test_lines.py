@@ -95,3 +95,15 @@ def test_negative_remove_number_is_value_error():
     lines = Lines()
     with pytest.raises(ValueError):
         lines.remove_lines(-5)
+
+
+def test_removed_lines_are_logged(mocker):
+    log = mocker.Mock()
+    lines = Lines(log)
+    for item in range(5):
+        lines.add_line(item)
+
+    lines.remove_lines(2)
+    log.write.assert_called_once_with([0, 1])
+    assert lines[0] == 2
+    assert lines[-1] == 4
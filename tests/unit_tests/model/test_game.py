@@ -100,3 +100,32 @@ def test_can_update_to_none(playerset, mocker):
     g = game.Game(playerset=playerset, **data)
     g.update(launched_at=None)
     assert g.launched_at is None
+
+
+def test_casefolded_fields_refresh_on_update(playerset):
+    data = copy.deepcopy(DEFAULT_DICT)
+    g = game.Game(playerset=playerset, **data)
+    assert g.casefolded("host") == "illiiililiiili"
+    assert g.casefolded("mapdisplayname") == "sentons ultimate 6v6"
+
+    data["host"] = "OtherName"
+    g.update(**data)
+    assert g.casefolded("host") == "othername"
+
+
+def test_unchanged_update_is_not_emitted(playerset, mocker):
+    data = copy.deepcopy(DEFAULT_DICT)
+    g = game.Game(playerset=playerset, **data)
+    updated = mocker.Mock()
+    g.updated.connect(updated)
+
+    g.update(**copy.deepcopy(data))
+    assert not updated.called
+
+    data["title"] = "Other title"
+    g.update(**data)
+    new, old = updated.call_args.args
+    assert new is g
+    assert old.title == "Sentons sucks"
+    assert old.mapname == g.mapname
+    assert old._live_replay_timer is None
@@ -195,3 +195,49 @@ def test_no_state_changes(playerset, mocker):
     assert not lobby.called
     assert not live.called
     assert not closed.called
+
+
+def _game_message(**kwargs):
+    m = copy.deepcopy(DEFAULT_DICT)
+    m["state"] = m["state"].value
+    m["visibility"] = m["visibility"].value
+    m.update(kwargs)
+    return m
+
+
+def test_apply_batch_adds_games_at_once(playerset, mocker):
+    s = gameset.Gameset(playerset=playerset)
+    added = mocker.Mock()
+    added_batch = mocker.Mock()
+    new_lobby = mocker.Mock()
+    s.added.connect(added)
+    s.added_batch.connect(added_batch)
+    s.newLobby.connect(new_lobby)
+
+    s.apply_batch([_game_message(uid=uid) for uid in range(1, 6)])
+
+    assert sorted(s.keys()) == [1, 2, 3, 4, 5]
+    assert not added.called
+    added_batch.assert_called_once_with([s[uid] for uid in range(1, 6)])
+    assert new_lobby.call_count == 5
+
+
+def test_apply_batch_updates_and_skips_closed(playerset, mocker):
+    s = gameset.Gameset(playerset=playerset)
+    s[1] = game.Game(playerset=playerset, **DEFAULT_DICT)
+    g = s[1]
+    added_batch = mocker.Mock()
+    s.added_batch.connect(added_batch)
+
+    s.apply_batch([
+        _game_message(uid=1, title="Updated"),
+        _game_message(uid=2),
+        _game_message(uid=2, state="closed"),
+        _game_message(uid=3, state="closed"),
+        _game_message(uid=4, visibility="bogus"),
+    ])
+
+    assert s[1] is g
+    assert g.title == "Updated"
+    assert list(s.keys()) == [1]
+    assert not added_batch.called
@@ -130,3 +130,18 @@ def test_missing_number_of_games():
     p = Player(**DEFAULT_DICT)
     p.update(ratings={"global": {"rating": (1500, 500)}})
     assert p.number_of_games == 0
+
+
+def test_unchanged_update_is_not_emitted(mocker):
+    p = Player(**DEFAULT_DICT)
+    updated = mocker.Mock()
+    p.updated.connect(updated)
+
+    p.update(**DEFAULT_DICT)
+    assert not updated.called
+
+    p.update(clan="FAF")
+    new, old = updated.call_args.args
+    assert old.clan is None
+    assert new.clan == "FAF"
+    assert old.country == "PL"
@@ -0,0 +1,118 @@
+import numpy as np
+import pyqtgraph as pg
+
+from src.api.stats_api import LeaderboardRatingJournalApiConnector
+from src.playercard.plot import LineSeries
+from src.playercard.plot import PlotController
+from src.playercard.ratingtabwidget import LineSeriesParser
+from src.playercard.ratingtabwidget import RatingsPlotTab
+from src.playercard.ratingtabwidget import parse_iso_times
+
+
+def journal_page(page, entries):
+    return {
+        "data": [
+            {
+                "type": "leaderboardRatingJournal",
+                "id": str(stats_id),
+                "attributes": {"meanAfter": mean, "deviationAfter": deviation},
+                "relationships": {
+                    "gamePlayerStats": {"data": {"type": "gamePlayerStats", "id": str(stats_id)}},
+                },
+            }
+            for stats_id, _, mean, deviation in entries
+        ],
+        "included": [
+            {
+                "type": "gamePlayerStats",
+                "id": str(stats_id),
+                "attributes": {"scoreTime": score_time},
+            }
+            for stats_id, score_time, _, _ in entries
+            if score_time is not None
+        ],
+        "meta": {"page": {"number": page, "totalPages": 2}},
+    }
+
+
+def test_parse_iso_times():
+    times = parse_iso_times(["1970-01-01T00:00:10Z", "2020-01-01T12:00:00.500Z"])
+    assert times.tolist() == [10, 1577880000]
+    assert len(parse_iso_times([])) == 0
+
+
+def test_line_series_extend():
+    series = LineSeries()
+    series.extend(LineSeries.from_arrays([1, 2], [10, 20]))
+    series.extend(LineSeries.from_arrays([3], [30]))
+    capacity = len(series._x)
+    series.extend(LineSeries())
+
+    assert series.x().tolist() == [1, 2, 3]
+    assert series.y().tolist() == [10, 20, 30]
+    assert len(series._x) == capacity
+
+    # A page from earlier arriving late
+    series.extend(LineSeries.from_arrays([0, 1.5], [0, 15]))
+    assert series.x().tolist() == [0, 1, 1.5, 2, 3]
+    assert series.y().tolist() == [0, 10, 15, 20, 30]
+    assert series.point_at(2).y() == 15
+
+
+def test_line_series_parser(qtbot):
+    message = journal_page(2, [
+        (1, "1970-01-01T00:01:00Z", 1500.0, 100.0),
+        (2, None, 1600.0, 100.0),
+        (3, "1970-01-01T00:02:00Z", 1700.0, 50.0),
+    ])
+    parser = LineSeriesParser(message)
+
+    with qtbot.waitSignal(parser.result_ready) as blocker:
+        parser.parse()
+
+    page, series = blocker.args
+    assert page == 2
+    assert series.x().tolist() == [60, 120]
+    np.testing.assert_allclose(series.y(), [1200, 1550])
+
+
+def test_failed_history_page_is_requested_again(qtbot, mocker):
+    api = LeaderboardRatingJournalApiConnector()
+    get_by_query = mocker.patch.object(api, "get_by_query")
+    api.get_full_history("1", "global")
+
+    with qtbot.assertNotEmitted(api.history_failed):
+        for _ in range(api.MAX_RETRIES):
+            _, _, error_handler = get_by_query.call_args.args
+            error_handler(None)
+    assert get_by_query.call_count == api.MAX_RETRIES + 1
+    assert all(call.args[0]["page[number]"] == 1 for call in get_by_query.call_args_list)
+
+    with qtbot.waitSignal(api.history_failed):
+        _, _, error_handler = get_by_query.call_args.args
+        error_handler(None)
+    assert get_by_query.call_count == api.MAX_RETRIES + 1
+
+
+def test_tab_can_be_entered_again_after_failure(qtbot, mocker):
+    leaderboard = mocker.Mock(technical_name="global", pretty_name="Global")
+    plot = PlotController(pg.PlotWidget())
+    plot.add_data(LineSeries.from_arrays([1], [10]))
+    tab = RatingsPlotTab(0, "1", leaderboard, plot)
+    get_full_history = mocker.patch.object(tab.ratings_history_api, "get_full_history")
+    names = []
+    tab.name_changed.connect(lambda index, name: names.append(name))
+
+    tab.enter()
+    tab.process_rating_history(journal_page(2, []))
+    tab.enter()
+    assert get_full_history.call_count == 1
+
+    tab.ratings_history_api.history_failed.emit()
+    assert names == ["Loading...", "Global"]
+    assert len(plot.series) == 0
+
+    tab.enter()
+    assert get_full_history.call_count == 2
+    assert names[-1] == "Loading..."
+    tab.close()
@@ -0,0 +1,76 @@
+import random
+
+import pytest
+from PyQt6.QtCore import QObject
+from PyQt6.QtCore import Qt
+from PyQt6.QtCore import pyqtSignal
+
+from src.qt.models.qtlistmodel import QtListModel
+
+
+class Item(QObject):
+    updated = pyqtSignal(object)
+
+    def __init__(self, data):
+        QObject.__init__(self)
+        self.data = data
+
+
+@pytest.fixture
+def model(application):
+    return QtListModel(Item)
+
+
+def model_data(model):
+    return [
+        model.data(model.index(row, 0), Qt.ItemDataRole.DisplayRole).data
+        for row in range(model.rowCount())
+    ]
+
+
+def test_add_remove_keeps_rows(model):
+    ids = list(range(50))
+    model._add_items([(i, i) for i in ids])
+
+    rng = random.Random(0)
+    for _ in range(30):
+        id_ = rng.choice(ids)
+        ids.remove(id_)
+        model._remove_item(id_)
+        assert model_data(model) == ids
+
+    for id_ in ids:
+        item = model._items[id_]
+        assert model._row(item) == ids.index(id_)
+
+
+def test_updates_are_coalesced(model, qtbot):
+    model._add_items([(i, i) for i in range(10)])
+    model._remove_item(0)
+    ranges = []
+    model.dataChanged.connect(
+        lambda start, end: ranges.append((start.row(), end.row())),
+    )
+
+    for id_ in [2, 3, 4, 7, 3, 9]:
+        item = model._items[id_]
+        item.updated.emit(item)
+    assert ranges == []
+
+    qtbot.waitUntil(lambda: ranges != [])
+    assert ranges == [(1, 3), (6, 6), (8, 8)]
+
+
+def test_update_of_removed_item_is_dropped(model, qtbot):
+    model._add_items([(i, i) for i in range(3)])
+    ranges = []
+    model.dataChanged.connect(
+        lambda start, end: ranges.append((start.row(), end.row())),
+    )
+
+    item = model._items[1]
+    item.updated.emit(item)
+    model._remove_item(1)
+
+    qtbot.wait(10)
+    assert ranges == []
@@ -0,0 +1,190 @@
+import json
+import os
+
+import pytest
+
+
+def write_replay(directory, name, **metadata):
+    data = {
+        "complete": True,
+        "featured_mod": "faf",
+        "launched_at": 1000.0,
+        "mapname": "scmp_001",
+        "num_players": 2,
+        "teams": {"1": ["Alice"], "2": ["Bob"]},
+        "title": "Game",
+    }
+    data.update(metadata)
+    path = directory / name
+    path.write_text(json.dumps(data) + "\nbinarydata")
+    return path
+
+
+@pytest.fixture
+def replayindex(qapp):
+    # src.replays needs src.client, which builds the main window and so
+    # needs a QApplication. Import it first, like the client does
+    from src import client  # noqa: F401
+    from src.replays import replayindex
+    return replayindex
+
+
+@pytest.fixture
+def index(replayindex, tmp_path):
+    replay_dir = tmp_path / "replays"
+    replay_dir.mkdir()
+    index = replayindex.LocalReplayIndex(str(replay_dir), str(tmp_path / "index.sqlite3"))
+    yield index
+    index.close()
+
+
+def test_update_indexes_new_and_removed_files(index, tmp_path):
+    directory = tmp_path / "replays"
+    write_replay(directory, "1.fafreplay", launched_at=1000.0)
+    write_replay(directory, "2.fafreplay", launched_at=2000.0, mapname="scmp_002")
+    (directory / "old.scfareplay").write_bytes(b"data")
+    (directory / "notes.txt").write_text("not a replay")
+
+    changed, removed = index.update()
+    assert sorted(changed) == ["1.fafreplay", "2.fafreplay", "old.scfareplay"]
+    assert removed == []
+    assert [r.filename for r in index.query()] == [
+        "2.fafreplay", "1.fafreplay", "old.scfareplay",
+    ]
+    assert index.query()[2].metadata is None
+
+    assert index.update() == ([], [])
+
+    os.remove(directory / "1.fafreplay")
+    assert index.update() == ([], ["1.fafreplay"])
+    assert index.count() == 2
+
+
+def test_changed_file_is_reindexed(index, tmp_path):
+    directory = tmp_path / "replays"
+    path = write_replay(directory, "1.fafreplay", title="Before")
+    index.update()
+
+    write_replay(directory, "1.fafreplay", title="After, longer")
+    os.utime(path, (5000, 5000))
+    assert index.update() == (["1.fafreplay"], [])
+    assert index.query()[0].metadata.title == "After, longer"
+    assert index.query()[0].metadata.parse().model.title == "After, longer"
+
+
+def test_query_reads_metadata_from_index(replayindex, index, tmp_path, mocker):
+    directory = tmp_path / "replays"
+    write_replay(directory, "1.fafreplay", teams={"1": ["Alice", "Carol"], "2": ["Bob"]})
+    write_replay(directory, "2.fafreplay", complete=False, launched_at=500.0)
+    (directory / "3.fafreplay").write_text("not json\n")
+    index.update()
+
+    parse = mocker.patch.object(replayindex, "ReplayMetadata")
+    complete, incomplete, broken = (r.metadata for r in index.query())
+    assert not parse.called
+
+    assert not complete.is_broken and not complete.is_incomplete
+    assert complete.title == "Game"
+    assert complete.mapname == "scmp_001"
+    assert complete.featured_mod == "faf"
+    assert complete.players == ["Alice", "Carol", "Bob"]
+    assert complete.launch_time() == 1000.0
+    assert incomplete.is_incomplete and incomplete.launch_time() == 500.0
+    assert broken.is_broken
+
+
+def test_query_filters_and_pages(index, tmp_path):
+    directory = tmp_path / "replays"
+    for i in range(5):
+        write_replay(
+            directory, f"{i}.fafreplay",
+            launched_at=float(i),
+            featured_mod="faf" if i % 2 else "coop",
+            teams={"1": [f"Player{i}"], "2": ["Bob"]},
+        )
+    write_replay(directory, "incomplete.fafreplay", complete=False)
+    (directory / "broken.fafreplay").write_text("not json\n")
+    index.update()
+
+    assert index.count(featured_mod="coop") == 3
+    assert index.count(player="Player1") == 1
+    assert index.count(player="Bob") == 6
+    assert index.count(complete=False) == 2
+    assert index.count(mapname="scmp_001") == 6
+
+    pages = list(index.pages(3, complete=True))
+    assert [[r.filename for r in page] for page in pages] == [
+        ["4.fafreplay", "3.fafreplay", "2.fafreplay"],
+        ["1.fafreplay", "0.fafreplay"],
+    ]
+
+
+def test_player_filter_matches_login_literally(index, tmp_path):
+    directory = tmp_path / "replays"
+    for i, login in enumerate(["a_b", "axb", "a%b", "a\\b", "aab_"]):
+        write_replay(directory, f"{i}.fafreplay", teams={"1": [login], "2": ["Bob"]})
+    index.update()
+
+    for login in ["a_b", "axb", "a%b", "a\\b", "aab_"]:
+        assert index.count(player=login) == 1
+    assert index.count(player="a") == 0
+
+
+def test_replays_by_filename_newest_first(index, tmp_path):
+    directory = tmp_path / "replays"
+    for i in range(3):
+        write_replay(directory, f"{i}.fafreplay", launched_at=float(i))
+    (directory / "old.scfareplay").write_bytes(b"data")
+    index.update()
+
+    replays = index.replays(["old.scfareplay", "0.fafreplay", "2.fafreplay"])
+    assert [r.filename for r in replays] == [
+        "2.fafreplay", "0.fafreplay", "old.scfareplay",
+    ]
+
+
+def test_worker_reports_changes_after_first_refresh(replayindex, index, tmp_path):
+    directory = tmp_path / "replays"
+    write_replay(directory, "1.fafreplay")
+    worker = replayindex.LocalReplayIndexWorker(index)
+    added = []
+    removed = []
+    worker.replays_added.connect(added.append)
+    worker.replays_removed.connect(removed.append)
+
+    worker.refresh()
+    assert [[r.filename for r in page] for page in added] == [["1.fafreplay"]]
+
+    added.clear()
+    os.remove(directory / "1.fafreplay")
+    write_replay(directory, "2.fafreplay")
+    worker.refresh()
+    assert removed == [["1.fafreplay", "2.fafreplay"]]
+    assert [[r.filename for r in page] for page in added] == [["2.fafreplay"]]
+
+
+def test_worker_summarizes_replay(replayindex, index, tmp_path, mocker):
+    path = str(write_replay(tmp_path / "replays", "1.fafreplay"))
+    summary = object()
+    from_file = mocker.patch.object(
+        replayindex.ReplaySummary, "from_file", return_value=summary,
+    )
+    worker = replayindex.LocalReplayIndexWorker(index)
+    summarized = []
+    worker.summarized.connect(lambda *args: summarized.append(args))
+
+    worker.summarize(path)
+
+    from_file.assert_called_once_with(path)
+    assert summarized == [(path, summary)]
+
+
+def test_worker_reports_unreadable_replay(replayindex, index, tmp_path):
+    path = str(write_replay(tmp_path / "replays", "1.fafreplay"))
+    worker = replayindex.LocalReplayIndexWorker(index)
+    summarized = []
+    worker.summarized.connect(lambda *args: summarized.append(args))
+
+    worker.summarize(path)
+
+    assert summarized == [(path, None)]
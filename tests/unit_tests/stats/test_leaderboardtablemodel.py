@@ -0,0 +1,141 @@
+from PyQt6.QtCore import Qt
+
+from src.stats.models.leaderboardtablemodel import LeaderboardTableModel
+
+
+class FakeApi:
+    def __init__(self):
+        self.requests = []
+
+    def get_by_query(self, query, response_handler, error_handler=None):
+        self.requests.append((query, response_handler, error_handler))
+
+    def abort(self):
+        pass
+
+    def respond(self, index, total_records):
+        query, handler, _ = self.requests[index]
+        size, number = query["page[size]"], query["page[number]"]
+        first = (number - 1) * size
+        rows = range(first, min(first + size, total_records))
+        handler({
+            "data": [
+                {
+                    "rating": 2000 - row,
+                    "mean": 2100.0 - row,
+                    "deviation": 50.0,
+                    "totalGames": 4,
+                    "wonGames": 1,
+                    "updateTime": "2020-01-01T00:00:00Z",
+                    "player": {"id": str(row), "login": f"player{row}"},
+                }
+                for row in rows
+            ],
+            "meta": {"page": {
+                "number": number,
+                "totalRecords": total_records,
+                "totalPages": -(-total_records // size),
+            }},
+        })
+
+
+def test_pages_are_loaded_when_shown(application):
+    api = FakeApi()
+    model = LeaderboardTableModel(api, page_size=10)
+    model.load({"filter": "x"})
+
+    query, _, _ = api.requests[0]
+    assert query["page[number]"] == 1
+    assert query["sort"] == "-rating"
+    assert model.loading
+    api.respond(0, 25)
+
+    assert not model.loading
+    assert model.rowCount() == 25
+    assert model.data(model.index(3, 0)) == "player3"
+    assert model.data(model.index(3, 6)) == "25.00%"
+    assert model.headerData(3, Qt.Orientation.Vertical, Qt.ItemDataRole.DisplayRole) == "4"
+    # The next page is fetched ahead of time
+    assert [query["page[number]"] for query, _, _ in api.requests] == [1, 2]
+
+    assert model.data(model.index(22, 0)) is None
+    assert [query["page[number]"] for query, _, _ in api.requests] == [1, 2, 3]
+    api.respond(2, 25)
+    assert model.data(model.index(22, 0)) == "player22"
+    assert model.row_of_login("PLAYER22") == 22
+
+
+def test_pages_are_bounded(application, mocker):
+    mocker.patch.object(LeaderboardTableModel, "MAX_PAGES", 2)
+    api = FakeApi()
+    model = LeaderboardTableModel(api, page_size=10)
+    model.load({"filter": "x"})
+    api.respond(0, 50)
+    model.data(model.index(0, 0))
+    api.respond(1, 50)
+    model.data(model.index(40, 0))
+    api.respond(2, 50)
+
+    assert model.data(model.index(0, 0)) is None
+    assert model.logins()[-1] == "player49"
+
+
+def test_sort_reloads_and_drops_stale_pages(application):
+    api = FakeApi()
+    model = LeaderboardTableModel(api, page_size=10)
+    model.load({"filter": "x"})
+
+    model.sort(0, Qt.SortOrder.AscendingOrder)
+    api.respond(0, 25)
+    assert model.rowCount() == 0
+
+    query, _, _ = api.requests[1]
+    assert query["sort"] == "player.login"
+    api.respond(1, 25)
+    assert model.rowCount() == 25
+
+    # Win rate can't be sorted by the api
+    assert not model.can_sort(6)
+    model.sort(6, Qt.SortOrder.AscendingOrder)
+    assert model.sort_field == "player.login"
+    assert model.sort_indicator() == (0, Qt.SortOrder.AscendingOrder)
+    model.sort(1, Qt.SortOrder.DescendingOrder)
+    assert model.sort_indicator() == (1, Qt.SortOrder.DescendingOrder)
+
+
+def test_failed_pages_are_retried_later(application, qtbot, mocker):
+    clock = mocker.patch("time.monotonic", return_value=100.0)
+    api = FakeApi()
+    model = LeaderboardTableModel(api, page_size=10)
+    model.load({"filter": "x"})
+    api.respond(0, 25)
+    assert len(api.requests) == 1
+
+    with qtbot.waitSignal(model.page_failed) as blocker:
+        model.data(model.index(22, 0))
+        _, _, error_handler = api.requests[1]
+        error_handler(None)
+    assert blocker.args == [3]
+    assert not model.loading
+
+    # Repaints don't request the page again right away
+    for _ in range(10):
+        assert model.data(model.index(22, 0)) is None
+    assert len(api.requests) == 2
+
+    for failures in range(1, model.MAX_PAGE_FAILURES):
+        clock.return_value += model.RETRY_DELAY * 2 ** failures
+        model.data(model.index(22, 0))
+        assert len(api.requests) == 2 + failures
+        _, _, error_handler = api.requests[-1]
+        error_handler(None)
+
+    clock.return_value += 3600
+    model.data(model.index(22, 0))
+    assert len(api.requests) == 1 + model.MAX_PAGE_FAILURES
+
+    # Until the leaderboard is loaded again
+    model.load({"filter": "x"})
+    api.respond(-1, 25)
+    model.data(model.index(22, 0))
+    assert api.requests[-1][0]["page[number]"] == 3
@@ -0,0 +1,68 @@
+import struct
+
+import pytest
+
+from src.util.dds import DDSError
+from src.util.dds import dds_to_image
+from src.util.dds import load_dds
+
+
+def dds_header(width, height, fourcc=b"", bit_count=0, masks=(0, 0, 0, 0)):
+    pf_flags = 0x4 if fourcc else 0x40
+    return struct.pack(
+        "<4s7I44x2I4s5I4I4x",
+        b"DDS ", 124, 0, height, width, 0, 0, 0,
+        32, pf_flags, fourcc.ljust(4, b"\0"), bit_count, *masks,
+        0, 0, 0, 0,
+    )
+
+
+def test_uncompressed_bgra(tmp_path):
+    header = dds_header(2, 2, bit_count=32, masks=(0xff0000, 0xff00, 0xff, 0xff000000))
+    pixels = bytes([
+        0, 0, 255, 0, 0, 255, 0, 0,
+        255, 0, 0, 0, 10, 20, 30, 0,
+    ])
+    path = tmp_path / "preview.dds"
+    path.write_bytes(header + pixels)
+
+    image = load_dds(str(path))
+    assert (image.width(), image.height()) == (2, 2)
+    assert image.pixelColor(0, 0).getRgb()[:3] == (255, 0, 0)
+    assert image.pixelColor(1, 0).getRgb()[:3] == (0, 255, 0)
+    assert image.pixelColor(0, 1).getRgb()[:3] == (0, 0, 255)
+    assert image.pixelColor(1, 1).getRgb() == (30, 20, 10, 255)
+
+
+def test_dxt1_block():
+    header = dds_header(4, 4, fourcc=b"DXT1")
+    white, black = 0xffff, 0x0000
+    # First row uses colors 0, 1, 2, 3, all other pixels color 1
+    indices = 0b11100100 | (0x55555555 & ~0xff)
+    block = struct.pack("<HHI", white, black, indices)
+
+    image = dds_to_image(header + block)
+    assert (image.width(), image.height()) == (4, 4)
+    row = [image.pixelColor(x, 0).getRgb()[:3] for x in range(4)]
+    assert row == [(255, 255, 255), (0, 0, 0), (170, 170, 170), (85, 85, 85)]
+    assert image.pixelColor(2, 3).getRgb()[:3] == (0, 0, 0)
+
+
+def test_dxt5_block_is_cropped():
+    header = dds_header(2, 2, fourcc=b"DXT5")
+    alpha = bytes(8)
+    red = 0xf800
+    block = alpha + struct.pack("<HHI", red, 0, 0)
+
+    image = dds_to_image(header + block)
+    assert (image.width(), image.height()) == (2, 2)
+    assert image.pixelColor(1, 1).getRgb()[:3] == (255, 0, 0)
+
+
+def test_rejects_unknown_data():
+    with pytest.raises(DDSError):
+        dds_to_image(b"PNG" + bytes(200))
+    with pytest.raises(DDSError):
+        dds_to_image(dds_header(4, 4, fourcc=b"ATI2") + bytes(16))
+    with pytest.raises(DDSError):
+        dds_to_image(dds_header(4, 4, fourcc=b"DXT1"))
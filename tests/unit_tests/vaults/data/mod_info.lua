@@ -0,0 +1,18 @@
+-- Mod info for a UI mod
+name = "Supreme Economy"
+uid = "b2cde810-15d0-4bfa-af66-ec2d6ecd561b"
+version = 2.3
+copyright = "Copyright 2013"
+description = "Displays mass and energy income, as well as = signs, in one place"
+author = "Crotalus"
+url = "http://forums.faforever.com/"
+icon = "/mods/SupremeEconomy/icon.png"
+selectable = true
+enabled = true
+exclusive = false
+ui_only = true
+requires = { }
+requiresNames = { }
+conflicts = { }
+before = { }
+after = { }
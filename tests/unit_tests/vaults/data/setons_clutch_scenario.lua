@@ -0,0 +1,28 @@
+version = 3 -- Lua Version. Dont touch this
+ScenarioInfo = {
+    name = "Seton's Clutch",
+    description = "<LOC SCMP_009_Description>Dozens of battles have been fought over the years across Seton's Clutch. A patient searcher could find the remains of countless units resting beneath the waves.",
+    preview = '',
+    map_version = 4,
+    type = 'skirmish',
+    starts = true,
+    size = {1024, 1024},
+    reclaim = {1183540, 31020},
+    map = '/maps/setons_clutch.v0004/setons_clutch.scmap',
+    save = '/maps/setons_clutch.v0004/setons_clutch_save.lua',
+    script = '/maps/setons_clutch.v0004/setons_clutch_script.lua',
+    norushradius = 40,
+    Configurations = {
+        ['standard'] = {
+            teams = {
+                {
+                    name = 'FFA',
+                    armies = {'ARMY_1', 'ARMY_2', 'ARMY_3', 'ARMY_4', 'ARMY_5', 'ARMY_6', 'ARMY_7', 'ARMY_8'}
+                },
+            },
+            customprops = {
+                ['ExtraArmies'] = STRING( 'ARMY_17 NEUTRAL_CIVILIAN' ),
+            },
+        },
+    },
+}
@@ -0,0 +1,135 @@
+import os
+
+import pytest
+
+from src.vaults.localcontent import LocalContentIndex
+
+
+@pytest.fixture
+def content_dir(tmp_path):
+    folder = tmp_path / "maps"
+    folder.mkdir()
+    return folder
+
+
+def make_index(tmp_path, content_dir, reads):
+    def read(name):
+        reads.append(name)
+        return {"title": name.upper()}
+    return LocalContentIndex(str(content_dir), str(tmp_path / "index.json"), read)
+
+
+def edit_in_place(path, text):
+    # Writing to an existing file doesn't change its folder's mtime. Move the
+    # file's mtime on as well, in case the file system's clock is coarse
+    st = os.stat(path)
+    path.write_text(text)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+
+
+def test_lookup_is_case_insensitive(application, tmp_path, content_dir):
+    (content_dir / "SCMP_001").mkdir()
+    (content_dir / "Custom.v0002").mkdir()
+    index = make_index(tmp_path, content_dir, [])
+
+    assert "scmp_001" in index
+    assert "custom.V0002" in index
+    assert "scmp_002" not in index
+    assert index.path("scmp_001") == str(content_dir / "SCMP_001")
+    assert index.get("CUSTOM.v0002").metadata == {"title": "CUSTOM.V0002"}
+
+
+def test_only_new_and_changed_entries_are_read(application, tmp_path, content_dir):
+    (content_dir / "a").mkdir()
+    (content_dir / "a" / "scenario.lua").write_text("version = 1")
+    (content_dir / "b").mkdir()
+    reads = []
+    index = make_index(tmp_path, content_dir, reads)
+    assert len(index) == 2
+    assert sorted(reads) == ["a", "b"]
+
+    reads.clear()
+    assert not index.refresh()
+    edit_in_place(content_dir / "a" / "scenario.lua", "version = 2")
+    assert not index.refresh()
+    assert index.rescan()
+    assert reads == ["a"]
+
+    reads.clear()
+    (content_dir / "c").mkdir()
+    assert index.refresh()
+    assert reads == ["c"]
+
+    os.rmdir(content_dir / "c")
+    assert index.refresh()
+    assert "c" not in index
+
+
+def test_only_folder_is_watched(application, tmp_path, content_dir):
+    (content_dir / "a").mkdir()
+    index = make_index(tmp_path, content_dir, [])
+    assert "a" in index
+    assert index._watcher.directories() == [str(content_dir)]
+    assert index._watcher.files() == []
+
+
+def test_changed_folder_reads_new_entry(application, qtbot, tmp_path, content_dir):
+    (content_dir / "a").mkdir()
+    reads = []
+    index = make_index(tmp_path, content_dir, reads)
+    index.REFRESH_DELAY = 0
+    assert "a" in index
+
+    reads.clear()
+    with qtbot.waitSignal(index.changed):
+        (content_dir / "b").mkdir()
+    assert reads == ["b"]
+
+
+def test_replaced_entry_is_read(application, tmp_path, content_dir):
+    (content_dir / "a").mkdir()
+    (content_dir / "a" / "scenario.lua").write_text("version = 1")
+    reads = []
+    index = make_index(tmp_path, content_dir, reads)
+    assert "a" in index
+
+    reads.clear()
+    st = os.stat(content_dir / "a")
+    (content_dir / "a" / "scenario.lua").unlink()
+    os.utime(content_dir / "a", ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert index.refresh()
+    assert reads == ["a"]
+
+
+def test_index_is_persisted(application, tmp_path, content_dir):
+    (content_dir / "a").mkdir()
+    make_index(tmp_path, content_dir, []).refresh()
+
+    reads = []
+    index = make_index(tmp_path, content_dir, reads)
+    assert "a" in index
+    assert reads == []
+    index._rescan_future.result()
+    assert reads == []
+
+
+def test_in_place_edit_is_read_after_restart(application, qtbot, tmp_path, content_dir):
+    (content_dir / "a").mkdir()
+    (content_dir / "a" / "mod_info.lua").write_text("version = 1")
+    make_index(tmp_path, content_dir, []).refresh()
+    edit_in_place(content_dir / "a" / "mod_info.lua", "version = 2")
+
+    reads = []
+    index = make_index(tmp_path, content_dir, reads)
+    # The cached entry is used until the edit is found in the background
+    with qtbot.waitSignal(index.changed):
+        assert "a" in index
+    assert reads == ["a"]
+
+
+def test_discard_forgets_entry(application, tmp_path, content_dir):
+    (content_dir / "a").mkdir()
+    index = make_index(tmp_path, content_dir, [])
+    assert "a" in index
+    index.discard("A")
+    assert "a" not in index
@@ -0,0 +1,179 @@
+import os
+import zipfile
+
+import pytest
+
+from src.vaults import luaparser
+
+DATA = os.path.join(os.path.dirname(__file__), "data")
+
+SCENARIO_SEARCH = {
+    "scenarioinfo>name": "name",
+    "size": "map_size",
+    "description": "description",
+    "count:armies": "max_players",
+    "map_version": "version",
+    "type": "map_type",
+}
+
+
+def data_file(name):
+    return os.path.join(DATA, name)
+
+
+def test_scenario_info():
+    parser = luaparser.luaParser(data_file("setons_clutch_scenario.lua"))
+    info = parser.parse(SCENARIO_SEARCH, {"version": "1"})
+
+    assert not parser.error
+    assert info == {
+        "name": "Seton's Clutch",
+        "description": (
+            "<LOC SCMP_009_Description>Dozens of battles have been fought "
+            "over the years across Seton's Clutch. A patient searcher could "
+            "find the remains of countless units resting beneath the waves."
+        ),
+        "version": "4",
+        "map_type": "skirmish",
+        "map_size": {"0": "1024", "1": "1024"},
+        "max_players": 8,
+    }
+
+
+def test_wildcards_and_aliases():
+    parser = luaparser.luaParser(data_file("setons_clutch_scenario.lua"))
+    info = parser.parse({
+        "teams>*>name": "teams:__parent__",
+        "armies>*": "armynames:__self__",
+    })
+
+    assert info["teams"] == {"0": "FFA"}
+    assert info["armynames"] == {str(i): f"ARMY_{i + 1}" for i in range(8)}
+
+
+def test_mod_info_keeps_equal_signs_in_strings():
+    parser = luaparser.luaParser(data_file("mod_info.lua"))
+    info = parser.parse({"name": "name", "description": "description", "ui_only": "ui_only"})
+
+    assert info == {
+        "name": "Supreme Economy",
+        "description": "Displays mass and energy income, as well as = signs, in one place",
+        "ui_only": "true",
+    }
+
+
+def test_bracketed_keys():
+    parser = luaparser.luaParser(data_file("game.prefs"))
+    info = parser.parse({"active_mods": "active_mods"})
+
+    assert info["active_mods"] == {
+        "b2cde810-15d0-4bfa-af66-ec2d6ecd561b": "true",
+        "9e8ea941-c306-4751-b367-a11000000502": "false",
+        "cab3b6d6-old-style": "true",
+    }
+
+
+def test_hash_comments_are_skipped():
+    text = (
+        "# mod_info.lua\n"
+        "version = 3\n"
+        "# version = 2 was broken\n"
+        'uid = "abc" # the # in "a#b" is kept\n'
+        'name = "a#b"\n'
+        "size = {1, # width\n 2}\n"
+    )
+
+    assert luaparser.parse_lua(text) == {
+        "version": "3",
+        "uid": "abc",
+        "name": "a#b",
+        "size": {"0": "1", "1": "2"},
+    }
+
+
+def test_hash_comments_in_files(tmp_path):
+    path = tmp_path / "mod_info.lua"
+    path.write_text('version = 3\n# version = 2 was broken\nuid = "abc"\n# my notes\n')
+    parser = luaparser.luaParser(str(path))
+    info = parser.parse({"version": "version", "uid": "uid", "0": "junk"}, {"junk": None})
+
+    assert not parser.error
+    assert info == {"version": "3", "uid": "abc", "junk": None}
+
+
+def test_missing_items_use_defaults_or_report_errors():
+    parser = luaparser.luaParser(data_file("mod_info.lua"))
+    info = parser.parse({"icon": "icon", "missing": "missing"}, {"icon": ""})
+
+    assert info == {"icon": "/mods/SupremeEconomy/icon.png"}
+    assert parser.error
+    assert "no matches for 'missing'" in parser.errorMsg
+
+
+def test_reads_file_from_zip(tmp_path):
+    archive = tmp_path / "mod.zip"
+    with zipfile.ZipFile(archive, "w") as zip:
+        zip.write(data_file("mod_info.lua"), "SupremeEconomy/mod_info.lua")
+
+    with zipfile.ZipFile(archive) as zip:
+        parser = luaparser.luaParser("mod_info.lua")
+        parser.iszip = True
+        parser.zip = zip
+        info = parser.parse({"name": "name"})
+
+    assert info == {"name": "Supreme Economy"}
+
+
+@pytest.mark.parametrize("text", ["a = {", "a = }", "a = @", "a = f(1"])
+def test_syntax_errors(tmp_path, text):
+    with pytest.raises(luaparser.LuaSyntaxError):
+        luaparser.parse_lua(text)
+
+    path = tmp_path / "broken.lua"
+    path.write_text(text)
+    parser = luaparser.luaParser(str(path))
+    assert parser.parse({"a": "a"}, {"a": "default"}) == {"a": "default"}
+    assert parser.error
+
+
+def test_parse_lua_values():
+    text = """
+    -- comment
+    --[[ long
+    comment ]]
+    t = {
+        'a', "b\\"c", [[long
+string]], -1, 0x10, true, nil,
+        STRING('x', VECTOR3(1, 2, 3)),
+        joined = 'a' .. 'b',
+        Nested = { x = 1; y = 2 },
+    }
+    """
+    assert luaparser.parse_lua(text) == {
+        "t": {
+            "0": "a",
+            "1": 'b"c',
+            "2": "long\nstring",
+            "3": "-1",
+            "4": "0x10",
+            "5": "true",
+            "6": "nil",
+            "7": "STRING('x', VECTOR3(1, 2, 3))",
+            "joined": "a",
+            "nested": {"x": "1", "y": "2"},
+        },
+    }
+
+
+def test_parse_files(tmp_path):
+    missing = str(tmp_path / "missing.lua")
+    paths = [data_file("setons_clutch_scenario.lua"), missing]
+
+    results = luaparser.parse_files(paths, {"scenarioinfo>name": "name"})
+
+    info, parser = results[paths[0]]
+    assert info == {"name": "Seton's Clutch"}
+    assert not parser.error
+    info, parser = results[missing]
+    assert info == {}
+    assert parser.error